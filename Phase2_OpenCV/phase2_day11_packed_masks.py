@@ -0,0 +1,328 @@
+"""
+PHASE 2 — OpenCV Image Processing Core
+Day 11: Bit-Packed Binary Masks
+
+Concepts:
+- Binary masks only need 1 bit per pixel, not 8
+- np.packbits / np.unpackbits row layout
+- Logical operations (AND, OR, XOR, NOT) on packed bytes
+- Population count (number of foreground pixels)
+- Erosion and dilation by bit shifts
+- Converting to and from OpenCV 0/255 masks
+"""
+
+import cv2
+import numpy as np
+
+# -----------------------------
+# 1. Helpers
+# -----------------------------
+
+# Number of set bits for every possible byte value
+POPCOUNT_TABLE = np.unpackbits(
+    np.arange(256, dtype=np.uint8)[:, None], axis=1
+).sum(axis=1).astype(np.uint8)
+
+
+def _row_bytes(width):
+    return (width + 7) // 8
+
+
+def _tail_mask(width):
+    # Valid bits of the last byte in every row (packbits is MSB-first)
+    extra = width % 8
+    return 0xFF if extra == 0 else (0xFF << (8 - extra)) & 0xFF
+
+
+# -----------------------------
+# 2. PackedMask class
+# -----------------------------
+
+class PackedMask:
+    """
+    Binary mask stored with np.packbits along the rows.
+
+    data has shape (height, ceil(width / 8)) and dtype uint8.
+    Pixel (y, x) lives in data[y, x // 8], bit 7 - x % 8.
+    Padding bits at the end of every row are always kept at 0.
+    """
+
+    def __init__(self, data, width):
+        data = np.ascontiguousarray(data, dtype=np.uint8)
+
+        if data.ndim != 2 or data.shape[1] != _row_bytes(width):
+            raise ValueError(
+                f"Packed data shape {data.shape} does not match width {width}"
+            )
+
+        self.data = data
+        self.width = width
+        self._clear_padding()
+
+    # ---- construction / conversion ----
+
+    @classmethod
+    def from_cv_mask(cls, mask):
+        """Pack a 2D OpenCV mask (any non-zero pixel is foreground)."""
+        if mask.ndim != 2:
+            raise ValueError("Mask must be a single-channel 2D array")
+        return cls(np.packbits(mask > 0, axis=1), mask.shape[1])
+
+    @classmethod
+    def zeros(cls, height, width):
+        return cls(np.zeros((height, _row_bytes(width)), np.uint8), width)
+
+    def to_cv_mask(self):
+        """Unpack back to a uint8 0/255 mask usable by OpenCV."""
+        bits = np.unpackbits(self.data, axis=1, count=self.width)
+        return bits * np.uint8(255)
+
+    def copy(self):
+        return PackedMask(self.data.copy(), self.width)
+
+    @property
+    def shape(self):
+        return (self.data.shape[0], self.width)
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes
+
+    def _clear_padding(self):
+        tail = _tail_mask(self.width)
+        if tail != 0xFF:
+            self.data[:, -1] &= tail
+
+    # ---- archives ----
+
+    def save(self, path):
+        np.savez(path, data=self.data, width=self.width)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as f:
+            return cls(f["data"], int(f["width"]))
+
+    # ---- logical operations ----
+
+    def _check(self, other):
+        if not isinstance(other, PackedMask):
+            return NotImplemented
+        if self.shape != other.shape:
+            raise ValueError(f"Shape mismatch: {self.shape} vs {other.shape}")
+        return None
+
+    def __and__(self, other):
+        if self._check(other) is NotImplemented:
+            return NotImplemented
+        return PackedMask(self.data & other.data, self.width)
+
+    def __or__(self, other):
+        if self._check(other) is NotImplemented:
+            return NotImplemented
+        return PackedMask(self.data | other.data, self.width)
+
+    def __xor__(self, other):
+        if self._check(other) is NotImplemented:
+            return NotImplemented
+        return PackedMask(self.data ^ other.data, self.width)
+
+    def __invert__(self):
+        # Constructor clears the padding bits that NOT just set
+        return PackedMask(~self.data, self.width)
+
+    def __eq__(self, other):
+        if not isinstance(other, PackedMask):
+            return NotImplemented
+        return self.shape == other.shape and np.array_equal(self.data, other.data)
+
+    def count(self):
+        """Population count: number of foreground pixels."""
+        return int(POPCOUNT_TABLE[self.data].sum(dtype=np.int64))
+
+    def __repr__(self):
+        h, w = self.shape
+        return f"PackedMask({h}x{w}, {self.nbytes} bytes, {self.count()} set)"
+
+    # ---- shifts ----
+
+    def _shift_x(self, s, fill):
+        """Pixel x takes the value of pixel x + s (fill outside the image)."""
+        if s == 0:
+            return self.data.copy()
+
+        q, r = divmod(abs(s), 8)
+        fill_byte = 0xFF if fill else 0x00
+
+        # Out-of-image bits (including row padding) behave like the border
+        src = self.data.copy()
+        tail = _tail_mask(self.width)
+        if fill and tail != 0xFF:
+            src[:, -1] |= ~np.uint8(tail)
+
+        pad = np.full((src.shape[0], q + 1), fill_byte, np.uint8)
+        padded = np.concatenate([pad, src, pad], axis=1)
+
+        n = src.shape[1]
+        lead = q + 1
+
+        if s > 0:
+            hi = padded[:, lead + q:lead + q + n]
+            lo = padded[:, lead + q + 1:lead + q + 1 + n]
+            if r == 0:
+                return hi.copy()
+            return (hi << r) | (lo >> (8 - r))
+
+        hi = padded[:, lead - q:lead - q + n]
+        lo = padded[:, lead - q - 1:lead - q - 1 + n]
+        if r == 0:
+            return hi.copy()
+        return (hi >> r) | (lo << (8 - r))
+
+    def _shift_y(self, s, fill):
+        """Row y takes the value of row y + s (fill outside the image)."""
+        out = np.full_like(self.data, 0xFF if fill else 0x00)
+        h = self.data.shape[0]
+
+        if abs(s) >= h:
+            return out
+        if s > 0:
+            out[:h - s] = self.data[s:]
+        elif s < 0:
+            out[-s:] = self.data[:h + s]
+        else:
+            out[:] = self.data
+        return out
+
+    # ---- morphology ----
+
+    def _morph(self, ksize, iterations, erode):
+        kw, kh = (ksize, ksize) if np.isscalar(ksize) else ksize
+        # Anchor at the kernel centre, like cv2 with anchor=(-1, -1)
+        ax, ay = kw // 2, kh // 2
+        combine = np.bitwise_and if erode else np.bitwise_or
+
+        # Border pixels never erode / dilate the image (OpenCV default)
+        fill = erode
+
+        result = self
+        for _ in range(iterations):
+            # Rectangular kernels are separable: rows first, then columns
+            acc = result.data.copy()
+            for dx in range(-ax, kw - ax):
+                if dx != 0:
+                    combine(acc, result._shift_x(dx, fill), out=acc)
+            rows = PackedMask(acc, self.width)
+
+            acc = rows.data.copy()
+            for dy in range(-ay, kh - ay):
+                if dy != 0:
+                    combine(acc, rows._shift_y(dy, fill), out=acc)
+            result = PackedMask(acc, self.width)
+
+        return result
+
+    def erode(self, ksize=3, iterations=1):
+        """Erosion with a rectangular kernel, matching cv2.erode."""
+        return self._morph(ksize, iterations, erode=True)
+
+    def dilate(self, ksize=3, iterations=1):
+        """Dilation with a rectangular kernel, matching cv2.dilate."""
+        return self._morph(ksize, iterations, erode=False)
+
+    def opening(self, ksize=3):
+        return self.erode(ksize).dilate(ksize)
+
+    def closing(self, ksize=3):
+        return self.dilate(ksize).erode(ksize)
+
+
+if __name__ == "__main__":
+
+    # -----------------------------
+    # 3. Load image and threshold
+    # -----------------------------
+
+    img = cv2.imread("sample.jpg")
+
+    if img is None:
+        raise FileNotFoundError("Image not found")
+
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    blur = cv2.GaussianBlur(gray, (5, 5), 0)
+
+    _, thresh = cv2.threshold(blur, 127, 255, cv2.THRESH_BINARY)
+
+    # -----------------------------
+    # 4. Pack the mask
+    # -----------------------------
+
+    packed = PackedMask.from_cv_mask(thresh)
+
+    print("uint8 mask bytes:", thresh.nbytes)
+    print("Packed mask bytes:", packed.nbytes)
+    print("Compression ratio:", thresh.nbytes / packed.nbytes)
+    print(packed)
+
+    # Round trip must be lossless
+    assert np.array_equal(packed.to_cv_mask(), thresh)
+
+    # -----------------------------
+    # 5. Logical operations
+    # -----------------------------
+
+    _, thresh_inv = cv2.threshold(blur, 127, 255, cv2.THRESH_BINARY_INV)
+    packed_inv = PackedMask.from_cv_mask(thresh_inv)
+
+    print("NOT matches THRESH_BINARY_INV:", ~packed == packed_inv)
+    print("AND with inverse is empty:", (packed & packed_inv).count() == 0)
+    print("OR with inverse is full:",
+          (packed | packed_inv).count() == thresh.size)
+
+    # -----------------------------
+    # 6. Morphology by bit shifts
+    # -----------------------------
+
+    kernel = np.ones((5, 5), np.uint8)
+
+    eroded = packed.erode(5)
+    dilated = packed.dilate(5)
+
+    print("Erosion matches cv2.erode:",
+          np.array_equal(eroded.to_cv_mask(), cv2.erode(thresh, kernel)))
+    print("Dilation matches cv2.dilate:",
+          np.array_equal(dilated.to_cv_mask(), cv2.dilate(thresh, kernel)))
+
+    # -----------------------------
+    # 7. Contours from packed masks
+    # -----------------------------
+
+    opening = packed.opening(5)
+
+    contours_raw, _ = cv2.findContours(
+        packed.to_cv_mask(), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
+    )
+    contours_open, _ = cv2.findContours(
+        opening.to_cv_mask(), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
+    )
+
+    print("Contours before morphology:", len(contours_raw))
+    print("Contours after opening:", len(contours_open))
+
+    # -----------------------------
+    # 8. Mask archive
+    # -----------------------------
+
+    packed.save("mask_packed.npz")
+    restored = PackedMask.load("mask_packed.npz")
+
+    print("Archive round trip OK:", restored == packed)
+
+"""
+Summary:
+- A binary mask carries 1 bit of information per pixel
+- np.packbits stores 8 pixels per byte (8x less memory)
+- AND / OR / XOR / NOT work directly on the packed bytes
+- Erosion and dilation are AND / OR of shifted masks
+- Unpack only when OpenCV needs a 0/255 mask (e.g. findContours)
+"""
@@ -0,0 +1,222 @@
+"""
+PHASE 2 — OpenCV Image Processing Core
+Day 12: Batched Crossfade Rendering
+
+Concepts:
+- Rendering all transition frames into one preallocated buffer
+- Integer blending weights (alpha = w / 256)
+- Writing results in place with dst= (no per-frame allocations)
+- Per-pixel alpha masks (spatial transitions / wipes)
+- Streaming rendered frames into a VideoWriter
+"""
+
+import time
+
+import cv2
+import numpy as np
+import matplotlib.pyplot as plt
+
+# -----------------------------
+# 1. Integer weights
+# -----------------------------
+
+# Weights are integers in [0, 256] (alpha = w / 256), so every
+# transition frame is exactly reproducible and cheap to store.
+WEIGHT_BITS = 8
+WEIGHT_ONE = 1 << WEIGHT_BITS
+
+
+def crossfade_weights(num_frames):
+    """Integer weights of img1 for a linear 0 -> 1 crossfade."""
+    alphas = np.linspace(0, 1, num_frames)
+    return np.rint(alphas * WEIGHT_ONE).astype(np.int32)
+
+
+def _as_float_mask(alpha_mask):
+    # Per-pixel mask as float32 in [0, 1], shape (H, W)
+    mask = np.asarray(alpha_mask)
+    if mask.dtype == np.uint8:
+        return mask.astype(np.float32) / 255
+    return np.clip(mask, 0, 1).astype(np.float32)
+
+
+def _check_pair(img1, img2):
+    if img1.shape != img2.shape:
+        raise ValueError(
+            f"Images must have the same shape: {img1.shape} vs {img2.shape}"
+        )
+    if img1.dtype != np.uint8 or img2.dtype != np.uint8:
+        raise TypeError("Only uint8 images are supported")
+
+
+# -----------------------------
+# 2. Crossfade renderer
+# -----------------------------
+
+def render_crossfade(img1, img2, weights, alpha_mask=None, out=None):
+    """
+    Render one blended frame of img1 over img2 per weight.
+
+    img1, img2 : (H, W, C) or (H, W) uint8 images of the same shape
+    weights    : (K,) integer weights of img1 in [0, 256]
+    alpha_mask : optional (H, W) mask, uint8 0-255 or float 0-1,
+                 scaling the weights per pixel (255 / 1.0 = full weight)
+    out        : optional preallocated (K, H, W[, C]) uint8 buffer
+
+    Every frame is written in place into its slice of `out`, so a long
+    transition allocates nothing per frame. OpenCV's SIMD blend kernels
+    fill the slices (a NumPy uint16 broadcast is several times slower).
+    """
+    _check_pair(img1, img2)
+
+    weights = np.asarray(weights)
+    num_frames = len(weights)
+
+    if out is None:
+        out = np.empty((num_frames,) + img1.shape, np.uint8)
+    elif out.shape[0] < num_frames or out.shape[1:] != img1.shape:
+        raise ValueError(f"Output buffer shape {out.shape} is too small")
+
+    if alpha_mask is None:
+        for k, w in enumerate(weights):
+            alpha = float(w) / WEIGHT_ONE
+            cv2.addWeighted(img1, alpha, img2, 1 - alpha, 0, dst=out[k])
+        return out[:num_frames]
+
+    mask = _as_float_mask(alpha_mask)
+    if mask.shape != img1.shape[:2]:
+        raise ValueError("Alpha mask must match the image height and width")
+
+    # Reused per-pixel weight maps (blendLinear wants float32, 1 channel)
+    w1 = np.empty_like(mask)
+    w2 = np.empty_like(mask)
+    ones = np.ones_like(mask)
+
+    for k, w in enumerate(weights):
+        cv2.multiply(mask, float(w) / WEIGHT_ONE, dst=w1)
+        cv2.subtract(ones, w1, dst=w2)
+        cv2.blendLinear(img1, img2, w1, w2, dst=out[k])
+
+    return out[:num_frames]
+
+
+def write_crossfade(writer, img1, img2, num_frames, alpha_mask=None,
+                    chunk=8):
+    """
+    Render a crossfade chunk by chunk and stream it into a writer.
+
+    writer is anything with a .write(frame) method, e.g. cv2.VideoWriter.
+    Only one (chunk, H, W, C) buffer is kept in memory.
+    """
+    weights = crossfade_weights(num_frames)
+    buffer = np.empty((chunk,) + img1.shape, np.uint8)
+
+    for start in range(0, num_frames, chunk):
+        part = weights[start:start + chunk]
+        frames = render_crossfade(img1, img2, part, alpha_mask, out=buffer)
+        for frame in frames:
+            writer.write(frame)
+
+    return num_frames
+
+
+if __name__ == "__main__":
+
+    # -----------------------------
+    # 3. Load two images
+    # -----------------------------
+
+    img1 = cv2.imread("image1.jpg")
+    img2 = cv2.imread("image2.jpg")
+
+    if img1 is None or img2 is None:
+        raise FileNotFoundError("One of the images was not found")
+
+    img2_resized = cv2.resize(img2, (img1.shape[1], img1.shape[0]))
+
+    # -----------------------------
+    # 4. Loop of addWeighted calls (reference)
+    # -----------------------------
+
+    num_frames = 30
+    alphas = np.linspace(0, 1, num_frames)
+
+    start = time.perf_counter()
+    reference = [
+        cv2.addWeighted(img1, alpha, img2_resized, 1 - alpha, 0)
+        for alpha in alphas
+    ]
+    loop_time = time.perf_counter() - start
+
+    # -----------------------------
+    # 5. Crossfade into a preallocated buffer
+    # -----------------------------
+
+    frames = np.empty((num_frames,) + img1.shape, np.uint8)
+    weights = crossfade_weights(num_frames)
+
+    start = time.perf_counter()
+    render_crossfade(img1, img2_resized, weights, out=frames)
+    batch_time = time.perf_counter() - start
+
+    max_error = max(
+        int(np.abs(f.astype(np.int16) - r).max())
+        for f, r in zip(frames, reference)
+    )
+
+    print("Output buffer shape:", frames.shape)
+    print(f"addWeighted loop: {loop_time * 1000:.1f} ms")
+    print(f"Buffered render:  {batch_time * 1000:.1f} ms")
+    print("Max difference vs addWeighted:", max_error)
+
+    # -----------------------------
+    # 6. Per-pixel alpha mask (left-to-right wipe)
+    # -----------------------------
+
+    h, w = img1.shape[:2]
+    ramp = np.linspace(0, 1, w, dtype=np.float32)
+    wipe_mask = np.tile(ramp, (h, 1))
+
+    wipe = render_crossfade(img1, img2_resized, weights, alpha_mask=wipe_mask)
+
+    # -----------------------------
+    # 7. Stream into a VideoWriter
+    # -----------------------------
+
+    fourcc = cv2.VideoWriter_fourcc(*'XVID')
+    out = cv2.VideoWriter("crossfade.avi", fourcc, 20, (w, h))
+
+    written = write_crossfade(out, img1, img2_resized, num_frames)
+    out.release()
+
+    print("Frames written to crossfade.avi:", written)
+
+    # -----------------------------
+    # 8. Visualization
+    # -----------------------------
+
+    shown = np.linspace(0, num_frames - 1, 5).astype(int)
+
+    plt.figure(figsize=(15, 6))
+    for i, k in enumerate(shown):
+        plt.subplot(2, 5, i + 1)
+        plt.imshow(cv2.cvtColor(frames[k], cv2.COLOR_BGR2RGB))
+        plt.title(f"Crossfade α={alphas[k]:.2f}")
+        plt.axis("off")
+
+        plt.subplot(2, 5, i + 6)
+        plt.imshow(cv2.cvtColor(wipe[k], cv2.COLOR_BGR2RGB))
+        plt.title(f"Wipe α={alphas[k]:.2f}")
+        plt.axis("off")
+
+    plt.tight_layout()
+    plt.show()
+
+"""
+Summary:
+- All K transition frames land in one preallocated (K, H, W, C) buffer
+- OpenCV writes each frame in place via dst=, nothing is reallocated
+- Chunked rendering bounds memory for long transitions
+- A per-pixel alpha mask turns the crossfade into wipes and reveals
+- Frames can be streamed straight into a VideoWriter
+"""
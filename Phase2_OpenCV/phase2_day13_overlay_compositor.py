@@ -0,0 +1,238 @@
+"""
+PHASE 2 — OpenCV Image Processing Core
+Day 13: Watermarks & Overlays (Premultiplied Alpha)
+
+Concepts:
+- Alpha channels (BGRA) and per-pixel transparency
+- Premultiplied alpha: out = overlay * a + frame * (1 - a)
+- Caching the resized overlay per frame resolution
+- Blending only the overlay's bounding ROI, not the whole frame
+- Several overlays per frame (logo, badge, watermark)
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+# -----------------------------
+# 1. Anchors
+# -----------------------------
+
+ANCHORS = ("top-left", "top-right", "bottom-left", "bottom-right", "center")
+
+
+def _anchor_origin(anchor, frame_w, frame_h, w, h, margin):
+    # Top-left corner of an overlay of size (w, h) inside the frame
+    if not isinstance(anchor, str):
+        return int(anchor[0]), int(anchor[1])
+    if anchor not in ANCHORS:
+        raise ValueError(f"Unknown anchor '{anchor}', expected one of {ANCHORS}")
+    if anchor == "center":
+        return (frame_w - w) // 2, (frame_h - h) // 2
+
+    x = margin if anchor.endswith("left") else frame_w - w - margin
+    y = margin if anchor.startswith("top") else frame_h - h - margin
+    return x, y
+
+
+# -----------------------------
+# 2. Overlay compositor
+# -----------------------------
+
+class OverlayCompositor:
+    """
+    Alpha-composite small overlays onto frames in place.
+
+    The resized, premultiplied overlay and its inverse alpha are cached
+    per frame resolution, so every later frame only pays for
+    one multiply + one add over the overlay's own ROI.
+    """
+
+    def __init__(self):
+        self.overlays = []
+        self._cache = {}
+
+    def add(self, image, alpha=None, anchor="bottom-right", scale=0.2,
+            opacity=1.0, margin=10):
+        """
+        Register an overlay and return its index.
+
+        image   : BGR or BGRA uint8 image (alpha channel is used if present)
+        alpha   : optional separate (H, W) uint8 alpha mask
+        anchor  : one of ANCHORS, or an (x, y) pixel position
+        scale   : overlay width as a fraction of the frame width
+                  (None keeps the original size)
+        opacity : global opacity multiplied into the alpha
+        """
+        if image.ndim != 3 or image.shape[2] not in (3, 4):
+            raise ValueError("Overlay must be a BGR or BGRA image")
+
+        if alpha is None:
+            if image.shape[2] == 4:
+                alpha = image[:, :, 3]
+            else:
+                alpha = np.full(image.shape[:2], 255, np.uint8)
+
+        self.overlays.append({
+            "bgr": np.ascontiguousarray(image[:, :, :3]),
+            "alpha": np.ascontiguousarray(alpha),
+            "anchor": anchor,
+            "scale": scale,
+            "opacity": float(opacity),
+            "margin": margin,
+        })
+        return len(self.overlays) - 1
+
+    def remove(self, index):
+        self.overlays[index] = None
+        self._cache = {k: v for k, v in self._cache.items() if k[0] != index}
+
+    def clear_cache(self):
+        self._cache.clear()
+
+    def _prepare(self, index, frame_w, frame_h):
+        # Resize, premultiply and clip one overlay for a frame size
+        ov = self.overlays[index]
+        bgr, alpha = ov["bgr"], ov["alpha"]
+
+        if ov["scale"] is not None:
+            w = max(1, int(round(frame_w * ov["scale"])))
+            h = max(1, int(round(bgr.shape[0] * w / bgr.shape[1])))
+            bgr = cv2.resize(bgr, (w, h), interpolation=cv2.INTER_AREA)
+            alpha = cv2.resize(alpha, (w, h), interpolation=cv2.INTER_AREA)
+
+        h, w = bgr.shape[:2]
+        x, y = _anchor_origin(ov["anchor"], frame_w, frame_h, w, h,
+                              ov["margin"])
+
+        # Clip the overlay to the part that is visible in the frame
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, frame_w), min(y + h, frame_h)
+        if x0 >= x1 or y0 >= y1:
+            return None
+
+        bgr = bgr[y0 - y:y1 - y, x0 - x:x1 - x]
+        alpha = alpha[y0 - y:y1 - y, x0 - x:x1 - x]
+
+        if ov["opacity"] < 1.0:
+            alpha = cv2.convertScaleAbs(alpha, alpha=ov["opacity"])
+
+        alpha3 = cv2.merge([alpha, alpha, alpha])
+
+        entry = {
+            "roi": (y0, y1, x0, x1),
+            # overlay * a, computed once
+            "premultiplied": cv2.multiply(bgr, alpha3, scale=1 / 255),
+            # (1 - a) weights for the frame pixels
+            "inverse_alpha": cv2.bitwise_not(alpha3),
+            "scratch": np.empty_like(bgr),
+        }
+        return entry
+
+    def apply(self, frame):
+        """Composite every overlay onto the frame in place and return it."""
+        frame_h, frame_w = frame.shape[:2]
+
+        for index, ov in enumerate(self.overlays):
+            if ov is None:
+                continue
+
+            key = (index, frame_w, frame_h)
+            if key not in self._cache:
+                self._cache[key] = self._prepare(index, frame_w, frame_h)
+            entry = self._cache[key]
+            if entry is None:
+                continue
+
+            y0, y1, x0, x1 = entry["roi"]
+            roi = frame[y0:y1, x0:x1]
+
+            # roi = overlay * a + roi * (1 - a)
+            cv2.multiply(roi, entry["inverse_alpha"], dst=entry["scratch"],
+                         scale=1 / 255)
+            cv2.add(entry["scratch"], entry["premultiplied"], dst=roi)
+
+        return frame
+
+
+if __name__ == "__main__":
+
+    # -----------------------------
+    # 3. Load frame and logo
+    # -----------------------------
+
+    img1 = cv2.imread("image1.jpg")
+    img2 = cv2.imread("image2.jpg")
+
+    if img1 is None or img2 is None:
+        raise FileNotFoundError("One of the images was not found")
+
+    # Round logo: transparent outside a circle
+    logo_alpha = np.zeros(img2.shape[:2], np.uint8)
+    center = (img2.shape[1] // 2, img2.shape[0] // 2)
+    cv2.circle(logo_alpha, center, min(center), 255, -1)
+    logo = np.dstack([img2, logo_alpha])
+
+    # -----------------------------
+    # 4. Build compositor
+    # -----------------------------
+
+    compositor = OverlayCompositor()
+    compositor.add(logo, anchor="bottom-right", scale=0.15)
+    compositor.add(img2, anchor="top-left", scale=0.1, opacity=0.4)
+
+    result = compositor.apply(img1.copy())
+    print("Overlays:", len(compositor.overlays))
+
+    # -----------------------------
+    # 5. Full-frame blend (Day 10 style) vs ROI compositing
+    # -----------------------------
+
+    frame_4k = cv2.resize(img1, (3840, 2160))
+    runs = 50
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        img2_resized = cv2.resize(img2, (frame_4k.shape[1], frame_4k.shape[0]))
+        cv2.addWeighted(frame_4k, 0.8, img2_resized, 0.2, 0)
+    full_time = (time.perf_counter() - start) / runs
+
+    compositor.apply(frame_4k.copy())  # warm the cache for 4K
+
+    frame = frame_4k.copy()
+    start = time.perf_counter()
+    for _ in range(runs):
+        compositor.apply(frame)
+    roi_time = (time.perf_counter() - start) / runs
+
+    print(f"Full-frame resize + blend (4K): {full_time * 1000:.2f} ms/frame")
+    print(f"Cached ROI compositing (4K):    {roi_time * 1000:.2f} ms/frame")
+
+    # -----------------------------
+    # 6. Use inside a video loop (Phase 3 style)
+    # -----------------------------
+
+    # while True:
+    #     ret, frame = cap.read()
+    #     if not ret:
+    #         break
+    #     compositor.apply(frame)
+    #     cv2.imshow("Watermarked", frame)
+
+    # -----------------------------
+    # 7. Display
+    # -----------------------------
+
+    cv2.imshow("Overlay Compositor", result)
+    cv2.waitKey(0)
+    cv2.destroyAllWindows()
+
+"""
+Summary:
+- Premultiplying the overlay once removes per-frame multiplications
+- The resized overlay is cached per frame resolution
+- Only the overlay's ROI is touched, so cost scales with logo area
+- BGRA alpha channels give soft edges and transparent backgrounds
+- apply(frame) drops straight into any capture loop
+"""
@@ -0,0 +1,398 @@
+"""
+PHASE 3 — Video & Real-Time Vision
+Day 11: Threaded Video Reader (Prefetch Queue)
+
+Concepts:
+- cap.read() blocks while the next frame is decoded
+- Decoding on a background thread overlaps I/O with processing
+- Bounded ring buffer between reader and consumer
+- Frame-drop policies: block, drop oldest, latest frame only
+- Measuring decode FPS, queue depth and dropped frames
+- Synthetic camera for testing without hardware
+"""
+
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+# ----------------------------------
+# 1. Synthetic camera
+# ----------------------------------
+
+class SyntheticCapture:
+    """
+    Drop-in stand-in for cv2.VideoCapture producing seeded frames.
+
+    Draws a few moving rectangles over a noisy background so motion
+    pipelines have something to detect. decode_delay (seconds) simulates
+    the time a real camera / decoder needs per frame.
+    """
+
+    def __init__(self, width=640, height=480, fps=30.0, num_frames=None,
+                 num_objects=3, seed=0, decode_delay=0.0):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.num_frames = num_frames
+        self.decode_delay = decode_delay
+        self.position = 0
+        self._opened = True
+
+        rng = np.random.default_rng(seed)
+        self._background = rng.integers(
+            0, 40, (height, width, 3), dtype=np.uint8
+        )
+        size = np.array([width, height])
+        self._boxes = rng.uniform(0.05, 0.2, (num_objects, 2)) * size
+        self._starts = rng.uniform(0, 1, (num_objects, 2)) * size
+        self._speeds = rng.uniform(-12, 12, (num_objects, 2))
+        self._colors = rng.integers(80, 256, (num_objects, 3))
+
+    def isOpened(self):
+        return self._opened
+
+    def grab(self):
+        if not self._opened:
+            return False
+        if self.num_frames is not None and self.position >= self.num_frames:
+            return False
+        if self.decode_delay:
+            time.sleep(self.decode_delay)
+        self.position += 1
+        return True
+
+    def retrieve(self):
+        frame = self._background.copy()
+        size = np.array([self.width, self.height])
+        t = self.position - 1
+
+        for box, start, speed, color in zip(
+            self._boxes, self._starts, self._speeds, self._colors
+        ):
+            # Bounce around inside the frame
+            span = np.maximum(size - box, 1)
+            pos = np.abs((start + speed * t) % (2 * span) - span)
+            x, y = pos.astype(int)
+            w, h = box.astype(int)
+            cv2.rectangle(frame, (x, y), (x + w, y + h),
+                          tuple(int(c) for c in color), -1)
+
+        return True, frame
+
+    def read(self):
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height)
+        if prop == cv2.CAP_PROP_FPS:
+            return float(self.fps)
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return float(self.num_frames or 0)
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return float(self.position)
+        return 0.0
+
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            self.position = int(value)
+            return True
+        return False
+
+    def release(self):
+        self._opened = False
+
+
+# ----------------------------------
+# 2. Threaded reader
+# ----------------------------------
+
+POLICIES = ("block", "drop_oldest", "latest")
+
+
+class ThreadedVideoReader:
+    """
+    Wrap a capture and decode frames on a background thread.
+
+    source      : camera index, file path, or an opened capture object
+                  (anything with read() / release(), e.g. SyntheticCapture)
+    queue_size  : capacity of the ring buffer
+    policy      : "block"       - reader waits when the buffer is full
+                                  (no frame is lost, good for files)
+                  "drop_oldest" - oldest buffered frame is discarded
+                  "latest"      - read() always returns the newest frame
+                                  and discards older ones (live cameras)
+
+    read() has the same (ret, frame) contract as cv2.VideoCapture.read().
+    last_index / last_timestamp describe the frame read() returned last
+    (timestamp = time.perf_counter() when it came out of the capture).
+    If the capture raises, read() re-raises that error once the frames
+    already buffered have been returned.
+    """
+
+    def __init__(self, source, queue_size=8, policy="block"):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy '{policy}', expected one of {POLICIES}")
+        if queue_size < 1:
+            raise ValueError("queue_size must be at least 1")
+
+        if isinstance(source, (int, str)):
+            self.cap = cv2.VideoCapture(source)
+        else:
+            self.cap = source
+
+        if not self.cap.isOpened():
+            raise RuntimeError(f"Cannot open video source: {source}")
+
+        self.queue_size = queue_size
+        self.policy = policy
+        self.last_index = -1
+        self.last_timestamp = None
+
+        self._buffer = deque()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._finished = False
+        self._error = None
+        self._thread = None
+
+        self.decoded = 0
+        self.delivered = 0
+        self.dropped = 0
+        self._start_time = None
+        self._end_time = None
+        self._decode_time = 0.0
+
+    # ---- lifecycle ----
+
+    def start(self):
+        if self._thread is None:
+            self._start_time = time.perf_counter()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.release()
+
+    def release(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        self.cap.release()
+
+    def isOpened(self):
+        with self._cond:
+            return not (self._stopped or (self._finished and not self._buffer))
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    # ---- producer ----
+
+    def _run(self):
+        index = 0
+        try:
+            while True:
+                t0 = time.perf_counter()
+                ret, frame = self.cap.read()
+                t1 = time.perf_counter()
+
+                with self._cond:
+                    if self._stopped:
+                        break
+                    if not ret:
+                        break
+
+                    self._decode_time += t1 - t0
+                    self.decoded += 1
+
+                    if self.policy == "block":
+                        while len(self._buffer) >= self.queue_size and not self._stopped:
+                            self._cond.wait()
+                        if self._stopped:
+                            break
+                    elif len(self._buffer) >= self.queue_size:
+                        self._buffer.popleft()
+                        self.dropped += 1
+
+                    self._buffer.append((index, t1, frame))
+                    index += 1
+                    self._cond.notify_all()
+        except Exception as exc:
+            with self._cond:
+                self._error = exc
+        finally:
+            # End of stream, release() or an error: always wake read()
+            with self._cond:
+                self._finished = True
+                self._end_time = time.perf_counter()
+                self._cond.notify_all()
+
+    # ---- consumer ----
+
+    def read(self, timeout=None):
+        """Return (ret, frame); ret is False at end of stream or timeout."""
+        if self._thread is None:
+            self.start()
+
+        with self._cond:
+            ready = self._cond.wait_for(
+                lambda: self._buffer or self._finished or self._stopped,
+                timeout
+            )
+            if not self._buffer and self._error is not None:
+                raise self._error
+            if not ready or not self._buffer:
+                return False, None
+
+            if self.policy == "latest" and len(self._buffer) > 1:
+                self.dropped += len(self._buffer) - 1
+                index, t_capture, frame = self._buffer.pop()
+                self._buffer.clear()
+            else:
+                index, t_capture, frame = self._buffer.popleft()
+
+            self.delivered += 1
+            self.last_index = index
+            self.last_timestamp = t_capture
+            self._cond.notify_all()
+            return True, frame
+
+    # ---- metrics ----
+
+    def stats(self):
+        with self._cond:
+            now = time.perf_counter()
+            elapsed = (self._end_time or now) - (self._start_time or now)
+            return {
+                "decode_fps": self.decoded / elapsed if elapsed > 0 else 0.0,
+                "decode_ms": 1000 * self._decode_time / max(self.decoded, 1),
+                "queue_depth": len(self._buffer),
+                "decoded": self.decoded,
+                "delivered": self.delivered,
+                "dropped": self.dropped,
+            }
+
+
+def _process(frame, work_delay):
+    # Stand-in for per-frame analysis (blur + edges + extra work)
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    cv2.Canny(cv2.GaussianBlur(gray, (5, 5), 0), 50, 150)
+    time.sleep(work_delay)
+
+
+if __name__ == "__main__":
+
+    # ----------------------------------
+    # 3. Synchronous baseline
+    # ----------------------------------
+
+    num_frames = 60
+    decode_delay = 0.01   # 10 ms per decoded frame
+    work_delay = 0.01     # 10 ms of processing per frame
+
+    cap = SyntheticCapture(num_frames=num_frames, decode_delay=decode_delay)
+
+    start = time.perf_counter()
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        _process(frame, work_delay)
+    sync_time = time.perf_counter() - start
+    cap.release()
+
+    print(f"Synchronous loop: {num_frames / sync_time:.1f} FPS")
+
+    # ----------------------------------
+    # 4. Threaded reader (no frames lost)
+    # ----------------------------------
+
+    source = SyntheticCapture(num_frames=num_frames, decode_delay=decode_delay)
+
+    start = time.perf_counter()
+    with ThreadedVideoReader(source, queue_size=8, policy="block") as reader:
+        while True:
+            ret, frame = reader.read()
+            if not ret:
+                break
+            _process(frame, work_delay)
+        stats = reader.stats()
+    threaded_time = time.perf_counter() - start
+
+    print(f"Threaded loop:    {num_frames / threaded_time:.1f} FPS")
+    print("Reader stats:", stats)
+
+    # ----------------------------------
+    # 5. Live camera policy: always the latest frame
+    # ----------------------------------
+
+    # Processing is 3x slower than the camera: old frames are skipped
+    source = SyntheticCapture(num_frames=num_frames, decode_delay=decode_delay)
+
+    with ThreadedVideoReader(source, queue_size=4, policy="latest") as reader:
+        processed = 0
+        while True:
+            ret, frame = reader.read()
+            if not ret:
+                break
+            _process(frame, 3 * work_delay)
+            processed += 1
+        stats = reader.stats()
+
+    print("Latest-frame policy processed:", processed, "of", num_frames)
+    print("Dropped frames:", stats["dropped"])
+
+    # ----------------------------------
+    # 6. Video file playback
+    # ----------------------------------
+
+    video_path = "sample_video.mp4"  # Replace with your video path
+
+    reader = ThreadedVideoReader(video_path, queue_size=16, policy="block")
+    print("Press 'q' to stop playback.")
+
+    while True:
+        ret, frame = reader.read()
+        if not ret:
+            print("End of video reached.")
+            break
+
+        cv2.imshow("Threaded Playback", frame)
+
+        if cv2.waitKey(1) & 0xFF == ord('q'):
+            print("Playback stopped by user.")
+            break
+
+    print("Reader stats:", reader.stats())
+
+    # ----------------------------------
+    # 7. Release Resources
+    # ----------------------------------
+
+    reader.release()
+    cv2.destroyAllWindows()
+    print("Resources released successfully.")
+
+"""
+Summary:
+- A background thread decodes while the main loop processes
+- The bounded buffer caps memory and latency
+- "block" keeps every frame (files), "latest" minimizes lag (cameras)
+- drop_oldest keeps a short backlog but never stalls the decoder
+- stats() exposes decode FPS, queue depth and dropped frames
+- SyntheticCapture lets the pipeline run without a camera
+"""
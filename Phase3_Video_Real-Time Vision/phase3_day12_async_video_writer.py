@@ -0,0 +1,332 @@
+"""
+PHASE 3 — Video & Real-Time Vision
+Day 12: Asynchronous VideoWriter (Encode Thread)
+
+Concepts:
+- out.write(frame) encodes inline and stalls the capture loop
+- Handing frames to a background encode thread
+- Bounded queue with backpressure or drop-with-accounting
+- Splitting recordings into time-segmented files
+- Flushing every queued frame on shutdown
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+import cv2
+
+from phase3_day11_threaded_video_reader import SyntheticCapture
+
+# ----------------------------------
+# 1. Segment file names
+# ----------------------------------
+
+def segment_path(path, index):
+    """'out.avi' -> 'out_000.avi'; '{}' / '{:03d}' patterns are formatted."""
+    if "{" in path:
+        return path.format(index)
+    root, ext = os.path.splitext(path)
+    return f"{root}_{index:03d}{ext}"
+
+
+# ----------------------------------
+# 2. Async writer
+# ----------------------------------
+
+WRITE_POLICIES = ("block", "drop")
+
+
+class AsyncVideoWriter:
+    """
+    cv2.VideoWriter replacement that encodes on a background thread.
+
+    path            : output file; with segment_seconds set, every segment
+                      gets its own file (see segment_path)
+    fourcc          : codec string, e.g. "XVID", "MJPG", "mp4v"
+    fps             : frames per second of the output
+    frame_size      : (width, height); None takes it from the first frame
+    queue_size      : maximum number of frames waiting to be encoded
+    policy          : "block" - write() waits when the queue is full
+                      "drop"  - write() drops the frame and counts it
+    segment_seconds : start a new file every N seconds of video
+    writer_factory  : callable(path, fourcc, fps, size) -> writer
+    """
+
+    def __init__(self, path, fourcc="XVID", fps=20.0, frame_size=None,
+                 queue_size=64, policy="block", segment_seconds=None,
+                 writer_factory=cv2.VideoWriter):
+        if policy not in WRITE_POLICIES:
+            raise ValueError(f"Unknown policy '{policy}', expected one of {WRITE_POLICIES}")
+
+        self.path = path
+        self.fourcc = cv2.VideoWriter_fourcc(*fourcc)
+        self.fps = fps
+        self.frame_size = frame_size
+        self.queue_size = queue_size
+        self.policy = policy
+        self.writer_factory = writer_factory
+
+        self.frames_per_segment = (
+            None if segment_seconds is None
+            else max(1, int(round(segment_seconds * fps)))
+        )
+
+        self.segments = []
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._error = None
+        self._encode_time = 0.0
+        self._max_depth = 0
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    def isOpened(self):
+        return not self._closed
+
+    # ---- producer side ----
+
+    def write(self, frame, timeout=None):
+        """
+        Queue a frame for encoding. Returns False if it was dropped.
+
+        The frame is not copied: do not modify it after writing.
+        """
+        with self._cond:
+            self._raise_if_failed()
+            if self._closed:
+                raise RuntimeError("Writer is closed")
+
+            if len(self._queue) >= self.queue_size:
+                if self.policy == "drop":
+                    self.dropped += 1
+                    return False
+                has_space = self._cond.wait_for(
+                    lambda: len(self._queue) < self.queue_size or self._error,
+                    timeout
+                )
+                self._raise_if_failed()
+                if not has_space:
+                    self.dropped += 1
+                    return False
+
+            self._queue.append(frame)
+            self.submitted += 1
+            self._max_depth = max(self._max_depth, len(self._queue))
+            self._cond.notify_all()
+            return True
+
+    def release(self):
+        """Encode every queued frame, then close the current file."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        self._raise_if_failed()
+
+    close = release
+
+    def _raise_if_failed(self):
+        if self._error is not None:
+            raise RuntimeError("Encoder thread failed") from self._error
+
+    # ---- encode thread ----
+
+    def _open_segment(self, frame):
+        if self.frame_size is None:
+            self.frame_size = (frame.shape[1], frame.shape[0])
+
+        path = (self.path if self.frames_per_segment is None
+                else segment_path(self.path, len(self.segments)))
+        writer = self.writer_factory(path, self.fourcc, self.fps,
+                                     self.frame_size)
+        if hasattr(writer, "isOpened") and not writer.isOpened():
+            raise RuntimeError(f"Cannot open VideoWriter for {path}")
+
+        self.segments.append(path)
+        return writer
+
+    def _run(self):
+        writer = None
+        in_segment = 0
+
+        try:
+            while True:
+                with self._cond:
+                    self._cond.wait_for(lambda: self._queue or self._closed)
+                    if not self._queue:
+                        break
+                    frame = self._queue.popleft()
+                    self._cond.notify_all()
+
+                if writer is not None and in_segment == self.frames_per_segment:
+                    writer.release()
+                    writer = None
+
+                if writer is None:
+                    writer = self._open_segment(frame)
+                    in_segment = 0
+
+                t0 = time.perf_counter()
+                writer.write(frame)
+                self._encode_time += time.perf_counter() - t0
+
+                in_segment += 1
+                with self._cond:
+                    self.written += 1
+
+        except Exception as exc:
+            with self._cond:
+                self._error = exc
+                self._queue.clear()
+                self._cond.notify_all()
+
+        finally:
+            if writer is not None:
+                writer.release()
+
+    # ---- metrics ----
+
+    def stats(self):
+        with self._cond:
+            return {
+                "submitted": self.submitted,
+                "written": self.written,
+                "dropped": self.dropped,
+                "queue_depth": len(self._queue),
+                "max_queue_depth": self._max_depth,
+                "encode_ms": 1000 * self._encode_time / max(self.written, 1),
+                "segments": len(self.segments),
+            }
+
+
+if __name__ == "__main__":
+
+    num_frames = 100
+    fps = 20
+    camera_delay = 0.02  # simulated 50 FPS camera
+
+    # ----------------------------------
+    # 3. Inline VideoWriter (baseline)
+    # ----------------------------------
+
+    cap = SyntheticCapture(width=1280, height=720, num_frames=num_frames,
+                           decode_delay=camera_delay)
+    fourcc = cv2.VideoWriter_fourcc(*'XVID')
+    out = cv2.VideoWriter("inline_output.avi", fourcc, fps, (1280, 720))
+
+    start = time.perf_counter()
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        out.write(frame)
+    inline_time = time.perf_counter() - start
+    out.release()
+
+    print(f"Inline write loop: {num_frames / inline_time:.1f} FPS")
+
+    # ----------------------------------
+    # 4. Async writer with time segments
+    # ----------------------------------
+
+    cap = SyntheticCapture(width=1280, height=720, num_frames=num_frames,
+                           decode_delay=camera_delay)
+    out = AsyncVideoWriter("async_output.avi", "XVID", fps,
+                           queue_size=64, segment_seconds=2)
+
+    start = time.perf_counter()
+    loop_time = 0.0
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        t0 = time.perf_counter()
+        out.write(frame)
+        loop_time += time.perf_counter() - t0
+    out.release()
+    total_time = time.perf_counter() - start
+
+    print(f"Async write loop:  {num_frames / total_time:.1f} FPS "
+          f"(write() cost {1000 * loop_time / num_frames:.2f} ms/frame)")
+    print("Segments:", out.segments)
+    print("Writer stats:", out.stats())
+
+    # ----------------------------------
+    # 5. Drop policy when the encoder falls behind
+    # ----------------------------------
+
+    # Source without delay: frames arrive faster than XVID can encode
+    cap = SyntheticCapture(width=1280, height=720, num_frames=num_frames)
+    out = AsyncVideoWriter("dropping_output.avi", "XVID", fps,
+                           queue_size=4, policy="drop")
+
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        out.write(frame)
+    out.release()
+
+    print("Drop policy stats:", out.stats())
+
+    # ----------------------------------
+    # 6. Webcam recording (Day 10 pipeline)
+    # ----------------------------------
+
+    cap = cv2.VideoCapture(0)
+
+    if not cap.isOpened():
+        raise RuntimeError("Cannot open webcam")
+
+    out = AsyncVideoWriter("output_day12.avi", "XVID", fps,
+                           segment_seconds=60)
+    print("Recording started. Press 'q' to stop.")
+
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            print("Failed to grab frame.")
+            break
+
+        frame = cv2.flip(frame, 1)
+        out.write(frame)
+
+        cv2.imshow("Recording", frame)
+
+        if cv2.waitKey(1) & 0xFF == ord('q'):
+            print("Stopping recording...")
+            break
+
+    # ----------------------------------
+    # 7. Cleanup
+    # ----------------------------------
+
+    cap.release()
+    out.release()  # flushes queued frames before closing
+    cv2.destroyAllWindows()
+
+    print("Saved segments:", out.segments)
+    print("Resources released successfully.")
+
+"""
+Summary:
+- Encoding runs on its own thread, the loop only enqueues frames
+- The bounded queue caps memory; "block" applies backpressure
+- "drop" keeps the loop at camera rate and counts lost frames
+- segment_seconds rotates output files by video time
+- release() drains the queue so no recorded frame is lost
+"""
@@ -0,0 +1,459 @@
+"""
+PHASE 3 — Video & Real-Time Vision
+Day 13: Frame-Processing Graphs
+
+Concepts:
+- Describing a video pipeline as a graph of stages
+- Stages: flip, color convert, blur, diff, threshold, contours, overlay, sink
+- Running independent stages in parallel on a worker pool
+- Pipelining: frame N+1 starts while frame N is still in flight
+- Stateful stages (frame diff, writers) keep frame order
+- Per-stage latency and throughput metrics
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from phase3_day11_threaded_video_reader import SyntheticCapture
+
+# ----------------------------------
+# 1. Stage metrics
+# ----------------------------------
+
+class StageStats:
+
+    def __init__(self):
+        self.calls = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def record(self, seconds):
+        self.calls += 1
+        self.total_time += seconds
+        self.max_time = max(self.max_time, seconds)
+
+    def as_dict(self, wall_time):
+        mean = self.total_time / self.calls if self.calls else 0.0
+        return {
+            "calls": self.calls,
+            "mean_ms": 1000 * mean,
+            "max_ms": 1000 * self.max_time,
+            # frames per second this stage alone could sustain
+            "stage_fps": 1 / mean if mean > 0 else 0.0,
+            # frames per second it actually processed in this run
+            "throughput_fps": self.calls / wall_time if wall_time > 0 else 0.0,
+        }
+
+
+class Stage:
+
+    def __init__(self, name, fn, inputs, stateful=False):
+        self.name = name
+        self.fn = fn
+        self.inputs = tuple(inputs)
+        self.stateful = stateful
+        self.stats = StageStats()
+
+
+# ----------------------------------
+# 2. Frame graph
+# ----------------------------------
+
+SOURCE = "source"
+
+
+class _FrameTask:
+
+    def __init__(self, frame_id, frame, pending):
+        self.frame_id = frame_id
+        self.values = {SOURCE: frame}
+        self.pending = pending
+        self.remaining = len(pending)
+        self.start_time = time.perf_counter()
+
+
+class FrameGraph:
+    """
+    Directed acyclic graph of per-frame processing stages.
+
+    Every stage is a callable taking the outputs of its input stages
+    (the raw frame is called "source") and returning one value.
+    Stages whose inputs are ready run concurrently on a thread pool
+    (OpenCV releases the GIL), and up to max_in_flight frames are
+    pipelined. Stateful stages always see frames in order.
+    """
+
+    def __init__(self, workers=4, max_in_flight=4):
+        self.workers = workers
+        self.max_in_flight = max_in_flight
+        self.stages = {}
+        self.frame_latency = deque(maxlen=1000)
+        self.wall_time = 0.0
+
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+
+    # ---- graph definition ----
+
+    def add(self, name, fn, inputs=(SOURCE,), stateful=False):
+        if name == SOURCE or name in self.stages:
+            raise ValueError(f"Stage name '{name}' is already used")
+        for dep in inputs:
+            if dep != SOURCE and dep not in self.stages:
+                raise ValueError(f"Stage '{name}' depends on unknown stage '{dep}'")
+
+        # Inputs must already exist, so insertion order is topological
+        self.stages[name] = Stage(name, fn, inputs, stateful)
+        return self
+
+    def successors(self, name):
+        return [s.name for s in self.stages.values() if name in s.inputs]
+
+    def leaves(self):
+        return [n for n in self.stages if not self.successors(n)]
+
+    # ---- sequential execution ----
+
+    def process(self, frame):
+        """Run every stage for one frame on the calling thread."""
+        values = {SOURCE: frame}
+        for stage in self.stages.values():
+            t0 = time.perf_counter()
+            values[stage.name] = stage.fn(*(values[i] for i in stage.inputs))
+            stage.stats.record(time.perf_counter() - t0)
+        return values
+
+    # ---- pipelined execution ----
+
+    def _submit(self, task, stage):
+        # Called with the lock held
+        if stage.stateful and task.frame_id != self._next_frame[stage.name]:
+            self._parked[stage.name][task.frame_id] = task
+            return
+        self._pool.submit(self._run_stage, task, stage)
+
+    def _start(self, frame_id, frame):
+        pending = {
+            name: sum(1 for i in s.inputs if i != SOURCE)
+            for name, s in self.stages.items()
+        }
+        task = _FrameTask(frame_id, frame, pending)
+        with self._lock:
+            for name, count in pending.items():
+                if count == 0:
+                    self._submit(task, self.stages[name])
+
+    def _run_stage(self, task, stage):
+        try:
+            args = [task.values[i] for i in stage.inputs]
+            t0 = time.perf_counter()
+            value = stage.fn(*args)
+            elapsed = time.perf_counter() - t0
+        except Exception as exc:
+            with self._lock:
+                self._error = exc
+                self._cond.notify_all()
+            return
+
+        with self._lock:
+            stage.stats.record(elapsed)
+            task.values[stage.name] = value
+
+            for succ in self._successors[stage.name]:
+                task.pending[succ] -= 1
+                if task.pending[succ] == 0:
+                    self._submit(task, self.stages[succ])
+
+            if stage.stateful:
+                self._next_frame[stage.name] += 1
+                parked = self._parked[stage.name].pop(task.frame_id + 1, None)
+                if parked is not None:
+                    self._pool.submit(self._run_stage, parked, stage)
+
+            task.remaining -= 1
+            if task.remaining == 0:
+                self.frame_latency.append(time.perf_counter() - task.start_time)
+                self._completed[task.frame_id] = task
+                self._cond.notify_all()
+
+    def run(self, source, max_frames=None, outputs=None):
+        """
+        Process frames from source and yield (frame_id, values) in order.
+
+        source  : capture object with read() or an iterable of frames
+        outputs : stage names to return (default: leaf stages)
+        """
+        outputs = list(outputs or self.leaves())
+        frames = _iter_frames(source)
+
+        self._successors = {n: self.successors(n) for n in self.stages}
+        self._next_frame = {n: 0 for n in self.stages}
+        self._parked = {n: {} for n in self.stages}
+        self._completed = {}
+        self._error = None
+
+        next_id = 0
+        next_out = 0
+        exhausted = False
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(self.workers) as pool:
+            self._pool = pool
+            try:
+                while True:
+                    # Keep up to max_in_flight frames in the pipeline
+                    while not exhausted and next_id - next_out < self.max_in_flight:
+                        if max_frames is not None and next_id >= max_frames:
+                            exhausted = True
+                            break
+                        frame = next(frames, None)
+                        if frame is None:
+                            exhausted = True
+                            break
+                        self._start(next_id, frame)
+                        next_id += 1
+
+                    if exhausted and next_out == next_id:
+                        break
+
+                    with self._cond:
+                        self._cond.wait_for(
+                            lambda: next_out in self._completed or self._error
+                        )
+                        if self._error is not None:
+                            raise self._error
+                        task = self._completed.pop(next_out)
+
+                    next_out += 1
+                    yield task.frame_id, {n: task.values[n] for n in outputs}
+            finally:
+                self.wall_time = time.perf_counter() - start
+
+    # ---- metrics ----
+
+    def stats(self):
+        wall = self.wall_time
+        latencies = np.array(self.frame_latency) * 1000
+        report = {name: s.stats.as_dict(wall) for name, s in self.stages.items()}
+        report["graph"] = {
+            "frames": len(latencies),
+            "latency_ms": float(latencies.mean()) if len(latencies) else 0.0,
+            "latency_p95_ms": (
+                float(np.percentile(latencies, 95)) if len(latencies) else 0.0
+            ),
+        }
+        return report
+
+    def reset_stats(self):
+        for stage in self.stages.values():
+            stage.stats = StageStats()
+        self.frame_latency.clear()
+
+
+def _iter_frames(source):
+    if hasattr(source, "read"):
+        while True:
+            ret, frame = source.read()
+            if not ret:
+                return
+            yield frame
+    else:
+        yield from source
+
+
+def print_stats(graph):
+    for name, s in graph.stats().items():
+        if name == "graph":
+            continue
+        print(f"  {name:<10} {s['mean_ms']:7.2f} ms  "
+              f"{s['stage_fps']:8.1f} stage FPS  "
+              f"{s['throughput_fps']:7.1f} FPS")
+    g = graph.stats()["graph"]
+    print(f"  frame latency {g['latency_ms']:.1f} ms "
+          f"(p95 {g['latency_p95_ms']:.1f} ms)")
+
+
+# ----------------------------------
+# 3. Stage library
+# ----------------------------------
+
+def flip(code=1):
+    return lambda frame: cv2.flip(frame, code)
+
+
+def convert_color(code=cv2.COLOR_BGR2GRAY):
+    return lambda frame: cv2.cvtColor(frame, code)
+
+
+def gaussian_blur(ksize=21):
+    return lambda img: cv2.GaussianBlur(img, (ksize, ksize), 0)
+
+
+def frame_diff():
+    """Absolute difference to the previous frame (stateful)."""
+    state = {"prev": None}
+
+    def diff(img):
+        prev = img if state["prev"] is None else state["prev"]
+        state["prev"] = img
+        return cv2.absdiff(prev, img)
+
+    return diff
+
+
+def threshold(value=25):
+    return lambda img: cv2.threshold(img, value, 255, cv2.THRESH_BINARY)[1]
+
+
+def find_boxes(min_area=1000):
+    def boxes(mask):
+        contours, _ = cv2.findContours(
+            mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
+        )
+        return [cv2.boundingRect(c) for c in contours
+                if cv2.contourArea(c) >= min_area]
+    return boxes
+
+
+def draw_boxes(color=(0, 255, 0)):
+    def draw(frame, boxes):
+        # Draw on a copy: other stages may still read the source frame
+        out = frame.copy()
+        for x, y, w, h in boxes:
+            cv2.rectangle(out, (x, y), (x + w, y + h), color, 2)
+        return out
+    return draw
+
+
+def overlay_text(text, org=(20, 40), color=(0, 255, 0)):
+    def overlay(frame):
+        out = frame.copy()
+        cv2.putText(out, text, org, cv2.FONT_HERSHEY_SIMPLEX, 1, color, 2)
+        return out
+    return overlay
+
+
+def writer_sink(writer):
+    """Write frames to a VideoWriter (use stateful=True to keep order)."""
+    def sink(frame):
+        writer.write(frame)
+        return frame
+    return sink
+
+
+# ----------------------------------
+# 4. Phase 3 scripts as graphs
+# ----------------------------------
+
+def webcam_gray_graph(**kwargs):
+    """Day 3: mirror + grayscale."""
+    graph = FrameGraph(**kwargs)
+    graph.add("flip", flip(1))
+    graph.add("gray", convert_color(cv2.COLOR_BGR2GRAY), ["flip"])
+    return graph
+
+
+def recording_graph(writer, text="Phase 3 - Day 10 Recording", **kwargs):
+    """Day 10: mirror + text overlay + VideoWriter sink."""
+    graph = FrameGraph(**kwargs)
+    graph.add("flip", flip(1))
+    graph.add("overlay", overlay_text(text), ["flip"])
+    graph.add("sink", writer_sink(writer), ["overlay"], stateful=True)
+    return graph
+
+
+def motion_tracking_graph(blur=21, thresh=25, min_area=1000, **kwargs):
+    """Day 9: blur -> frame diff -> threshold -> contours -> boxes."""
+    graph = FrameGraph(**kwargs)
+    graph.add("gray", convert_color(cv2.COLOR_BGR2GRAY))
+    graph.add("blur", gaussian_blur(blur), ["gray"])
+    graph.add("diff", frame_diff(), ["blur"], stateful=True)
+    graph.add("thresh", threshold(thresh), ["diff"])
+    graph.add("boxes", find_boxes(min_area), ["thresh"])
+    graph.add("annotated", draw_boxes(), [SOURCE, "boxes"])
+    return graph
+
+
+if __name__ == "__main__":
+
+    num_frames = 150
+
+    # ----------------------------------
+    # 5. Sequential execution (one frame at a time)
+    # ----------------------------------
+
+    graph = motion_tracking_graph()
+    cap = SyntheticCapture(width=1280, height=720, num_frames=num_frames)
+
+    start = time.perf_counter()
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        graph.process(frame)
+    sequential_time = time.perf_counter() - start
+
+    print(f"Sequential motion tracking: {num_frames / sequential_time:.1f} FPS")
+
+    # ----------------------------------
+    # 6. Pipelined execution on a worker pool
+    # ----------------------------------
+
+    graph = motion_tracking_graph(workers=4, max_in_flight=6)
+    cap = SyntheticCapture(width=1280, height=720, num_frames=num_frames)
+
+    start = time.perf_counter()
+    moving = 0
+    for frame_id, out in graph.run(cap, outputs=["annotated", "boxes"]):
+        moving += len(out["boxes"])
+    pipelined_time = time.perf_counter() - start
+
+    print(f"Pipelined motion tracking:  {num_frames / pipelined_time:.1f} FPS")
+    print("Boxes detected:", moving)
+    print("Per-stage metrics:")
+    print_stats(graph)
+
+    # ----------------------------------
+    # 7. Live webcam (Day 9 as a graph)
+    # ----------------------------------
+
+    cap = cv2.VideoCapture(0)
+
+    if not cap.isOpened():
+        raise RuntimeError("Cannot open webcam")
+
+    graph = motion_tracking_graph()
+    print("Motion tracking started. Press 'q' to exit.")
+
+    for frame_id, out in graph.run(cap, outputs=["annotated"]):
+        # HighGUI calls stay on the main thread
+        cv2.imshow("Motion Tracking", out["annotated"])
+
+        if cv2.waitKey(1) & 0xFF == ord('q'):
+            print("Exiting...")
+            break
+
+    # ----------------------------------
+    # 8. Cleanup
+    # ----------------------------------
+
+    cap.release()
+    cv2.destroyAllWindows()
+
+    print_stats(graph)
+    print("Resources released.")
+
+"""
+Summary:
+- A pipeline is a graph: each stage names the stages it reads from
+- Ready stages run concurrently on a thread pool
+- Several frames are in flight at once (pipelining)
+- Stateful stages (diff, writers) are forced into frame order
+- Per-stage mean latency, stage FPS and throughput come for free
+- Day 3, Day 9 and Day 10 loops become short graph definitions
+"""
@@ -0,0 +1,273 @@
+"""
+PHASE 3 — Video & Real-Time Vision
+Day 15: Frame-Accurate Seek Index
+
+Concepts:
+- Compressed video can only be decoded forward from a keyframe
+- CAP_PROP_POS_FRAMES seeks are not always frame-accurate
+- One sequential scan records timestamps and verified seek points
+- A sidecar index file avoids rescanning the video
+- Random access = seek to nearest seek point + decode forward
+- Strided reads reuse the decoder position between targets
+"""
+
+import bisect
+import hashlib
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+# ----------------------------------
+# 1. Frame fingerprints
+# ----------------------------------
+
+def frame_fingerprint(frame):
+    """Short hash of a downscaled grayscale frame."""
+    if frame.ndim == 3:
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    thumb = cv2.resize(frame, (32, 32), interpolation=cv2.INTER_AREA)
+    return hashlib.blake2b(thumb.tobytes(), digest_size=8).hexdigest()
+
+
+def index_path_for(video_path):
+    return video_path + ".seekidx.json"
+
+
+def _file_signature(path):
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime": int(st.st_mtime)}
+
+
+# ----------------------------------
+# 2. Seek index
+# ----------------------------------
+
+class VideoSeekIndex:
+    """
+    Random access into a video file through verified seek points.
+
+    OpenCV does not expose keyframe flags, so the index stores
+    "seek points": frames where a CAP_PROP_POS_FRAMES seek was checked to
+    land on exactly the frame a sequential decode produces. Any frame is
+    then read by seeking to the nearest seek point at or before it and
+    decoding forward with grab().
+    """
+
+    def __init__(self, video_path, meta):
+        self.video_path = video_path
+        self.meta = meta
+        self.timestamps = meta["timestamps_ms"]
+        self.seek_points = [p[0] for p in meta["seek_points"]]
+        self.cap = None
+        self.position = None  # index of the next frame the decoder returns
+
+        self.seeks = 0
+        self.grabs = 0
+
+    def __len__(self):
+        return self.meta["frame_count"]
+
+    @property
+    def fps(self):
+        return self.meta["fps"]
+
+    # ---- building ----
+
+    @classmethod
+    def build(cls, video_path, seek_every=None, save=True):
+        """Scan the video once and verify seek points every seek_every frames."""
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise FileNotFoundError(f"Cannot open video file: {video_path}")
+
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        if seek_every is None:
+            seek_every = max(1, int(round(fps)))
+
+        # Pass 1: sequential decode, timestamps + candidate fingerprints
+        timestamps = []
+        candidates = {}
+        while cap.grab():
+            index = len(timestamps)
+            timestamps.append(cap.get(cv2.CAP_PROP_POS_MSEC))
+            if index % seek_every == 0:
+                _, frame = cap.retrieve()
+                candidates[index] = frame_fingerprint(frame)
+
+        # Pass 2: keep only candidates a seek reproduces exactly
+        seek_points = []
+        for index, fingerprint in candidates.items():
+            if index == 0:
+                seek_points.append([0, timestamps[0], fingerprint])
+                continue
+            cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+            ret, frame = cap.read()
+            if ret and frame_fingerprint(frame) == fingerprint:
+                seek_points.append([index, timestamps[index], fingerprint])
+
+        cap.release()
+
+        meta = {
+            "video": os.path.basename(video_path),
+            **_file_signature(video_path),
+            "frame_count": len(timestamps),
+            "fps": fps,
+            "seek_every": seek_every,
+            "timestamps_ms": timestamps,
+            "seek_points": seek_points,
+        }
+
+        if save:
+            with open(index_path_for(video_path), "w") as f:
+                json.dump(meta, f)
+
+        return cls(video_path, meta)
+
+    @classmethod
+    def load(cls, video_path, rebuild=True, **build_kwargs):
+        """Load the sidecar index, rebuilding it if missing or stale."""
+        path = index_path_for(video_path)
+        if os.path.exists(path):
+            with open(path) as f:
+                meta = json.load(f)
+            signature = _file_signature(video_path)
+            if all(meta.get(k) == v for k, v in signature.items()):
+                return cls(video_path, meta)
+        if not rebuild:
+            raise FileNotFoundError(f"No valid index for {video_path}")
+        return cls.build(video_path, **build_kwargs)
+
+    # ---- reading ----
+
+    def _open(self):
+        if self.cap is None:
+            self.cap = cv2.VideoCapture(self.video_path)
+            self.position = 0
+
+    def _seek_point_before(self, index):
+        i = bisect.bisect_right(self.seek_points, index) - 1
+        return self.seek_points[max(i, 0)]
+
+    def read(self, index):
+        """Return frame number `index` (BGR)."""
+        if not 0 <= index < len(self):
+            raise IndexError(f"Frame {index} out of range [0, {len(self)})")
+
+        self._open()
+        start = self._seek_point_before(index)
+
+        # Decoding forward from the current position beats a seek unless
+        # it is more than about one seek interval further away
+        forward = index - self.position
+        if not 0 <= forward <= (index - start) + self.meta["seek_every"]:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+            self.position = start
+            self.seeks += 1
+
+        while self.position < index:
+            self.cap.grab()
+            self.position += 1
+            self.grabs += 1
+
+        ret, frame = self.cap.read()
+        if not ret:
+            raise RuntimeError(f"Failed to decode frame {index}")
+        self.position += 1
+        return frame
+
+    def read_many(self, indices):
+        """Read several frames, visiting them in file order."""
+        order = sorted(set(indices))
+        frames = {i: self.read(i) for i in order}
+        return [frames[i] for i in indices]
+
+    def read_strided(self, start=0, stop=None, step=1):
+        return self.read_many(range(start, len(self) if stop is None else stop, step))
+
+    def frame_at_time(self, ms):
+        """Index of the last frame whose timestamp is <= ms."""
+        return max(bisect.bisect_right(self.timestamps, ms) - 1, 0)
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+
+def read_frame_naive(video_path, index):
+    """Decode from the start until frame `index` (no index)."""
+    cap = cv2.VideoCapture(video_path)
+    for _ in range(index):
+        cap.grab()
+    ret, frame = cap.read()
+    cap.release()
+    return frame
+
+
+if __name__ == "__main__":
+
+    # ----------------------------------
+    # 3. Build (or load) the index
+    # ----------------------------------
+
+    video_path = "sample_video.mp4"  # Replace with your video path
+
+    start = time.perf_counter()
+    index = VideoSeekIndex.load(video_path)
+    print(f"Index ready in {time.perf_counter() - start:.2f} s "
+          f"({index_path_for(video_path)})")
+    print("Frames:", len(index), "FPS:", index.fps)
+    print("Verified seek points:", len(index.seek_points))
+
+    # ----------------------------------
+    # 4. Random access: naive vs indexed
+    # ----------------------------------
+
+    rng = np.random.default_rng(0)
+    targets = rng.integers(0, len(index), 10).tolist()
+
+    start = time.perf_counter()
+    naive = [read_frame_naive(video_path, i) for i in targets]
+    naive_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    indexed = [index.read(i) for i in targets]
+    indexed_time = time.perf_counter() - start
+
+    same = all(np.array_equal(a, b) for a, b in zip(naive, indexed))
+
+    print(f"Naive decode-from-start: {1000 * naive_time / len(targets):.1f} ms/frame")
+    print(f"Indexed random access:   {1000 * indexed_time / len(targets):.1f} ms/frame")
+    print("Frames identical:", same)
+
+    # ----------------------------------
+    # 5. Strided sampling (e.g. training clips)
+    # ----------------------------------
+
+    start = time.perf_counter()
+    clip = index.read_strided(0, len(index), step=5)
+    print(f"Strided read of {len(clip)} frames: "
+          f"{1000 * (time.perf_counter() - start):.1f} ms")
+    print("Seeks:", index.seeks, "Grabs:", index.grabs)
+
+    # ----------------------------------
+    # 6. Seek by timestamp
+    # ----------------------------------
+
+    t_ms = 1000.0
+    frame_id = index.frame_at_time(t_ms)
+    print(f"Frame at {t_ms:.0f} ms:", frame_id)
+
+    index.release()
+
+"""
+Summary:
+- One scan records every frame timestamp and verified seek points
+- Seek points are checked against a sequential decode (frame-accurate)
+- The sidecar JSON index is reused until the video file changes
+- read(i) seeks to the nearest seek point and grabs forward
+- Sorted / strided reads keep decoding forward instead of reseeking
+"""
@@ -0,0 +1,287 @@
+"""
+PHASE 3 — Video & Real-Time Vision
+Day 16: Background-Subtraction Motion Detector
+
+Concepts:
+- Running-average background model (cv2.accumulateWeighted)
+- MOG2 background subtractor as an alternative model
+- Detecting on a downscaled pyramid level, not full resolution
+- In-place updates into preallocated buffers
+- Full-resolution refinement only inside motion ROIs
+- Frames per second per core -> streams per core
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+from phase3_day11_threaded_video_reader import SyntheticCapture
+
+# ----------------------------------
+# 1. Day 9 detector (reference)
+# ----------------------------------
+
+class FrameDiffDetector:
+    """Day 9 pipeline: full-resolution blur + diff to the previous frame."""
+
+    def __init__(self, threshold=25, min_area=1000):
+        self.threshold = threshold
+        self.min_area = min_area
+        self.prev_gray = None
+
+    def detect(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        gray = cv2.GaussianBlur(gray, (21, 21), 0)
+        if self.prev_gray is None:
+            self.prev_gray = gray
+
+        diff = cv2.absdiff(self.prev_gray, gray)
+        _, thresh = cv2.threshold(diff, self.threshold, 255, cv2.THRESH_BINARY)
+        self.prev_gray = gray
+
+        contours, _ = cv2.findContours(
+            thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
+        )
+        return [cv2.boundingRect(c) for c in contours
+                if cv2.contourArea(c) >= self.min_area]
+
+
+# ----------------------------------
+# 2. Background-model detector
+# ----------------------------------
+
+class MotionDetector:
+    """
+    Motion boxes from a background model on a downscaled frame.
+
+    levels        : pyramid level to analyse (frame is scaled by 1 / 2**levels)
+    method        : "running_average" (accumulateWeighted) or "mog2"
+    learning_rate : how fast the background adapts
+    threshold     : difference needed to count a pixel as moving
+    min_area      : minimum box area in full-resolution pixels
+    refine        : tighten each box with a full-resolution diff of its ROI
+    """
+
+    def __init__(self, levels=2, method="running_average", learning_rate=0.05,
+                 threshold=25, min_area=1000, blur=5, refine=True,
+                 roi_padding=8):
+        if method not in ("running_average", "mog2"):
+            raise ValueError(f"Unknown method '{method}'")
+
+        self.levels = levels
+        self.scale = 2 ** levels
+        self.method = method
+        self.learning_rate = learning_rate
+        self.threshold = threshold
+        self.min_area = min_area
+        self.blur = blur
+        self.refine = refine
+        self.roi_padding = roi_padding
+
+        self.kernel = np.ones((3, 3), np.uint8)
+        self.background = None   # float32 running average (small)
+        self.mog2 = None
+        self._buffers = None
+        self._frame_size = None
+
+    @property
+    def last_mask(self):
+        """Motion mask of the last frame at the analysed pyramid level."""
+        return None if self._buffers is None else self._buffers["mask"]
+
+    def reset(self):
+        self.background = None
+        self.mog2 = None
+        self._buffers = None
+
+    # ---- low-resolution model ----
+
+    def _allocate(self, frame):
+        h, w = frame.shape[:2]
+        size = (max(1, w // self.scale), max(1, h // self.scale))
+        self._frame_size = (w, h)
+        self._buffers = {
+            "small": np.empty((size[1], size[0], 3), np.uint8),
+            "gray": np.empty((size[1], size[0]), np.uint8),
+            "bg8": np.empty((size[1], size[0]), np.uint8),
+            "diff": np.empty((size[1], size[0]), np.uint8),
+            "mask": np.empty((size[1], size[0]), np.uint8),
+        }
+
+    def foreground(self, frame):
+        """Binary motion mask at the analysed pyramid level."""
+        if self._buffers is None or self._frame_size != frame.shape[1::-1]:
+            self._allocate(frame)
+            self.background = None
+            self.mog2 = None
+        b = self._buffers
+        size = b["gray"].shape[::-1]
+
+        cv2.resize(frame, size, dst=b["small"], interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(b["small"], cv2.COLOR_BGR2GRAY, dst=b["gray"])
+        if self.blur:
+            cv2.GaussianBlur(b["gray"], (self.blur, self.blur), 0, dst=b["gray"])
+
+        if self.method == "mog2":
+            if self.mog2 is None:
+                self.mog2 = cv2.createBackgroundSubtractorMOG2(
+                    history=500, varThreshold=self.threshold,
+                    detectShadows=False
+                )
+            fg = self.mog2.apply(b["gray"], learningRate=self.learning_rate)
+            cv2.threshold(fg, 127, 255, cv2.THRESH_BINARY, dst=b["mask"])
+        else:
+            if self.background is None:
+                self.background = b["gray"].astype(np.float32)
+            cv2.convertScaleAbs(self.background, dst=b["bg8"])
+            cv2.absdiff(b["gray"], b["bg8"], dst=b["diff"])
+            cv2.threshold(b["diff"], self.threshold, 255, cv2.THRESH_BINARY,
+                          dst=b["mask"])
+            # background = (1 - lr) * background + lr * gray, in place
+            cv2.accumulateWeighted(b["gray"], self.background,
+                                   self.learning_rate)
+
+        cv2.dilate(b["mask"], self.kernel, dst=b["mask"], iterations=2)
+        return b["mask"]
+
+    # ---- full-resolution refinement ----
+
+    def _refine_box(self, frame, box):
+        x, y, w, h = box
+        fh, fw = frame.shape[:2]
+        p = self.roi_padding
+        x0, y0 = max(x - p, 0), max(y - p, 0)
+        x1, y1 = min(x + w + p, fw), min(y + h + p, fh)
+
+        roi_gray = cv2.cvtColor(frame[y0:y1, x0:x1], cv2.COLOR_BGR2GRAY)
+        roi_gray = cv2.GaussianBlur(roi_gray, (5, 5), 0)
+
+        # Background for the same ROI, upsampled from the small model
+        if self.method == "mog2":
+            small_bg = self.mog2.getBackgroundImage()
+        else:
+            small_bg = self._buffers["bg8"]
+        s = self.scale
+        sh, sw = small_bg.shape[:2]
+        sx0, sy0 = min(x0 // s, sw - 1), min(y0 // s, sh - 1)
+        sx1, sy1 = min(-(-x1 // s), sw), min(-(-y1 // s), sh)
+        bg_roi = cv2.resize(small_bg[sy0:sy1, sx0:sx1], (x1 - x0, y1 - y0),
+                            interpolation=cv2.INTER_LINEAR)
+
+        diff = cv2.absdiff(roi_gray, bg_roi)
+        _, mask = cv2.threshold(diff, self.threshold, 255, cv2.THRESH_BINARY)
+        if cv2.countNonZero(mask) == 0:
+            return None
+
+        rx, ry, rw, rh = cv2.boundingRect(mask)
+        return (x0 + rx, y0 + ry, rw, rh)
+
+    # ---- public API ----
+
+    def detect(self, frame):
+        """Return motion boxes (x, y, w, h) in full-resolution pixels."""
+        mask = self.foreground(frame)
+        contours, _ = cv2.findContours(
+            mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
+        )
+
+        s = self.scale
+        min_small_area = self.min_area / (s * s)
+        boxes = []
+        for cnt in contours:
+            if cv2.contourArea(cnt) < min_small_area:
+                continue
+            x, y, w, h = cv2.boundingRect(cnt)
+            box = (x * s, y * s, w * s, h * s)
+            if self.refine:
+                box = self._refine_box(frame, box)
+                if box is None:
+                    continue
+            boxes.append(box)
+        return boxes
+
+
+def benchmark(detector, num_frames=150, width=1920, height=1080):
+    cap = SyntheticCapture(width=width, height=height, num_frames=num_frames)
+    frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+
+    total_boxes = 0
+    start = time.perf_counter()
+    for frame in frames:
+        total_boxes += len(detector.detect(frame))
+    elapsed = time.perf_counter() - start
+    return len(frames) / elapsed, total_boxes
+
+
+if __name__ == "__main__":
+
+    camera_fps = 30
+
+    # ----------------------------------
+    # 3. Day 9 detector vs background model (1080p)
+    # ----------------------------------
+
+    detectors = {
+        "Day 9 frame diff": FrameDiffDetector(),
+        "Running average (level 2)": MotionDetector(levels=2),
+        "Running average, no refine": MotionDetector(levels=2, refine=False),
+        "MOG2 (level 2)": MotionDetector(levels=2, method="mog2"),
+    }
+
+    for name, detector in detectors.items():
+        fps, boxes = benchmark(detector)
+        print(f"{name:<28} {fps:7.1f} FPS  "
+              f"~{fps / camera_fps:5.1f} streams/core @ {camera_fps} FPS  "
+              f"({boxes} boxes)")
+
+    # ----------------------------------
+    # 4. Live webcam
+    # ----------------------------------
+
+    cap = cv2.VideoCapture(0)
+
+    if not cap.isOpened():
+        raise RuntimeError("Cannot open webcam")
+
+    detector = MotionDetector(levels=2)
+    print("Motion detection started. Press 'q' to exit.")
+
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+
+        for x, y, w, h in detector.detect(frame):
+            cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+
+        cv2.imshow("Background Motion Detector", frame)
+        cv2.imshow("Foreground Mask (small)", detector.last_mask)
+
+        if cv2.waitKey(1) & 0xFF == ord('q'):
+            print("Exiting...")
+            break
+
+    # ----------------------------------
+    # 5. Cleanup
+    # ----------------------------------
+
+    cap.release()
+    cv2.destroyAllWindows()
+
+    print("Resources released.")
+
+"""
+Summary:
+- A background model beats diffing only against the previous frame
+- accumulateWeighted updates the model in place, no new arrays
+- Working at 1/4 resolution cuts per-frame work by ~16x
+- Full-resolution work happens only inside the detected ROIs
+- MOG2 handles multi-modal backgrounds (flicker, swaying trees)
+- Higher FPS per core means more camera streams per machine
+"""
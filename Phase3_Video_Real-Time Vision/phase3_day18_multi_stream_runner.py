@@ -0,0 +1,404 @@
+"""
+PHASE 3 — Video & Real-Time Vision
+Day 18: Multi-Stream Runner with a Shared Worker Pool
+
+Concepts:
+- Reading many cameras / files at once instead of one VideoCapture(0)
+- A fixed pool of worker processes shared by all streams
+- Sticky stream -> worker assignment keeps per-stream state in one place
+- Fair round-robin scheduling with a per-stream in-flight cap
+- Live streams skip stale frames instead of building up latency
+- Per-stream metrics: FPS, dropped frames, latency p50 / p95, SLO violations
+"""
+
+import multiprocessing as mp
+import os
+import queue
+import time
+import traceback
+from collections import deque
+
+import numpy as np
+
+from phase3_day11_threaded_video_reader import SyntheticCapture, ThreadedVideoReader
+from phase3_day13_frame_graph import motion_tracking_graph
+from phase3_day14_headless_runner import open_source
+from phase3_day16_background_motion_detector import MotionDetector
+from phase3_day17_multi_object_tracker import MultiObjectTracker
+
+# ----------------------------------
+# 1. Per-stream processors
+# ----------------------------------
+
+# A processor factory is called once per stream inside the worker that owns
+# the stream and returns a callable frame -> result. Results travel back to
+# the scheduler, so they should be small (boxes, not images).
+
+def motion_processor(stream_id):
+    """Day 9 graph (frame diff) -> list of boxes."""
+    graph = motion_tracking_graph(workers=1, max_in_flight=1)
+    return lambda frame: graph.process(frame)["boxes"]
+
+
+def tracking_processor(stream_id):
+    """Day 16 detector + Day 17 tracker -> list of (id, box)."""
+    detector = MotionDetector(levels=2)
+    tracker = MultiObjectTracker(min_iou=0.2)
+    return lambda frame: tracker.update(detector.detect(frame))
+
+
+# ----------------------------------
+# 2. Worker process
+# ----------------------------------
+
+def _worker_main(worker_id, processor_factory, inbox, outbox):
+    processors = {}
+    while True:
+        item = inbox.get()
+        if item is None:
+            break
+
+        stream_id, seq, t_capture, frame = item
+        try:
+            if stream_id not in processors:
+                processors[stream_id] = processor_factory(stream_id)
+            t0 = time.perf_counter()
+            result = processors[stream_id](frame)
+            busy = time.perf_counter() - t0
+        except Exception:
+            outbox.put(("error", worker_id, stream_id, traceback.format_exc()))
+            break
+
+        outbox.put(("result", worker_id, stream_id, (seq, t_capture, busy, result)))
+
+
+# ----------------------------------
+# 3. Stream bookkeeping
+# ----------------------------------
+
+class _Stream:
+
+    def __init__(self, stream_id, name, cap, worker):
+        self.stream_id = stream_id
+        self.name = name
+        self.cap = cap
+        self.worker = worker
+        self.reader = None
+        self.finished = False
+
+        self.seq = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.capped = 0          # times the stream had to wait for its cap
+        self.violations = 0
+        self.busy = 0.0
+        self.latency = deque(maxlen=2000)
+        self.last_result = None
+
+
+class MultiStreamRunner:
+    """
+    Process N video streams on a fixed pool of worker processes.
+
+    sources           : list of source specs (see Day 14 open_source) or
+                        opened capture objects
+    processor_factory : picklable callable stream_id -> (frame -> result)
+    workers           : number of worker processes (default: CPU count)
+    max_in_flight     : frames of one stream queued or processing at once
+    slo_ms            : capture-to-result latency target per frame
+    live              : True  - read the newest frame, skip stale ones
+                        False - process every frame (offline files)
+    """
+
+    def __init__(self, sources, processor_factory=tracking_processor,
+                 workers=None, max_in_flight=2, slo_ms=100.0, live=True):
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+
+        self.processor_factory = processor_factory
+        self.workers = workers or os.cpu_count() or 1
+        self.max_in_flight = max_in_flight
+        self.slo_ms = slo_ms
+        self.live = live
+
+        self.streams = []
+        for i, source in enumerate(sources):
+            cap = open_source(source) if isinstance(source, str) else source
+            # Sticky assignment: a stream's state lives in exactly one worker
+            self.streams.append(_Stream(i, f"stream{i}", cap, i % self.workers))
+
+        self._processes = []
+        self._inboxes = []
+        self._outbox = None
+        self._worker_busy = [0.0] * self.workers
+        self._wall_time = 0.0
+
+    # ---- lifecycle ----
+
+    def start(self):
+        # Workers are started before any reader thread exists (fork safety)
+        self._outbox = mp.Queue()
+        for w in range(self.workers):
+            inbox = mp.Queue()
+            p = mp.Process(target=_worker_main, daemon=True,
+                           args=(w, self.processor_factory, inbox, self._outbox))
+            p.start()
+            self._inboxes.append(inbox)
+            self._processes.append(p)
+
+        policy = "latest" if self.live else "block"
+        for s in self.streams:
+            s.reader = ThreadedVideoReader(s.cap, queue_size=2, policy=policy).start()
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for s in self.streams:
+            if s.reader is not None:
+                s.reader.release()
+                s.reader = None
+        for inbox in self._inboxes:
+            inbox.put(None)
+        for p, inbox in zip(self._processes, self._inboxes):
+            p.join(timeout=5)
+            if p.is_alive():
+                p.terminate()
+            # Frames left for a dead worker must not block interpreter exit
+            inbox.cancel_join_thread()
+        self._processes = []
+        self._inboxes = []
+
+    # ---- scheduling ----
+
+    def _handle(self, message, on_result):
+        kind, worker_id, stream_id, payload = message
+        if kind == "error":
+            raise RuntimeError(
+                f"Worker {worker_id} failed on stream {stream_id}:\n{payload}"
+            )
+
+        seq, t_capture, busy, result = payload
+        s = self.streams[stream_id]
+        latency_ms = 1000 * (time.perf_counter() - t_capture)
+
+        s.in_flight -= 1
+        s.completed += 1
+        s.busy += busy
+        s.latency.append(latency_ms)
+        s.last_result = result
+        if latency_ms > self.slo_ms:
+            s.violations += 1
+        self._worker_busy[worker_id] += busy
+
+        if on_result is not None:
+            on_result(stream_id, seq, result)
+
+    def _drain(self, on_result, timeout):
+        try:
+            message = self._outbox.get(timeout=timeout) if timeout else \
+                self._outbox.get_nowait()
+        except queue.Empty:
+            return 0
+        self._handle(message, on_result)
+        count = 1
+        while True:
+            try:
+                message = self._outbox.get_nowait()
+            except queue.Empty:
+                return count
+            self._handle(message, on_result)
+            count += 1
+
+    def _dead_workers(self):
+        busy = {s.worker for s in self.streams if s.in_flight}
+        return [w for w in busy if not self._processes[w].is_alive()]
+
+    def _wait_in_flight(self, on_result, timeout):
+        # Never block on results from a worker that can no longer send them
+        deadline = time.perf_counter() + timeout
+        while sum(s.in_flight for s in self.streams):
+            if self._drain(on_result, timeout=0.5):
+                continue
+            dead = self._dead_workers()
+            if dead:
+                # A crashed processor sends its traceback before exiting
+                self._drain(on_result, timeout=0.1)
+                raise RuntimeError(f"Worker(s) {dead} exited with frames in flight")
+            if time.perf_counter() > deadline:
+                raise RuntimeError(f"Frames still in flight after {timeout:.0f} s")
+
+    def run(self, duration=None, max_frames=None, on_result=None,
+            drain_timeout=30.0):
+        """
+        Schedule frames until every stream ends, `duration` seconds pass or
+        each stream has submitted max_frames frames.
+
+        on_result(stream_id, seq, result) is called in the scheduler for
+        every finished frame. Returns the per-stream metrics. Frames still
+        in flight at the end are awaited for at most drain_timeout seconds.
+        """
+        if not self._processes:
+            self.start()
+
+        start = time.perf_counter()
+        next_stream = 0
+
+        while True:
+            if duration is not None and time.perf_counter() - start >= duration:
+                break
+
+            submitted = 0
+            active = False
+            n = len(self.streams)
+
+            # Round-robin: every pass starts one stream later, and each
+            # stream gets at most one frame per pass
+            for k in range(n):
+                s = self.streams[(next_stream + k) % n]
+                if s.finished:
+                    continue
+                if max_frames is not None and s.seq >= max_frames:
+                    s.finished = True
+                    continue
+                active = True
+
+                if s.in_flight >= self.max_in_flight:
+                    s.capped += 1
+                    continue
+
+                ret, frame = s.reader.read(timeout=0)
+                if not ret:
+                    if not s.reader.isOpened():
+                        s.finished = True
+                    continue
+
+                # Latency is measured from capture, so reader queueing counts
+                self._inboxes[s.worker].put(
+                    (s.stream_id, s.seq, s.reader.last_timestamp, frame)
+                )
+                s.seq += 1
+                s.in_flight += 1
+                submitted += 1
+
+            next_stream = (next_stream + 1) % max(n, 1)
+
+            in_flight = sum(s.in_flight for s in self.streams)
+            if not active and in_flight == 0:
+                break
+
+            # Sleep on the result queue only when there was nothing to submit
+            self._drain(on_result, timeout=0 if submitted else 0.002)
+
+        # Wait for frames that are still being processed
+        self._wait_in_flight(on_result, drain_timeout)
+
+        self._wall_time += time.perf_counter() - start
+        return self.stats()
+
+    # ---- metrics ----
+
+    def stats(self):
+        wall = max(self._wall_time, 1e-9)
+        streams = {}
+        for s in self.streams:
+            lat = np.array(s.latency) if s.latency else np.zeros(1)
+            reader = s.reader.stats() if s.reader is not None else {}
+            streams[s.name] = {
+                "worker": s.worker,
+                "frames": s.completed,
+                "fps": s.completed / wall,
+                "dropped": reader.get("dropped", 0),
+                "capped": s.capped,
+                "p50_ms": float(np.percentile(lat, 50)),
+                "p95_ms": float(np.percentile(lat, 95)),
+                "max_ms": float(lat.max()),
+                "slo_violations": s.violations,
+                "process_ms": 1000 * s.busy / max(s.completed, 1),
+            }
+        return {
+            "streams": streams,
+            "workers": [b / wall for b in self._worker_busy],
+            "total_fps": sum(s.completed for s in self.streams) / wall,
+            "wall_time": self._wall_time,
+        }
+
+
+def print_stats(stats, slo_ms):
+    print(f"  {'stream':<10} {'wkr':>3} {'frames':>6} {'FPS':>6} {'drop':>5} "
+          f"{'p50 ms':>7} {'p95 ms':>7} {'> SLO':>6}")
+    for name, st in stats["streams"].items():
+        print(f"  {name:<10} {st['worker']:>3} {st['frames']:>6} {st['fps']:>6.1f} "
+              f"{st['dropped']:>5} {st['p50_ms']:>7.1f} {st['p95_ms']:>7.1f} "
+              f"{st['slo_violations']:>6}")
+    busy = ", ".join(f"{100 * b:.0f}%" for b in stats["workers"])
+    print(f"  total {stats['total_fps']:.1f} FPS, worker busy: {busy}, "
+          f"SLO {slo_ms:.0f} ms")
+
+
+def synthetic_cameras(count, fps=30.0, width=640, height=480):
+    """Seeded synthetic feeds that deliver frames at camera speed."""
+    return [SyntheticCapture(width=width, height=height, fps=fps, seed=i,
+                             decode_delay=1.0 / fps)
+            for i in range(count)]
+
+
+if __name__ == "__main__":
+
+    workers = os.cpu_count() or 1
+    slo_ms = 100.0
+    duration = 5.0
+
+    # ----------------------------------
+    # 4. Eight 30 FPS cameras on a shared pool
+    # ----------------------------------
+
+    print(f"8 synthetic cameras, {workers} worker process(es)")
+
+    runner = MultiStreamRunner(synthetic_cameras(8), tracking_processor,
+                               workers=workers, slo_ms=slo_ms)
+    with runner:
+        stats = runner.run(duration=duration)
+    print_stats(stats, slo_ms)
+
+    # ----------------------------------
+    # 5. Overload: the in-flight cap keeps latency bounded
+    # ----------------------------------
+
+    # Far more pixels than the pool can handle: live streams skip stale
+    # frames, and every stream still gets its fair share
+    print(f"\n16 synthetic 720p cameras, {workers} worker process(es)")
+
+    runner = MultiStreamRunner(synthetic_cameras(16, width=1280, height=720),
+                               tracking_processor, workers=workers,
+                               max_in_flight=1, slo_ms=slo_ms)
+    with runner:
+        stats = runner.run(duration=duration)
+    print_stats(stats, slo_ms)
+
+    # ----------------------------------
+    # 6. Offline files: every frame, same pool
+    # ----------------------------------
+
+    video_path = "sample_video.mp4"  # Replace with your video path
+
+    if os.path.exists(video_path):
+        print(f"\n4 copies of {video_path}, every frame (live=False)")
+        runner = MultiStreamRunner([f"file:{video_path}"] * 4, motion_processor,
+                                   workers=workers, slo_ms=1000.0, live=False)
+        with runner:
+            stats = runner.run()
+        print_stats(stats, 1000.0)
+
+"""
+Summary:
+- One process pool serves every stream; throughput scales with cores
+- A stream always runs on the same worker, so stateful detectors work
+- Round-robin plus an in-flight cap stop one stream from starving others
+- Live streams drop stale frames, so latency stays bounded under load
+- p50 / p95 latency and SLO violations are tracked per stream
+"""
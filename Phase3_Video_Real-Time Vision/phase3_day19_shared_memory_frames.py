@@ -0,0 +1,460 @@
+"""
+PHASE 3 — Video & Real-Time Vision
+Day 19: Shared-Memory Frame Ring Between Processes
+
+Concepts:
+- mp.Queue pickles every frame: serialize + pipe copy + unpickle
+- multiprocessing.shared_memory: one buffer mapped into every process
+- A ring of fixed-size frame slots, reused forever
+- Per-slot sequence numbers (seqlock) instead of locks
+- One producer (capture), many consumers (analysis / inference)
+- Zero-copy numpy views, torch.from_numpy() works on them too
+- Benchmark against queue transport at 1080p and 4K
+"""
+
+import multiprocessing as mp
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from phase3_day11_threaded_video_reader import SyntheticCapture
+
+# ----------------------------------
+# 1. Shared-memory layout
+# ----------------------------------
+
+# int64 header fields
+WRITE_SEQ = 0      # number of frames committed so far
+SLOTS = 1
+SHAPE = 2          # 3 fields: height, width, channels
+DTYPE = 5          # dtype string packed into 8 bytes
+MAX_CONSUMERS = 6
+CLOSED = 7
+FIXED_FIELDS = 8
+
+HEADER_ALIGN = 4096
+
+
+def _pack_dtype(dtype):
+    return int.from_bytes(np.dtype(dtype).str.encode().ljust(8, b"\0"), "little")
+
+
+def _unpack_dtype(value):
+    return np.dtype(int(value).to_bytes(8, "little").rstrip(b"\0").decode())
+
+
+def _header_fields(slots, max_consumers):
+    # fixed fields + slot sequences + slot timestamps + consumer cursors
+    return FIXED_FIELDS + 2 * slots + max_consumers
+
+
+# ----------------------------------
+# 2. Frame ring
+# ----------------------------------
+
+class FrameRing:
+    """
+    Fixed-size frame slots in one shared-memory block.
+
+    The producer writes frame n into slot n % slots. Each slot has a
+    sequence word: 2n + 1 while frame n is being written, 2n + 2 once it
+    is complete. A reader checks the word before and after touching the
+    pixels; if it changed, the frame was overwritten (seqlock), so no lock
+    is ever taken. Create with FrameRing.create(), open in other processes
+    with FrameRing.attach(name).
+    """
+
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+
+        header = np.ndarray((FIXED_FIELDS,), np.int64, shm.buf)
+        self.slots = int(header[SLOTS])
+        self.shape = tuple(int(v) for v in header[SHAPE:SHAPE + 3] if v > 0)
+        self.dtype = _unpack_dtype(header[DTYPE])
+        self.max_consumers = int(header[MAX_CONSUMERS])
+
+        fields = _header_fields(self.slots, self.max_consumers)
+        self.header = np.ndarray((fields,), np.int64, shm.buf)
+        self.slot_seq = self.header[FIXED_FIELDS:FIXED_FIELDS + self.slots]
+        self.slot_time = self.header[FIXED_FIELDS + self.slots:
+                                     FIXED_FIELDS + 2 * self.slots]
+        self.cursors = self.header[FIXED_FIELDS + 2 * self.slots:]
+
+        offset = -(-fields * 8 // HEADER_ALIGN) * HEADER_ALIGN
+        self.frames = np.ndarray((self.slots,) + self.shape, self.dtype,
+                                 shm.buf, offset)
+
+    @classmethod
+    def create(cls, shape, slots=8, dtype=np.uint8, max_consumers=4, name=None):
+        if slots < 2:
+            raise ValueError("slots must be at least 2")
+        if not 1 <= len(shape) <= 3:
+            raise ValueError(f"Unsupported frame shape {shape}")
+
+        fields = _header_fields(slots, max_consumers)
+        header_bytes = -(-fields * 8 // HEADER_ALIGN) * HEADER_ALIGN
+        frame_bytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        shm = shared_memory.SharedMemory(
+            name=name, create=True, size=header_bytes + slots * frame_bytes
+        )
+
+        header = np.ndarray((fields,), np.int64, shm.buf)
+        header[:] = 0
+        header[SLOTS] = slots
+        header[SHAPE:SHAPE + len(shape)] = shape
+        header[DTYPE] = _pack_dtype(dtype)
+        header[MAX_CONSUMERS] = max_consumers
+        header[FIXED_FIELDS + 2 * slots:] = -1  # no consumer registered
+        del header
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def write_seq(self):
+        return int(self.header[WRITE_SEQ])
+
+    @property
+    def closed(self):
+        return bool(self.header[CLOSED])
+
+    # ---- producer ----
+
+    def begin_write(self, block=False, timeout=None):
+        """
+        Return (seq, writable view of its slot).
+
+        With block=True the producer waits until every registered consumer
+        has moved past the slot (no frame is lost); otherwise the oldest
+        frame is simply overwritten (live cameras).
+        """
+        seq = self.write_seq
+        if block:
+            deadline = None if timeout is None else time.perf_counter() + timeout
+            while True:
+                active = self.cursors[self.cursors >= 0]
+                if len(active) == 0 or seq - active.min() < self.slots:
+                    break
+                if deadline is not None and time.perf_counter() > deadline:
+                    raise TimeoutError("Consumers did not free a slot in time")
+                time.sleep(0.0001)
+
+        slot = seq % self.slots
+        self.slot_seq[slot] = 2 * seq + 1    # odd: being written
+        return seq, self.frames[slot]
+
+    def commit(self, seq):
+        slot = seq % self.slots
+        self.slot_time[slot] = time.perf_counter_ns()
+        self.slot_seq[slot] = 2 * seq + 2    # even: complete
+        self.header[WRITE_SEQ] = seq + 1
+
+    def write(self, frame, block=False, timeout=None):
+        seq, view = self.begin_write(block, timeout)
+        view[...] = frame
+        self.commit(seq)
+        return seq
+
+    def close_stream(self):
+        """Tell consumers no more frames will arrive."""
+        self.header[CLOSED] = 1
+
+    # ---- consumer side ----
+
+    def read(self, seq, copy=True):
+        """
+        Return frame `seq`, or None if it is not written yet or was already
+        overwritten. With copy=False the result is a view into the ring;
+        check is_valid(seq) after using it.
+        """
+        slot = seq % self.slots
+        before = self.slot_seq[slot]
+        if before != 2 * seq + 2:
+            return None
+        frame = self.frames[slot].copy() if copy else self.frames[slot]
+        if self.slot_seq[slot] != before:
+            return None
+        return frame
+
+    def is_valid(self, seq):
+        return self.slot_seq[seq % self.slots] == 2 * seq + 2
+
+    def timestamp_ns(self, seq):
+        return int(self.slot_time[seq % self.slots])
+
+    def release(self):
+        # Views must be dropped before the mapping can be closed
+        self.header = self.slot_seq = self.slot_time = self.cursors = None
+        self.frames = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class RingConsumer:
+    """
+    One consumer's read position in a FrameRing.
+
+    consumer_id : index of this consumer's cursor slot (0 .. max_consumers-1);
+                  registered cursors are what a blocking producer waits for
+    start       : "oldest" - start at the oldest frame still in the ring
+                  "latest" - start at the next frame written
+    skip_to_latest : always jump to the newest frame (live analysis)
+    """
+
+    def __init__(self, ring, consumer_id=0, start="oldest", skip_to_latest=False):
+        if not 0 <= consumer_id < ring.max_consumers:
+            raise ValueError(f"consumer_id must be in [0, {ring.max_consumers})")
+        if start not in ("oldest", "latest"):
+            raise ValueError(f"Unknown start '{start}'")
+
+        self.ring = ring
+        self.consumer_id = consumer_id
+        self.skip_to_latest = skip_to_latest
+        head = ring.write_seq
+        self.position = head if start == "latest" else max(head - ring.slots, 0)
+        ring.cursors[consumer_id] = self.position
+
+        self.received = 0
+        self.dropped = 0
+
+    def next(self, timeout=None, copy=True, poll=0.0001):
+        """Return (seq, frame); (None, None) on timeout or end of stream."""
+        ring = self.ring
+        deadline = None if timeout is None else time.perf_counter() + timeout
+
+        while True:
+            head = ring.write_seq
+            if head > self.position:
+                target = head - 1 if self.skip_to_latest else self.position
+                # Frames older than one ring are gone. The oldest slot may
+                # still hold its frame (a blocking producer waits for us),
+                # read() tells whether it was overwritten
+                target = max(target, head - ring.slots)
+                self.dropped += target - self.position
+
+                frame = ring.read(target, copy)
+                if frame is not None:
+                    # The cursor stays on `target` until done(), so a
+                    # blocking producer cannot overwrite a frame in use
+                    self.position = target + 1
+                    ring.cursors[self.consumer_id] = target
+                    self.received += 1
+                    return target, frame
+                # Overwritten while reading: count it and try the next one
+                self.position = target + 1
+                self.dropped += 1
+                continue
+
+            if ring.closed:
+                return None, None
+            if deadline is not None and time.perf_counter() > deadline:
+                return None, None
+            time.sleep(poll)
+
+    def done(self):
+        """Release the frame returned last (lets a blocking producer reuse it)."""
+        self.ring.cursors[self.consumer_id] = self.position
+
+    def close(self):
+        self.ring.cursors[self.consumer_id] = -1
+
+
+# ----------------------------------
+# 3. Capture -> ring, ring -> analysis
+# ----------------------------------
+
+def capture_to_ring(cap, ring, max_frames=None, block=False):
+    """Phase 3 capture loop publishing every frame into the ring."""
+    count = 0
+    while max_frames is None or count < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        ring.write(frame, block=block)
+        count += 1
+    ring.close_stream()
+    return count
+
+
+def _test_frame(shape, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, shape, dtype=np.uint8)
+
+
+def _touch(frame):
+    # Cheap "analysis": read a sparse grid of pixels
+    return int(frame[::64, ::64].sum())
+
+
+def _queue_producer(q, shape, num_frames):
+    frame = _test_frame(shape)
+    for i in range(num_frames):
+        frame[0, 0, 0] = i % 256
+        q.put((i, time.perf_counter_ns(), frame))
+    q.put(None)
+
+
+def _ring_producer(name, num_frames):
+    ring = FrameRing.attach(name)
+    frame = _test_frame(ring.shape)
+    for i in range(num_frames):
+        seq, view = ring.begin_write(block=True)
+        view[...] = frame
+        view[0, 0, 0] = i % 256
+        ring.commit(seq)
+    ring.close_stream()
+    ring.release()
+
+
+def benchmark_queue(shape, num_frames=100):
+    q = mp.Queue(maxsize=4)
+    producer = mp.Process(target=_queue_producer, args=(q, shape, num_frames))
+    producer.start()
+
+    latencies = []
+    start = None
+    while True:
+        item = q.get()
+        if item is None:
+            break
+        start = start or time.perf_counter()
+        _, t_sent, frame = item
+        _touch(frame)
+        latencies.append(time.perf_counter_ns() - t_sent)
+    elapsed = time.perf_counter() - start
+    producer.join()
+    return (num_frames - 1) / elapsed, np.median(latencies) / 1e6
+
+
+def receive_all(shape, num_frames, slots=4, copy=False, work=None):
+    """
+    Blocking producer process -> one consumer. Returns the received
+    sequence numbers, capture-to-read latencies (ns) and elapsed time.
+    """
+    ring = FrameRing.create(shape, slots=slots)
+    consumer = RingConsumer(ring, consumer_id=0)
+    producer = mp.Process(target=_ring_producer, args=(ring.name, num_frames))
+    producer.start()
+
+    seqs = []
+    latencies = []
+    start = None
+    while True:
+        seq, frame = consumer.next(copy=copy)
+        if seq is None:
+            break
+        start = start or time.perf_counter()
+        _touch(frame)
+        if work is not None:
+            work(seq)
+        latencies.append(time.perf_counter_ns() - ring.timestamp_ns(seq))
+        seqs.append(seq)
+        consumer.done()
+    elapsed = time.perf_counter() - start
+    producer.join()
+
+    consumer.close()
+    del frame
+    ring.release()
+    return seqs, latencies, elapsed
+
+
+def benchmark_ring(shape, num_frames=100, slots=4, copy=False):
+    seqs, latencies, elapsed = receive_all(shape, num_frames, slots, copy)
+    if seqs != list(range(num_frames)):
+        raise RuntimeError(f"Blocking ring lost frames: {len(seqs)}/{num_frames}")
+    return (len(seqs) - 1) / elapsed, np.median(latencies) / 1e6
+
+
+if __name__ == "__main__":
+
+    # ----------------------------------
+    # 4. Blocking mode: every frame arrives
+    # ----------------------------------
+
+    # The consumer stalls now and then, so the producer keeps catching up
+    # with it and has to wait for free slots
+    def stall(seq):
+        if seq % 7 == 0:
+            time.sleep(0.001)
+
+    for slots in (2, 4, 8):
+        seqs, _, _ = receive_all((120, 160, 3), 500, slots=slots, work=stall)
+        print(f"{slots} slots: received {len(seqs)} / 500 frames, "
+              f"in order: {seqs == list(range(500))}")
+    print()
+
+    # ----------------------------------
+    # 5. Queue vs shared-memory ring
+    # ----------------------------------
+
+    for label, shape in (("1080p", (1080, 1920, 3)), ("4K", (2160, 3840, 3))):
+        mb = np.prod(shape) / 1e6
+        print(f"{label} ({mb:.1f} MB per frame)")
+
+        fps, lat = benchmark_queue(shape)
+        print(f"  mp.Queue (pickle)     {fps:7.1f} FPS  {fps * mb:7.0f} MB/s  "
+              f"median latency {lat:6.2f} ms")
+
+        fps, lat = benchmark_ring(shape, copy=True)
+        print(f"  Shared ring (copy)    {fps:7.1f} FPS  {fps * mb:7.0f} MB/s  "
+              f"median latency {lat:6.2f} ms")
+
+        fps, lat = benchmark_ring(shape, copy=False)
+        print(f"  Shared ring (view)    {fps:7.1f} FPS  {fps * mb:7.0f} MB/s  "
+              f"median latency {lat:6.2f} ms")
+
+    # ----------------------------------
+    # 6. Live camera: one producer, two consumers
+    # ----------------------------------
+
+    cap = SyntheticCapture(width=640, height=480, num_frames=120)
+    ring = FrameRing.create((480, 640, 3), slots=8)
+
+    # A consumer in another process would call FrameRing.attach(ring.name);
+    # here both consumers share the process to keep the demo short
+    fast = RingConsumer(ring, consumer_id=0)
+    live = RingConsumer(ring, consumer_id=1, skip_to_latest=True)
+
+    produced = 0
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        # One copy into the slot; consumers read it in place
+        seq, view = ring.begin_write()
+        view[...] = frame
+        ring.commit(seq)
+        produced += 1
+
+        fast.next(timeout=0, copy=False)
+        if produced % 5 == 0:
+            live.next(timeout=0, copy=False)   # slow consumer: newest frame only
+
+    ring.close_stream()
+    print(f"\nProduced {produced} frames")
+    print(f"Every-frame consumer: {fast.received} received, {fast.dropped} dropped")
+    print(f"Latest-frame consumer: {live.received} received, {live.dropped} skipped")
+
+    fast.close()
+    live.close()
+    ring.release()
+    cap.release()
+
+"""
+Summary:
+- Queues pickle and copy every frame, twice, through a pipe
+- A shared-memory ring maps the same pixels into every process
+- Slot sequence numbers detect torn / overwritten frames without locks
+- Consumers can read views (zero-copy) or copy out what they keep
+- Blocking producers never lose frames; live producers overwrite old ones
+"""
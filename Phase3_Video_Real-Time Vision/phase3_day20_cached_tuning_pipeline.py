@@ -0,0 +1,307 @@
+"""
+PHASE 3 — Video & Real-Time Vision
+Day 20: Live Tuning with Cached Intermediate Results
+
+Concepts:
+- Day 7 recomputes every stage on every frame, even with idle sliders
+- Memoizing each stage by (input frame ID, stage parameters)
+- Cache keys chain through the graph: upstream results are reused
+- A slider change recomputes only the stages downstream of it
+- Pausing the camera (or tuning a still image) makes idle frames free
+- Small per-stage LRU caches keep memory bounded on large images
+"""
+
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+SOURCE = "source"
+
+# ----------------------------------
+# 1. Cached stages
+# ----------------------------------
+
+class CachedStage:
+
+    def __init__(self, name, fn, inputs, params, cache_size):
+        self.name = name
+        self.fn = fn
+        self.inputs = tuple(inputs)
+        self.params = dict(params)
+        self.cache = OrderedDict()   # key -> output, least recently used first
+        self.cache_size = cache_size
+
+        self.hits = 0
+        self.misses = 0
+        self.compute_time = 0.0
+
+    def key(self, input_keys):
+        return (tuple(sorted(self.params.items())), input_keys)
+
+    def lookup(self, key):
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return True, self.cache[key]
+        return False, None
+
+    def store(self, key, value):
+        self.cache[key] = value
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+
+class CachedPipeline:
+    """
+    Processing stages whose outputs are cached by frame ID and parameters.
+
+    A stage is fn(*input_values, **params). Its cache key is its own
+    parameter values plus the keys of its inputs, so changing a parameter
+    only invalidates that stage and the stages that depend on it.
+    Stage functions must not modify their inputs in place: cached arrays
+    are shared between calls.
+    """
+
+    def __init__(self, cache_size=2):
+        self.cache_size = cache_size
+        self.stages = OrderedDict()
+
+    def add(self, name, fn, inputs=None, **params):
+        """Add a stage; by default it takes the previous stage's output."""
+        if name == SOURCE or name in self.stages:
+            raise ValueError(f"Stage name '{name}' is already used")
+        if inputs is None:
+            inputs = [next(reversed(self.stages))] if self.stages else [SOURCE]
+        for dep in inputs:
+            if dep != SOURCE and dep not in self.stages:
+                raise ValueError(f"Stage '{name}' depends on unknown stage '{dep}'")
+
+        self.stages[name] = CachedStage(name, fn, inputs, params, self.cache_size)
+        return self
+
+    # ---- parameters ----
+
+    def params(self, stage):
+        return dict(self.stages[stage].params)
+
+    def set_params(self, stage, **values):
+        """Update parameters; returns True if anything changed."""
+        params = self.stages[stage].params
+        for name in values:
+            if name not in params:
+                raise KeyError(f"Stage '{stage}' has no parameter '{name}'")
+        changed = any(params[k] != v for k, v in values.items())
+        params.update(values)
+        return changed
+
+    def downstream(self, stage):
+        """Stages recomputed when `stage` changes (including itself)."""
+        affected = {stage}
+        for s in self.stages.values():
+            if affected.intersection(s.inputs):
+                affected.add(s.name)
+        return [name for name in self.stages if name in affected]
+
+    # ---- execution ----
+
+    def process(self, frame, frame_id):
+        """
+        Run the pipeline for one frame and return {stage: output}.
+
+        frame_id identifies the frame contents: pass the same ID for a
+        paused camera or a still image so unchanged stages are reused.
+        """
+        keys = {SOURCE: ("frame", frame_id)}
+        values = {SOURCE: frame}
+
+        for stage in self.stages.values():
+            key = stage.key(tuple(keys[i] for i in stage.inputs))
+            hit, value = stage.lookup(key)
+            if not hit:
+                t0 = time.perf_counter()
+                value = stage.fn(*(values[i] for i in stage.inputs), **stage.params)
+                stage.compute_time += time.perf_counter() - t0
+                stage.misses += 1
+                stage.store(key, value)
+
+            keys[stage.name] = key
+            values[stage.name] = value
+
+        return values
+
+    def clear(self):
+        for stage in self.stages.values():
+            stage.cache.clear()
+
+    def stats(self):
+        return {
+            name: {
+                "hits": s.hits,
+                "misses": s.misses,
+                "compute_ms": 1000 * s.compute_time / max(s.misses, 1),
+            }
+            for name, s in self.stages.items()
+        }
+
+
+# ----------------------------------
+# 2. Day 7 stages
+# ----------------------------------
+
+def adjust(img, brightness=50, contrast=50):
+    # alpha controls contrast (1.0 = normal), beta shifts brightness
+    return cv2.convertScaleAbs(img, alpha=contrast / 50, beta=brightness - 50)
+
+
+def blur(img, blur=0):
+    if blur <= 0:
+        return img
+    # Kernel size must be odd
+    k = blur if blur % 2 == 1 else blur + 1
+    return cv2.GaussianBlur(img, (k, k), 0)
+
+
+def edges(img, low=50, high=150):
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    return cv2.cvtColor(cv2.Canny(gray, low, high), cv2.COLOR_GRAY2BGR)
+
+
+def annotate(img, text="Day 20 - Cached Controls"):
+    out = img.copy()   # never draw on a cached array
+    cv2.putText(out, text, (20, 40), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+    return out
+
+
+def live_controls_pipeline(cache_size=2):
+    pipeline = CachedPipeline(cache_size)
+    pipeline.add("adjust", adjust, brightness=50, contrast=50)
+    pipeline.add("blur", blur, blur=0)
+    pipeline.add("edges", edges, low=50, high=150)
+    pipeline.add("display", annotate, inputs=["edges"])
+    return pipeline
+
+
+# Trackbar -> (stage, parameter)
+TRACKBARS = {
+    "Brightness": ("adjust", "brightness", 50, 100),
+    "Contrast": ("adjust", "contrast", 50, 100),
+    "Blur": ("blur", "blur", 0, 20),
+    "Canny low": ("edges", "low", 50, 255),
+    "Canny high": ("edges", "high", 150, 255),
+}
+
+
+def uncached_pipeline(img, brightness, contrast, blur_value, low, high):
+    """Day 7 style: every stage, every time."""
+    out = adjust(img, brightness, contrast)
+    out = blur(out, blur_value)
+    out = edges(out, low, high)
+    return annotate(out)
+
+
+if __name__ == "__main__":
+
+    # ----------------------------------
+    # 3. Offline tuning on a large still image
+    # ----------------------------------
+
+    image_path = "sample.jpg"  # Replace with your image path
+    image = cv2.imread(image_path)
+    if image is None:
+        image = np.random.default_rng(0).integers(0, 256, (480, 640, 3), np.uint8)
+    image = cv2.resize(image, (7680, 4320))   # 8K
+
+    pipeline = live_controls_pipeline()
+    pipeline.set_params("blur", blur=9)
+    pipeline.process(image, frame_id=0)       # warm the cache
+
+    # Simulate dragging the "Canny low" slider through 20 positions
+    positions = range(20, 120, 5)
+
+    start = time.perf_counter()
+    for low in positions:
+        uncached_pipeline(image, 50, 50, 9, low, 150)
+    uncached_ms = 1000 * (time.perf_counter() - start) / len(positions)
+
+    start = time.perf_counter()
+    for low in positions:
+        pipeline.set_params("edges", low=low)
+        pipeline.process(image, frame_id=0)
+    cached_ms = 1000 * (time.perf_counter() - start) / len(positions)
+
+    print(f"8K slider move, full pipeline: {uncached_ms:7.1f} ms")
+    print(f"8K slider move, cached:        {cached_ms:7.1f} ms")
+    print("Recomputed stages:", pipeline.downstream("edges"))
+
+    for name, st in pipeline.stats().items():
+        print(f"  {name:<8} hits {st['hits']:3d}  misses {st['misses']:3d}  "
+              f"{st['compute_ms']:7.1f} ms/compute")
+
+    # ----------------------------------
+    # 4. Open webcam & trackbars
+    # ----------------------------------
+
+    cap = cv2.VideoCapture(0)
+
+    if not cap.isOpened():
+        raise RuntimeError("Cannot open webcam")
+
+    window = "Live Controls"
+    cv2.namedWindow(window)
+    for name, (_, _, default, maximum) in TRACKBARS.items():
+        cv2.createTrackbar(name, window, default, maximum, lambda x: None)
+
+    pipeline = live_controls_pipeline()
+    print("Trackbars ready. Press 'p' to pause / resume, 'q' to exit.")
+
+    # ----------------------------------
+    # 5. Main loop
+    # ----------------------------------
+
+    frame_id = 0
+    frame = None
+    paused = False
+
+    while True:
+        if not paused or frame is None:
+            ret, frame = cap.read()
+            if not ret:
+                print("Failed to grab frame.")
+                break
+            frame_id += 1
+
+        # Read sliders; only changed stages (and their successors) rerun
+        for name, (stage, param, _, _) in TRACKBARS.items():
+            pipeline.set_params(stage, **{param: cv2.getTrackbarPos(name, window)})
+
+        # While paused the frame ID stays the same, so idle loops are cache hits
+        outputs = pipeline.process(frame, frame_id)
+        cv2.imshow(window, outputs["display"])
+
+        key = cv2.waitKey(1) & 0xFF
+        if key == ord('p'):
+            paused = not paused
+        elif key == ord('q'):
+            print("Exiting...")
+            break
+
+    # ----------------------------------
+    # 6. Release resources
+    # ----------------------------------
+
+    cap.release()
+    cv2.destroyAllWindows()
+
+    print("Stage cache stats:", pipeline.stats())
+    print("Resources released successfully.")
+
+"""
+Summary:
+- Each stage's output is cached under (parameters, input keys)
+- Input keys chain from the frame ID, so upstream results are reused
+- Moving one slider only reruns that stage and its successors
+- A paused / still frame costs nothing while the sliders are idle
+- Stages must return new arrays instead of drawing on cached ones
+"""
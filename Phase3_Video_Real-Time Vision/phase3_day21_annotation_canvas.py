@@ -0,0 +1,420 @@
+"""
+PHASE 3 — Video & Real-Time Vision
+Day 21: Annotation Canvas with Dirty-Rectangle Redraw
+
+Concepts:
+- Day 6 copies the whole image on every mouse move
+- Base layer (the image) and annotation layer kept apart
+- A display view at screen resolution instead of the full 8K image
+- Redrawing only the dirty rectangle the rubber band touched
+- Annotations stored as vectors, not pixels (undo is cheap)
+- Exporting boxes to JSON and COCO
+"""
+
+import json
+import math
+import time
+
+import cv2
+import numpy as np
+
+# ----------------------------------
+# 1. Rectangle helpers
+# ----------------------------------
+
+def normalize_rect(x0, y0, x1, y1):
+    """Two corners -> (x, y, w, h) with positive size."""
+    return min(x0, x1), min(y0, y1), abs(x1 - x0), abs(y1 - y0)
+
+
+def pad_clip_rect(rect, pad, width, height):
+    x, y, w, h = rect
+    x0, y0 = max(x - pad, 0), max(y - pad, 0)
+    x1, y1 = min(x + w + pad + 1, width), min(y + h + pad + 1, height)
+    if x1 <= x0 or y1 <= y0:
+        return None
+    return x0, y0, x1 - x0, y1 - y0
+
+
+def intersects(a, b):
+    return (a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and
+            a[1] < b[1] + b[3] and b[1] < a[1] + a[3])
+
+
+def area_weights(v0, v1, size, view):
+    """
+    INTER_AREA weights of view pixels [v0, v1) over image pixels.
+    Returns (weights, first, last): row i averages image pixels first..last-1.
+    """
+    s = size / view
+    first, last = math.floor(v0 * s), min(math.ceil(v1 * s), size)
+    edges = np.arange(v0, v1 + 1)[:, None] * s
+    pixels = np.arange(first, last)[None, :]
+    overlap = np.minimum(edges[1:], pixels + 1) - np.maximum(edges[:-1], pixels)
+    return (np.clip(overlap, 0, None) / s).astype(np.float32), first, last
+
+
+# ----------------------------------
+# 2. Annotation canvas
+# ----------------------------------
+
+class AnnotationCanvas:
+    """
+    Rubber-band box annotation on large images.
+
+    image      : full-resolution BGR image (never modified)
+    max_view   : longest side of the on-screen view in pixels
+    max_period : longest resize-grid period dirty rects are snapped to
+    labels     : class names; keys 1..9 pick the active label
+
+    Layers:
+      base       - the image itself
+      layer      - full-resolution image with committed boxes drawn
+      view_base  - layer scaled to the view
+      view       - view_base plus the rubber band (what imshow shows)
+    """
+
+    def __init__(self, image, max_view=1600, labels=("object",),
+                 color=(0, 255, 0), band_color=(0, 200, 255), thickness=2,
+                 max_period=64):
+        self.base = image
+        self.height, self.width = image.shape[:2]
+        self.scale = min(1.0, max_view / max(self.width, self.height))
+        self.view_size = (max(1, round(self.width * self.scale)),
+                          max(1, round(self.height * self.scale)))
+        # View pixels per period of the resize grid: every multiple of it
+        # maps to a whole image pixel (view_w / width = q / p, reduced).
+        # Awkward sizes (3001 px -> 1600) have periods close to the whole
+        # view; then rects are resampled directly instead of snapped
+        period = (self.view_size[0] // math.gcd(self.width, self.view_size[0]),
+                  self.view_size[1] // math.gcd(self.height, self.view_size[1]))
+        self.snap = max(period) <= max_period
+        self.view_period = period if self.snap else (1, 1)
+
+        self.labels = list(labels)
+        self.label = 0
+        self.color = color
+        self.band_color = band_color
+        self.thickness = thickness
+        # Boxes are drawn on the full image so they stay visible in the view
+        self.image_thickness = max(thickness, round(thickness / self.scale))
+
+        self.annotations = []
+        self.next_id = 1
+
+        self.layer = image.copy()
+        self.view_base = cv2.resize(self.layer, self.view_size,
+                                    interpolation=cv2.INTER_AREA)
+        self.view = self.view_base.copy()
+
+        self.drawing = False
+        self.start = None
+        self.band = None          # rubber band rect in view pixels
+
+        self.events = 0
+        self.pixels_redrawn = 0
+
+    # ---- coordinates ----
+
+    def to_image(self, x, y):
+        return (min(int(x / self.scale), self.width - 1),
+                min(int(y / self.scale), self.height - 1))
+
+    def _view_span(self, start, stop, size, axis):
+        """Image span -> (view start, view stop, image start, image stop) on the grid."""
+        view, period = self.view_size[axis], self.view_period[axis]
+        v0 = start * view // size // period * period
+        v1 = -(-stop * view // size)                 # ceil
+        v1 = min(-(-v1 // period) * period, view)
+        return v0, v1, v0 * size // view, v1 * size // view
+
+    def _area_patch(self, vx0, vx1, vy0, vy1):
+        """INTER_AREA of the layer for view pixels [vx0, vx1) x [vy0, vy1)."""
+        wx, sx0, sx1 = area_weights(vx0, vx1, self.width, self.view_size[0])
+        wy, sy0, sy1 = area_weights(vy0, vy1, self.height, self.view_size[1])
+        roi = self.layer[sy0:sy1, sx0:sx1]
+        rows = wy @ roi.reshape(sy1 - sy0, -1).astype(np.float32)
+        patch = np.matmul(wx, rows.reshape(vy1 - vy0, sx1 - sx0, -1))
+        patch = np.clip(np.rint(patch), 0, 255).astype(np.uint8)
+        return patch.reshape((vy1 - vy0, vx1 - vx0) + roi.shape[2:])
+
+    # ---- redraw ----
+
+    def _restore_view(self, rect):
+        """Copy view_base back into the view inside rect (view pixels)."""
+        rect = pad_clip_rect(rect, self.thickness + 1, *self.view_size)
+        if rect is None:
+            return
+        x, y, w, h = rect
+        self.view[y:y + h, x:x + w] = self.view_base[y:y + h, x:x + w]
+        self.pixels_redrawn += w * h
+
+    def _draw_band(self, rect):
+        x, y, w, h = rect
+        cv2.rectangle(self.view, (x, y), (x + w, y + h), self.band_color,
+                      self.thickness)
+
+    def _redraw_layer(self, rect):
+        """Rebuild layer and view_base inside rect (image pixels)."""
+        rect = pad_clip_rect(rect, self.image_thickness + 1, self.width, self.height)
+        if rect is None:
+            return
+        x, y, w, h = rect
+
+        # Full resolution: base pixels + every box touching the region
+        roi = self.layer[y:y + h, x:x + w]
+        roi[:] = self.base[y:y + h, x:x + w]
+        for ann in self.annotations:
+            if intersects(ann["bbox"], rect):
+                bx, by, bw, bh = ann["bbox"]
+                cv2.rectangle(roi, (bx - x, by - y), (bx + bw - x, by + bh - y),
+                              self.color, self.image_thickness)
+
+        # View: resample the covered view pixels from the layer. The window
+        # is snapped to the resize grid, so INTER_AREA sees the same scale
+        # and pixel phase as a full-frame resize and the edges match it.
+        # Without a fine grid the same area weights are applied by hand
+        # (equal to cv2 up to float rounding, at most one grey level)
+        vx0, vx1, sx0, sx1 = self._view_span(x, x + w, self.width, 0)
+        vy0, vy1, sy0, sy1 = self._view_span(y, y + h, self.height, 1)
+        if self.snap:
+            patch = cv2.resize(self.layer[sy0:sy1, sx0:sx1], (vx1 - vx0, vy1 - vy0),
+                               interpolation=cv2.INTER_AREA)
+        else:
+            patch = self._area_patch(vx0, vx1, vy0, vy1)
+        self.view_base[vy0:vy1, vx0:vx1] = patch
+        self._restore_view((vx0, vy0, vx1 - vx0, vy1 - vy0))
+
+    # ---- mouse ----
+
+    def on_mouse(self, event, x, y, flags, param):
+        """cv2.setMouseCallback handler (coordinates in view pixels)."""
+        self.events += 1
+
+        if event == cv2.EVENT_LBUTTONDOWN:
+            self.drawing = True
+            self.start = (x, y)
+            self.band = None
+
+        elif event == cv2.EVENT_MOUSEMOVE and self.drawing:
+            new_band = normalize_rect(*self.start, x, y)
+            if self.band is not None:
+                self._restore_view(self.band)   # erase the old band only
+            self._draw_band(new_band)
+            self.band = new_band
+
+        elif event == cv2.EVENT_LBUTTONUP and self.drawing:
+            self.drawing = False
+            if self.band is not None:
+                self._restore_view(self.band)
+                self.band = None
+            x0, y0 = self.to_image(*self.start)
+            x1, y1 = self.to_image(x, y)
+            rect = normalize_rect(x0, y0, x1, y1)
+            if rect[2] > 1 and rect[3] > 1:
+                self.add(rect)
+
+    # ---- annotations ----
+
+    def add(self, bbox, label=None, ann_id=None):
+        ann = {
+            "id": self.next_id if ann_id is None else int(ann_id),
+            "label": self.labels[self.label] if label is None else label,
+            "bbox": [int(v) for v in bbox],
+        }
+        self.next_id = max(self.next_id, ann["id"]) + 1
+        self.annotations.append(ann)
+        self._redraw_layer(ann["bbox"])
+        return ann
+
+    def undo(self):
+        if not self.annotations:
+            return None
+        ann = self.annotations.pop()
+        self._redraw_layer(ann["bbox"])
+        return ann
+
+    def clear(self):
+        self.annotations = []
+        self.layer[:] = self.base
+        cv2.resize(self.layer, self.view_size, dst=self.view_base,
+                   interpolation=cv2.INTER_AREA)
+        self.view[:] = self.view_base
+
+    def select_label(self, index):
+        if 0 <= index < len(self.labels):
+            self.label = index
+
+    def render(self):
+        """Full-resolution image with all boxes (for saving)."""
+        return self.layer
+
+    # ---- export ----
+
+    def to_json(self):
+        return {
+            "width": self.width,
+            "height": self.height,
+            "labels": self.labels,
+            "annotations": self.annotations,
+        }
+
+    def save_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_json(), f, indent=2)
+
+    def load_json(self, path):
+        with open(path) as f:
+            data = json.load(f)
+        self.clear()
+        for ann in data["annotations"]:
+            self.add(ann["bbox"], ann["label"], ann["id"])
+
+    def to_coco(self, file_name, image_id=1):
+        # Known labels first, then labels only found in loaded annotations
+        categories = list(self.labels)
+        for ann in self.annotations:
+            if ann["label"] not in categories:
+                categories.append(ann["label"])
+        category_ids = {name: i + 1 for i, name in enumerate(categories)}
+        return {
+            "images": [{"id": image_id, "file_name": file_name,
+                        "width": self.width, "height": self.height}],
+            "annotations": [
+                {"id": a["id"], "image_id": image_id,
+                 "category_id": category_ids[a["label"]],
+                 "bbox": a["bbox"], "area": a["bbox"][2] * a["bbox"][3],
+                 "iscrowd": 0}
+                for a in self.annotations
+            ],
+            "categories": [{"id": i, "name": name}
+                           for name, i in category_ids.items()],
+        }
+
+    def save_coco(self, path, file_name, image_id=1):
+        with open(path, "w") as f:
+            json.dump(self.to_coco(file_name, image_id), f, indent=2)
+
+
+def naive_mouse_move(img, start, point):
+    """Day 6: full copy + rectangle on every mouse move."""
+    temp_img = img.copy()
+    cv2.rectangle(temp_img, start, point, (0, 255, 0), 2)
+    return temp_img
+
+
+if __name__ == "__main__":
+
+    # ----------------------------------
+    # 3. 8K slide: Day 6 vs dirty rectangles
+    # ----------------------------------
+
+    image_path = "sample.jpg"  # Replace with your slide / image path
+    image = cv2.imread(image_path)
+    if image is None:
+        image = np.full((480, 640, 3), 200, np.uint8)
+    image = cv2.resize(image, (7680, 4320))
+
+    # A rubber-band drag of 100 mouse-move events
+    drag = [(1000 + 20 * i, 800 + 12 * i) for i in range(100)]
+
+    start = time.perf_counter()
+    for point in drag:
+        naive_mouse_move(image, (1000, 800), point)
+    naive_ms = 1000 * (time.perf_counter() - start) / len(drag)
+
+    canvas = AnnotationCanvas(image, max_view=1600, labels=("cell", "artifact"))
+    # Same drag in view coordinates
+    vdrag = [(int(x * canvas.scale), int(y * canvas.scale)) for x, y in drag]
+
+    start = time.perf_counter()
+    canvas.on_mouse(cv2.EVENT_LBUTTONDOWN, *vdrag[0], 0, None)
+    for point in vdrag:
+        canvas.on_mouse(cv2.EVENT_MOUSEMOVE, *point, 0, None)
+    canvas.on_mouse(cv2.EVENT_LBUTTONUP, *vdrag[-1], 0, None)
+    canvas_ms = 1000 * (time.perf_counter() - start) / len(drag)
+
+    print(f"8K mouse move, Day 6 full copy:  {naive_ms:7.2f} ms")
+    print(f"8K mouse move, dirty rectangles: {canvas_ms:7.2f} ms")
+    print(f"View size: {canvas.view_size}, "
+          f"avg pixels redrawn per event: {canvas.pixels_redrawn // canvas.events}")
+    print("Annotations:", canvas.annotations)
+
+    # Partial redraws match a full-frame resize pixel for pixel
+    before = canvas.view.copy()
+    canvas.add([3001, 1777, 905, 611])
+    full = cv2.resize(canvas.layer, canvas.view_size, interpolation=cv2.INTER_AREA)
+    print("Partial redraw equals full resize:", np.array_equal(canvas.view_base, full))
+    canvas.undo()
+    print("Undo restores the previous view:", np.array_equal(canvas.view, before))
+
+    # Prime image sizes have no usable grid: only the dirty rect is resampled
+    odd = AnnotationCanvas(cv2.resize(image, (3001, 2003)))
+    start = time.perf_counter()
+    odd.add([1201, 803, 301, 203])
+    add_ms = 1000 * (time.perf_counter() - start)
+    start = time.perf_counter()
+    full = cv2.resize(odd.layer, odd.view_size, interpolation=cv2.INTER_AREA)
+    full_ms = 1000 * (time.perf_counter() - start)
+    diff = np.abs(odd.view_base.astype(int) - full).max()
+    print(f"3001x2003 add: {add_ms:.2f} ms (full resize {full_ms:.2f} ms), "
+          f"max difference: {diff}")
+
+    # ----------------------------------
+    # 4. Export JSON / COCO
+    # ----------------------------------
+
+    canvas.save_json("annotations.json")
+    canvas.save_coco("annotations_coco.json", file_name=image_path)
+    print("Saved annotations.json and annotations_coco.json")
+
+    # ----------------------------------
+    # 5. Interactive window
+    # ----------------------------------
+
+    window = "Annotation Canvas"
+    cv2.namedWindow(window)
+    cv2.setMouseCallback(window, canvas.on_mouse)
+
+    print("Drag to draw boxes. Keys: 1-9 label, 'u' undo, 'c' clear, "
+          "'s' save, 'q' quit.")
+
+    while True:
+        cv2.imshow(window, canvas.view)
+        key = cv2.waitKey(15) & 0xFF
+
+        if ord('1') <= key <= ord('9'):
+            canvas.select_label(key - ord('1'))
+            print("Label:", canvas.labels[canvas.label])
+
+        if key == ord('u'):
+            canvas.undo()
+
+        if key == ord('c'):
+            canvas.clear()
+            print("Annotations cleared.")
+
+        if key == ord('s'):
+            canvas.save_json("annotations.json")
+            canvas.save_coco("annotations_coco.json", file_name=image_path)
+            print("Saved", len(canvas.annotations), "annotations.")
+
+        if key == ord('q'):
+            print("Exiting...")
+            break
+
+    # ----------------------------------
+    # 6. Release resources
+    # ----------------------------------
+
+    cv2.destroyAllWindows()
+    print("Resources released successfully.")
+
+"""
+Summary:
+- The base image is never modified, boxes live in a vector list
+- The window shows a screen-sized view, not the 8K image
+- A mouse move restores and redraws only the rubber band's rectangle
+- Commit / undo redraw only the region under the affected box
+- Annotations export to plain JSON and COCO
+"""
@@ -0,0 +1,296 @@
+"""
+PHASE 4 — PyTorch Fundamentals
+Day 11: Video Frames -> Sharded Dataset
+
+Concepts:
+- turning videos into training samples
+- frame stride, resize and color conversion
+- fixed-size uint8 shards (.npy or tar of JPEGs)
+- a manifest indexing every shard
+- extracting several videos in parallel processes
+"""
+
+import io
+import json
+import os
+import tarfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+import torch
+from torch.utils.data import TensorDataset, DataLoader
+
+COLOR_CODES = {
+    "bgr": None,
+    "rgb": cv2.COLOR_BGR2RGB,
+    "gray": cv2.COLOR_BGR2GRAY,
+}
+
+MANIFEST = "manifest.json"
+
+
+# --------------------------------------------------
+# 1. Frame decoding
+# --------------------------------------------------
+
+def iter_video_frames(video_path, stride=1, size=None, color="rgb",
+                      max_frames=None):
+    """
+    Yield (frame_index, HWC uint8 frame) for every stride-th frame.
+
+    Skipped frames are only grabbed, never converted to images.
+    """
+    if color not in COLOR_CODES:
+        raise ValueError(f"Unknown color '{color}', expected one of {list(COLOR_CODES)}")
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise FileNotFoundError(f"Cannot open video file: {video_path}")
+
+    index = 0
+    kept = 0
+    try:
+        while max_frames is None or kept < max_frames:
+            if not cap.grab():
+                break
+            if index % stride == 0:
+                ret, frame = cap.retrieve()
+                if not ret:
+                    break
+                if size is not None:
+                    frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+                if COLOR_CODES[color] is not None:
+                    frame = cv2.cvtColor(frame, COLOR_CODES[color])
+                if frame.ndim == 2:
+                    frame = frame[:, :, None]
+                yield index, frame
+                kept += 1
+            index += 1
+    finally:
+        cap.release()
+
+
+# --------------------------------------------------
+# 2. Shard writers
+# --------------------------------------------------
+
+def _write_npy_shard(out_dir, name, images, labels, frames):
+    shard = {
+        "images": f"{name}_images.npy",
+        "labels": f"{name}_labels.npy",
+        "frames": f"{name}_frames.npy",
+        "count": len(images),
+    }
+    np.save(os.path.join(out_dir, shard["images"]), images)
+    np.save(os.path.join(out_dir, shard["labels"]), labels)
+    np.save(os.path.join(out_dir, shard["frames"]), frames)
+    return shard
+
+
+def _write_tar_shard(out_dir, name, images, labels, frames, color,
+                     quality=95):
+    # webdataset-style layout: <key>.jpg + <key>.cls per sample
+    shard = {"tar": f"{name}.tar", "count": len(images)}
+
+    with tarfile.open(os.path.join(out_dir, shard["tar"]), "w") as tar:
+        for image, label, (video_id, frame_index) in zip(images, labels, frames):
+            key = f"{video_id:04d}_{frame_index:07d}"
+            if color == "rgb":
+                # cv2.imencode expects BGR, so the JPEG stays a normal image
+                image = image[:, :, ::-1]
+            ok, jpg = cv2.imencode(".jpg", image,
+                                   [cv2.IMWRITE_JPEG_QUALITY, quality])
+            if not ok:
+                raise RuntimeError(f"JPEG encoding failed for {key}")
+
+            for suffix, payload in ((".jpg", jpg.tobytes()),
+                                    (".cls", str(int(label)).encode())):
+                info = tarfile.TarInfo(key + suffix)
+                info.size = len(payload)
+                tar.addfile(info, io.BytesIO(payload))
+
+    return shard
+
+
+def extract_video(video_path, out_dir, video_id=0, label=-1, stride=1,
+                  size=None, color="rgb", shard_size=512, fmt="npy",
+                  max_frames=None):
+    """
+    Decode one video into fixed-size shards and return their descriptions.
+
+    Every shard holds shard_size frames (the last one may be shorter).
+    """
+    if fmt not in ("npy", "tar"):
+        raise ValueError(f"Unknown shard format '{fmt}'")
+
+    os.makedirs(out_dir, exist_ok=True)
+    shards = []
+    buffer = None
+    frame_ids = np.zeros((shard_size, 2), np.int64)
+    count = 0
+
+    def flush():
+        name = f"v{video_id:04d}_{len(shards):05d}"
+        labels = np.full(count, label, np.int64)
+        if fmt == "npy":
+            shard = _write_npy_shard(out_dir, name, buffer[:count], labels,
+                                     frame_ids[:count])
+        else:
+            shard = _write_tar_shard(out_dir, name, buffer[:count], labels,
+                                     frame_ids[:count], color)
+        shard["shape"] = list(buffer.shape[1:])
+        shards.append(shard)
+
+    for frame_index, frame in iter_video_frames(video_path, stride, size,
+                                                color, max_frames):
+        if buffer is None:
+            # Preallocated once, reused for every shard of this video
+            buffer = np.empty((shard_size,) + frame.shape, np.uint8)
+        buffer[count] = frame
+        frame_ids[count] = (video_id, frame_index)
+        count += 1
+
+        if count == shard_size:
+            flush()
+            count = 0
+
+    if count:
+        flush()
+
+    return shards
+
+
+def _extract_job(job):
+    return job["video_id"], extract_video(**job)
+
+
+def extract_videos(video_paths, out_dir, labels=None, workers=None,
+                   **options):
+    """
+    Extract several videos in parallel processes and write a manifest.
+
+    options are passed to extract_video (stride, size, color, shard_size,
+    fmt, max_frames). Returns the manifest dict.
+    """
+    labels = labels if labels is not None else [-1] * len(video_paths)
+    jobs = [
+        dict(video_path=path, out_dir=out_dir, video_id=i, label=label,
+             **options)
+        for i, (path, label) in enumerate(zip(video_paths, labels))
+    ]
+
+    with ProcessPoolExecutor(workers) as pool:
+        results = dict(pool.map(_extract_job, jobs))
+
+    shards = [s for i in range(len(jobs)) for s in results[i]]
+    manifest = {
+        "format": options.get("fmt", "npy"),
+        "layout": "NHWC",
+        "dtype": "uint8",
+        "color": options.get("color", "rgb"),
+        "count": sum(s["count"] for s in shards),
+        "videos": [
+            {"video_id": i, "path": path, "label": label,
+             "frames": sum(s["count"] for s in results[i])}
+            for i, (path, label) in enumerate(zip(video_paths, labels))
+        ],
+        "shards": shards,
+    }
+
+    with open(os.path.join(out_dir, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    return manifest
+
+
+def load_npy_shard(out_dir, shard):
+    """Memory-map one .npy shard: (images NHWC uint8, labels int64)."""
+    images = np.load(os.path.join(out_dir, shard["images"]), mmap_mode="r")
+    labels = np.load(os.path.join(out_dir, shard["labels"]))
+    return images, labels
+
+
+def make_demo_video(path, num_frames, seed, size=(320, 240)):
+    """Write a small synthetic clip: one moving square per video."""
+    rng = np.random.default_rng(seed)
+    color = tuple(int(c) for c in rng.integers(64, 256, 3))
+    out = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), 30, size)
+    for t in range(num_frames):
+        frame = np.zeros((size[1], size[0], 3), np.uint8)
+        x = (5 * t) % (size[0] - 40)
+        cv2.rectangle(frame, (x, 100), (x + 40, 140), color, -1)
+        out.write(frame)
+    out.release()
+
+
+if __name__ == "__main__":
+
+    print("PHASE 4 — DAY 11")
+    print("Video Frames -> Sharded Dataset")
+    print("-" * 50)
+
+    # --------------------------------------------------
+    # 3. Create demo videos
+    # --------------------------------------------------
+
+    print("\n3. Creating demo videos")
+
+    os.makedirs("videos", exist_ok=True)
+    video_paths = []
+    for i in range(3):
+        path = os.path.join("videos", f"clip_{i}.mp4")
+        make_demo_video(path, num_frames=300, seed=i)
+        video_paths.append(path)
+
+    print("Videos:", video_paths)
+
+    # --------------------------------------------------
+    # 4. Extract into .npy shards (parallel)
+    # --------------------------------------------------
+
+    print("\n4. Extracting .npy shards")
+
+    start = time.perf_counter()
+    manifest = extract_videos(
+        video_paths, "frame_shards", labels=[0, 1, 2], workers=3,
+        stride=2, size=(64, 64), color="rgb", shard_size=64, fmt="npy"
+    )
+    print(f"Extracted {manifest['count']} frames into "
+          f"{len(manifest['shards'])} shards in "
+          f"{time.perf_counter() - start:.2f} s")
+
+    # --------------------------------------------------
+    # 5. Extract into tar shards (JPEG + label)
+    # --------------------------------------------------
+
+    print("\n5. Extracting tar shards")
+
+    manifest_tar = extract_videos(
+        video_paths, "frame_shards_tar", labels=[0, 1, 2], workers=3,
+        stride=2, size=(64, 64), shard_size=64, fmt="tar"
+    )
+    print("Tar shards:", [s["tar"] for s in manifest_tar["shards"]][:3], "...")
+
+    # --------------------------------------------------
+    # 6. Feed a shard into TensorDataset / DataLoader
+    # --------------------------------------------------
+
+    print("\n6. Training tensors from a shard")
+
+    images, labels = load_npy_shard("frame_shards", manifest["shards"][0])
+
+    # uint8 NHWC -> float NCHW only when building the tensors
+    X = torch.from_numpy(np.array(images)).permute(0, 3, 1, 2)
+    X = X.float() / 255
+    y = torch.from_numpy(labels)
+
+    loader = DataLoader(TensorDataset(X, y), batch_size=16, shuffle=True)
+
+    for batch_X, batch_y in loader:
+        print("Image batch shape:", batch_X.shape)
+        print("Label batch:", batch_y)
+        break
+
+    print("\nDay 11 completed successfully.")
@@ -0,0 +1,180 @@
+"""
+PHASE 4 — PyTorch Fundamentals
+Day 12: Batch-Indexed Tensor Loader
+
+Concepts:
+- DataLoader calls __getitem__ once per sample, then collates
+- in-memory tensors can be gathered a whole batch at a time
+- one shuffled index tensor per epoch, one index_select per field
+- contiguous slices (views, no copy) when not shuffling
+- same for-loop API as DataLoader
+"""
+
+import time
+
+import torch
+from torch.utils.data import TensorDataset, DataLoader
+
+
+# --------------------------------------------------
+# 1. Tensor batch loader
+# --------------------------------------------------
+
+class TensorBatchLoader:
+    """
+    DataLoader replacement for tensors that already live in memory.
+
+    tensors    : a TensorDataset or tensors with the same first dimension
+    shuffle    : new random order every epoch (torch.randperm)
+    drop_last  : skip the last incomplete batch
+    generator  : torch.Generator for reproducible shuffling
+    device     : move each batch to this device (non_blocking)
+
+    Iterating yields tuples of batch tensors, like DataLoader over a
+    TensorDataset.
+    """
+
+    def __init__(self, *tensors, batch_size=1, shuffle=False, drop_last=False,
+                 generator=None, device=None):
+        if len(tensors) == 1 and isinstance(tensors[0], TensorDataset):
+            tensors = tensors[0].tensors
+        if not tensors:
+            raise ValueError("At least one tensor is required")
+        if any(t.size(0) != tensors[0].size(0) for t in tensors):
+            raise ValueError("All tensors must have the same first dimension")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
+        self.tensors = tensors
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.generator = generator
+        self.device = device
+
+    def __len__(self):
+        n = self.tensors[0].size(0)
+        if self.drop_last:
+            return n // self.batch_size
+        return (n + self.batch_size - 1) // self.batch_size
+
+    def _to_device(self, batch):
+        if self.device is None:
+            return batch
+        return tuple(t.to(self.device, non_blocking=True) for t in batch)
+
+    def __iter__(self):
+        n = self.tensors[0].size(0)
+        bs = self.batch_size
+        stop = n - n % bs if self.drop_last else n
+
+        if not self.shuffle:
+            # Slices are views: no data is copied
+            for start in range(0, stop, bs):
+                yield self._to_device(tuple(t[start:start + bs] for t in self.tensors))
+            return
+
+        order = torch.randperm(n, generator=self.generator)
+        for start in range(0, stop, bs):
+            index = order[start:start + bs]
+            yield self._to_device(tuple(t.index_select(0, index) for t in self.tensors))
+
+
+def time_epoch(loader, epochs=1):
+    start = time.perf_counter()
+    batches = 0
+    for _ in range(epochs):
+        for batch in loader:
+            batches += 1
+    return (time.perf_counter() - start) / epochs, batches // epochs
+
+
+if __name__ == "__main__":
+
+    print("PHASE 4 — DAY 12")
+    print("Batch-Indexed Tensor Loader")
+    print("-" * 50)
+
+    # --------------------------------------------------
+    # 2. Same batches as DataLoader
+    # --------------------------------------------------
+
+    print("\n2. Same API as DataLoader")
+
+    X = torch.tensor([
+        [1, 2],
+        [2, 3],
+        [3, 4],
+        [4, 5]
+    ], dtype=torch.float32)
+
+    y = torch.tensor([3, 5, 7, 9], dtype=torch.float32)
+
+    dataset = TensorDataset(X, y)
+
+    loader = TensorBatchLoader(dataset, batch_size=2)
+
+    for batch_X, batch_y in loader:
+        print("Batch features:", batch_X)
+        print("Batch labels:", batch_y)
+
+    same = all(
+        torch.equal(a, b) and torch.equal(c, d)
+        for (a, c), (b, d) in zip(loader, DataLoader(dataset, batch_size=2))
+    )
+    print("Identical to DataLoader (no shuffle):", same)
+
+    # --------------------------------------------------
+    # 3. Shuffled batches
+    # --------------------------------------------------
+
+    print("\n3. Shuffling with a generator")
+
+    g = torch.Generator().manual_seed(0)
+    loader_shuffled = TensorBatchLoader(X, y, batch_size=2, shuffle=True,
+                                        generator=g)
+
+    for batch_X, batch_y in loader_shuffled:
+        print("Batch features:", batch_X)
+        print("Batch labels:", batch_y)
+
+    # --------------------------------------------------
+    # 4. Benchmark: small samples
+    # --------------------------------------------------
+
+    print("\n4. Benchmark (100k samples x 16 features, batch 64)")
+
+    X = torch.randn(100_000, 16)
+    y = torch.randint(0, 10, (100_000,))
+    dataset = TensorDataset(X, y)
+
+    for shuffle in (False, True):
+        dl_time, n = time_epoch(DataLoader(dataset, batch_size=64, shuffle=shuffle))
+        tl_time, _ = time_epoch(TensorBatchLoader(dataset, batch_size=64,
+                                                  shuffle=shuffle))
+        print(f"shuffle={shuffle!s:<5}  DataLoader {1000 * dl_time:8.1f} ms/epoch  "
+              f"TensorBatchLoader {1000 * tl_time:6.1f} ms/epoch  "
+              f"({dl_time / tl_time:5.0f}x, {n} batches)")
+
+    # --------------------------------------------------
+    # 5. Benchmark: image tensors
+    # --------------------------------------------------
+
+    print("\n5. Benchmark (5k images 3x64x64, batch 32)")
+
+    images = torch.rand(5_000, 3, 64, 64)
+    labels = torch.randint(0, 10, (5_000,))
+    image_dataset = TensorDataset(images, labels)
+
+    dl_time, n = time_epoch(DataLoader(image_dataset, batch_size=32, shuffle=True))
+    tl_time, _ = time_epoch(TensorBatchLoader(image_dataset, batch_size=32,
+                                              shuffle=True))
+    print(f"DataLoader        {1000 * dl_time:8.1f} ms/epoch")
+    print(f"TensorBatchLoader {1000 * tl_time:8.1f} ms/epoch ({dl_time / tl_time:.1f}x)")
+
+    for imgs, labs in TensorBatchLoader(image_dataset, batch_size=4):
+        print("Image batch shape:", imgs.shape)
+        print("Label batch shape:", labs.shape)
+        break
+
+    print("\nDay 12 completed successfully.")
@@ -0,0 +1,312 @@
+"""
+PHASE 4 — PyTorch Fundamentals
+Day 13: Memory-Mapped Sharded Dataset
+
+Concepts:
+- datasets larger than RAM
+- uint8 image shards on disk + a manifest (same format as Day 11)
+- np.load(mmap_mode="c"): zero-copy reads, pages loaded on demand
+- float conversion per batch, not for the whole dataset
+- lazy opening so DataLoader workers share the page cache
+"""
+
+import bisect
+import json
+import os
+import pickle
+import time
+from functools import partial
+
+import numpy as np
+import torch
+from torch.utils.data import (BatchSampler, DataLoader, Dataset, RandomSampler,
+                              SequentialSampler)
+
+MANIFEST = "manifest.json"
+
+
+# --------------------------------------------------
+# 1. Writing shards
+# --------------------------------------------------
+
+def write_tensor_shards(images, labels, out_dir, shard_size=4096,
+                        layout="NCHW", prefix="shard"):
+    """
+    Save uint8 images (N, C, H, W or N, H, W, C) and labels as .npy shards.
+
+    Float images in [0, 1] are converted to uint8 first. Writes a manifest
+    with the same keys as Day 11 extract_videos and returns it.
+    """
+    if layout not in ("NCHW", "NHWC"):
+        raise ValueError(f"Unknown layout '{layout}'")
+
+    images = torch.as_tensor(images)
+    if images.dtype != torch.uint8:
+        images = (images.clamp(0, 1) * 255).round().to(torch.uint8)
+    labels = torch.as_tensor(labels)
+
+    os.makedirs(out_dir, exist_ok=True)
+    shards = []
+    for k, start in enumerate(range(0, len(images), shard_size)):
+        name = f"{prefix}_{k:05d}"
+        shard = {
+            "images": f"{name}_images.npy",
+            "labels": f"{name}_labels.npy",
+            "count": min(shard_size, len(images) - start),
+            "shape": list(images.shape[1:]),
+        }
+        np.save(os.path.join(out_dir, shard["images"]),
+                images[start:start + shard_size].numpy())
+        np.save(os.path.join(out_dir, shard["labels"]),
+                labels[start:start + shard_size].numpy())
+        shards.append(shard)
+
+    manifest = {
+        "format": "npy",
+        "layout": layout,
+        "dtype": "uint8",
+        "count": len(images),
+        "shards": shards,
+    }
+    with open(os.path.join(out_dir, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+# --------------------------------------------------
+# 2. Dataset
+# --------------------------------------------------
+
+class MemmapShardDataset(Dataset):
+    """
+    Map-style dataset over memory-mapped uint8 shards.
+
+    Samples are (uint8 CHW tensor, label). Shards are opened lazily in
+    the process that reads them and are never pickled, so DataLoader
+    workers map the same files instead of copying the data. A DataLoader
+    reads each batch through __getitems__ (one read per shard touched);
+    batch_loader skips the per-sample split and returns float NCHW
+    batches straight from read_batch.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        with open(os.path.join(root, MANIFEST)) as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format", "npy") != "npy":
+            raise ValueError("MemmapShardDataset needs .npy shards")
+
+        self.layout = self.manifest.get("layout", "NHWC")
+        self.shards = self.manifest["shards"]
+        self.offsets = np.cumsum([0] + [s["count"] for s in self.shards])
+        self._maps = None
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    # ---- lazy shard access ----
+
+    def _open(self):
+        if self._maps is None:
+            # mmap_mode "c" (copy-on-write) gives writable arrays for
+            # torch.from_numpy without ever writing back to the files
+            self._maps = [
+                (np.load(os.path.join(self.root, s["images"]), mmap_mode="c"),
+                 np.load(os.path.join(self.root, s["labels"]), mmap_mode="c"))
+                for s in self.shards
+            ]
+        return self._maps
+
+    def __getstate__(self):
+        # Workers reopen the shards themselves; only paths are pickled
+        state = self.__dict__.copy()
+        state["_maps"] = None
+        return state
+
+    def _locate(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"Index {index} out of range")
+        shard = bisect.bisect_right(self.offsets, index) - 1
+        return shard, index - self.offsets[shard]
+
+    def _chw(self, images):
+        images = torch.from_numpy(images)
+        if self.layout == "NHWC":
+            images = images.permute(0, 3, 1, 2) if images.dim() == 4 else \
+                images.permute(2, 0, 1)
+        return images
+
+    # ---- reading ----
+
+    def __getitem__(self, index):
+        shard, offset = self._locate(index)
+        images, labels = self._open()[shard]
+        return self._chw(images[offset]), int(labels[offset])
+
+    def read_batch(self, indices):
+        """Read a whole batch at once: (uint8 N,C,H,W tensor, int64 labels)."""
+        maps = self._open()
+        indices = np.asarray(indices, dtype=np.int64)
+        indices[indices < 0] += len(self)
+        if len(indices) and not (0 <= indices.min() and indices.max() < len(self)):
+            raise IndexError("Batch index out of range")
+        shard_ids = np.searchsorted(self.offsets, indices, side="right") - 1
+
+        first = maps[0][0]
+        batch = np.empty((len(indices),) + first.shape[1:], first.dtype)
+        labels = np.empty(len(indices), np.int64)
+
+        # One fancy-index read per shard touched, in file order
+        for shard in np.unique(shard_ids):
+            where = np.nonzero(shard_ids == shard)[0]
+            local = indices[where] - self.offsets[shard]
+            order = np.argsort(local, kind="stable")
+            images, shard_labels = maps[shard]
+            batch[where[order]] = images[local[order]]
+            labels[where[order]] = shard_labels[local[order]]
+
+        return self._chw(batch), torch.from_numpy(labels)
+
+    def __getitems__(self, indices):
+        # Same reads as read_batch, but one (image, label) sample per index
+        # (views into the batch), as the default collate and Subset expect
+        images, labels = self.read_batch(indices)
+        return [(images[i], int(labels[i])) for i in range(len(images))]
+
+
+class _BatchReader(Dataset):
+    # dataset[list of indices] -> one read_batch call (used with batch_size=None)
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+
+    def __len__(self):
+        return len(self.dataset)
+
+    def __getitem__(self, indices):
+        return self.dataset.read_batch(indices)
+
+
+def collate_float(batch, mean=None, std=None):
+    """uint8 batch from read_batch -> contiguous float NCHW in [0, 1]."""
+    images, labels = batch
+    images = images.contiguous().float().div_(255)
+    if mean is not None:
+        mean = torch.as_tensor(mean).view(1, -1, 1, 1)
+        std = torch.as_tensor(std).view(1, -1, 1, 1)
+        images = images.sub_(mean).div_(std)
+    return images, labels
+
+
+def batch_loader(dataset, batch_size, shuffle=False, drop_last=False,
+                 mean=None, std=None, **kwargs):
+    """
+    DataLoader that reads every batch with one read_batch call and turns
+    it into float with collate_float (no per-sample tensors, no stack).
+    Extra keyword arguments (num_workers, ...) go to DataLoader.
+    """
+    sampler = RandomSampler(dataset) if shuffle else SequentialSampler(dataset)
+    return DataLoader(_BatchReader(dataset), batch_size=None,
+                      sampler=BatchSampler(sampler, batch_size, drop_last),
+                      collate_fn=partial(collate_float, mean=mean, std=std),
+                      **kwargs)
+
+
+def rss_mb():
+    # Resident memory of this process (Linux), 0 elsewhere
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+if __name__ == "__main__":
+
+    print("PHASE 4 — DAY 13")
+    print("Memory-Mapped Sharded Dataset")
+    print("-" * 50)
+
+    # --------------------------------------------------
+    # 3. Write uint8 shards
+    # --------------------------------------------------
+
+    print("\n3. Writing shards")
+
+    num_images = 20_000
+    images = torch.randint(0, 256, (num_images, 3, 64, 64), dtype=torch.uint8)
+    labels = torch.randint(0, 10, (num_images,))
+
+    manifest = write_tensor_shards(images, labels, "image_shards",
+                                   shard_size=4096)
+    print("Shards:", len(manifest["shards"]), "Images:", manifest["count"])
+    print(f"uint8 on disk: {images.numel() / 1e6:.0f} MB "
+          f"(float32 in RAM would be {4 * images.numel() / 1e6:.0f} MB)")
+    del images
+
+    # --------------------------------------------------
+    # 4. Open as a dataset
+    # --------------------------------------------------
+
+    print("\n4. Memory-mapped dataset")
+
+    before = rss_mb()
+    dataset = MemmapShardDataset("image_shards")
+    img, label = dataset[12345]
+    print("Dataset length:", len(dataset))
+    print("Sample:", img.shape, img.dtype, "label", label)
+    print(f"Memory after opening: +{rss_mb() - before:.1f} MB")
+    print("Pickled dataset size:", len(pickle.dumps(dataset)), "bytes")
+
+    # --------------------------------------------------
+    # 5. DataLoader with batched reads
+    # --------------------------------------------------
+
+    print("\n5. DataLoader (float conversion per batch)")
+
+    plain = DataLoader(dataset, batch_size=4)
+    plain_X, plain_y = next(iter(plain))
+    print("Default collate:", plain_X.shape, plain_X.dtype, plain_y.tolist())
+
+    loader = batch_loader(dataset, batch_size=64, shuffle=True)
+
+    start = time.perf_counter()
+    for batch_X, batch_y in loader:
+        pass
+    print(f"Epoch: {time.perf_counter() - start:.2f} s")
+    print("Image batch shape:", batch_X.shape, batch_X.dtype)
+    print("Label batch shape:", batch_y.shape)
+
+    # --------------------------------------------------
+    # 6. Worker processes share the mapping
+    # --------------------------------------------------
+
+    print("\n6. DataLoader with 2 workers")
+
+    loader = batch_loader(dataset, batch_size=64, shuffle=True, num_workers=2)
+
+    start = time.perf_counter()
+    count = sum(len(batch_y) for _, batch_y in loader)
+    print(f"{count} samples in {time.perf_counter() - start:.2f} s")
+
+    # --------------------------------------------------
+    # 7. Day 11 video shards (NHWC) work too
+    # --------------------------------------------------
+
+    print("\n7. Day 11 frame shards")
+
+    if os.path.exists(os.path.join("frame_shards", MANIFEST)):
+        frames = MemmapShardDataset("frame_shards")
+        frame_batch, frame_labels = collate_float(frames.read_batch([0, 1, 2, 3]))
+        print("Layout on disk:", frames.layout)
+        print("Frame batch shape:", frame_batch.shape)
+        print("Frame labels:", frame_labels)
+    else:
+        print("Run phase4_day11_video_to_shards.py first")
+
+    print("\nDay 13 completed successfully.")
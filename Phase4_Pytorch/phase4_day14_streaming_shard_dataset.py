@@ -0,0 +1,261 @@
+"""
+PHASE 4 — PyTorch Fundamentals
+Day 14: Streaming Shard Dataset (IterableDataset)
+
+Concepts:
+- map-style datasets read samples in random order (random I/O)
+- IterableDataset streams whole shards front to back (sequential I/O)
+- splitting shards across ranks and DataLoader workers deterministically
+- shuffling through a bounded in-memory buffer
+- decoding JPEGs inside the worker processes
+- set_epoch() for a new, reproducible order every epoch
+"""
+
+import json
+import os
+import random
+import tarfile
+import time
+
+import cv2
+import numpy as np
+import torch
+import torch.distributed as dist
+from torch.utils.data import IterableDataset, DataLoader, get_worker_info
+
+from phase4_day11_video_to_shards import MANIFEST, extract_videos, make_demo_video
+
+
+# --------------------------------------------------
+# 1. Shard readers
+# --------------------------------------------------
+
+def iter_npy_shard(root, shard, chunk=256):
+    """Yield (HWC uint8 image, label) from one .npy shard, in file order."""
+    images = np.load(os.path.join(root, shard["images"]), mmap_mode="r")
+    labels = np.load(os.path.join(root, shard["labels"]))
+    for start in range(0, len(images), chunk):
+        # One sequential read per chunk instead of one per sample
+        block = np.array(images[start:start + chunk])
+        for image, label in zip(block, labels[start:start + chunk]):
+            yield image, int(label)
+
+
+def iter_tar_shard(root, shard, color="rgb"):
+    """Yield (HWC uint8 image, label) from a tar of <key>.jpg + <key>.cls."""
+    sample = {}
+    key = None
+    # "r|" streams the archive sequentially, no seeking
+    with tarfile.open(os.path.join(root, shard["tar"]), "r|") as tar:
+        for member in tar:
+            if not member.isfile():
+                continue
+            member_key, _, suffix = member.name.rpartition(".")
+            if member_key != key and sample:
+                yield _decode_sample(sample, color)
+                sample = {}
+            key = member_key
+            sample[suffix] = tar.extractfile(member).read()
+        if sample:
+            yield _decode_sample(sample, color)
+
+
+def _decode_sample(sample, color):
+    flag = cv2.IMREAD_GRAYSCALE if color == "gray" else cv2.IMREAD_COLOR
+    image = cv2.imdecode(np.frombuffer(sample["jpg"], np.uint8), flag)
+    if image is None:
+        raise RuntimeError("JPEG decoding failed")
+    if color == "rgb":
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    if image.ndim == 2:
+        image = image[:, :, None]
+    return image, int(sample["cls"])
+
+
+# --------------------------------------------------
+# 2. Shuffle buffer
+# --------------------------------------------------
+
+def shuffle_buffer(samples, size, rng):
+    """Approximate shuffle holding at most `size` samples in memory."""
+    if size <= 1:
+        yield from samples
+        return
+
+    buffer = []
+    for sample in samples:
+        if len(buffer) < size:
+            buffer.append(sample)
+            continue
+        i = rng.randrange(size)
+        yield buffer[i]
+        buffer[i] = sample
+
+    rng.shuffle(buffer)
+    yield from buffer
+
+
+# --------------------------------------------------
+# 3. Streaming dataset
+# --------------------------------------------------
+
+def _rank_and_world_size(rank, world_size):
+    if rank is not None and world_size is not None:
+        return rank, world_size
+    if dist.is_available() and dist.is_initialized():
+        return dist.get_rank(), dist.get_world_size()
+    return 0, 1
+
+
+class StreamingShardDataset(IterableDataset):
+    """
+    Stream samples from the shards of a Day 11 / Day 13 manifest.
+
+    Shard order is shuffled with (seed, epoch), then shard i goes to
+    rank i % world_size, and within a rank to worker j % num_workers.
+    Every sample is read exactly once per epoch across all ranks and
+    workers. Ranks can see different sample counts when shards differ
+    in size.
+
+    Yields (uint8 CHW tensor, label).
+    """
+
+    def __init__(self, root, shuffle_buffer=1000, shuffle_shards=True, seed=0,
+                 rank=None, world_size=None, transform=None):
+        self.root = root
+        with open(os.path.join(root, MANIFEST)) as f:
+            self.manifest = json.load(f)
+
+        self.format = self.manifest["format"]
+        self.layout = self.manifest.get("layout", "NHWC")
+        self.color = self.manifest.get("color", "rgb")
+        self.shards = self.manifest["shards"]
+
+        self.shuffle_buffer = shuffle_buffer
+        self.shuffle_shards = shuffle_shards
+        self.seed = seed
+        self.rank, self.world_size = _rank_and_world_size(rank, world_size)
+        self.transform = transform
+        self.epoch = 0
+
+    def set_epoch(self, epoch):
+        """Call before each epoch (as with DistributedSampler)."""
+        self.epoch = epoch
+
+    def shards_for(self, rank, worker_id=0, num_workers=1):
+        order = list(range(len(self.shards)))
+        if self.shuffle_shards:
+            random.Random(self.seed + self.epoch).shuffle(order)
+        mine = order[rank::self.world_size]
+        return mine[worker_id::num_workers]
+
+    def _iter_shard(self, shard):
+        if self.format == "tar":
+            return iter_tar_shard(self.root, shard, self.color)
+        return iter_npy_shard(self.root, shard)
+
+    def _to_chw(self, image):
+        image = torch.from_numpy(np.ascontiguousarray(image))
+        return image if self.layout == "NCHW" else image.permute(2, 0, 1)
+
+    def __iter__(self):
+        info = get_worker_info()
+        worker_id, num_workers = (info.id, info.num_workers) if info else (0, 1)
+
+        shard_ids = self.shards_for(self.rank, worker_id, num_workers)
+        rng = random.Random(hash((self.seed, self.epoch, self.rank, worker_id)))
+
+        samples = (s for i in shard_ids for s in self._iter_shard(self.shards[i]))
+        for image, label in shuffle_buffer(samples, self.shuffle_buffer, rng):
+            image = self._to_chw(image)
+            if self.transform is not None:
+                image = self.transform(image)
+            yield image, label
+
+
+def to_float(batch):
+    images, labels = batch
+    return images.float().div_(255), labels
+
+
+if __name__ == "__main__":
+
+    print("PHASE 4 — DAY 14")
+    print("Streaming Shard Dataset")
+    print("-" * 50)
+
+    # --------------------------------------------------
+    # 4. Shards from Day 11 (created if missing)
+    # --------------------------------------------------
+
+    print("\n4. Preparing shards")
+
+    if not os.path.exists(os.path.join("frame_shards_tar", MANIFEST)):
+        os.makedirs("videos", exist_ok=True)
+        video_paths = []
+        for i in range(3):
+            path = os.path.join("videos", f"clip_{i}.mp4")
+            make_demo_video(path, num_frames=300, seed=i)
+            video_paths.append(path)
+        for fmt, out_dir in (("npy", "frame_shards"), ("tar", "frame_shards_tar")):
+            extract_videos(video_paths, out_dir, labels=[0, 1, 2], stride=2,
+                           size=(64, 64), shard_size=64, fmt=fmt)
+
+    for out_dir in ("frame_shards", "frame_shards_tar"):
+        ds = StreamingShardDataset(out_dir)
+        print(f"{out_dir}: {len(ds.shards)} shards, "
+              f"{ds.manifest['count']} samples, format {ds.format}")
+
+    # --------------------------------------------------
+    # 5. Deterministic split over ranks and workers
+    # --------------------------------------------------
+
+    print("\n5. Shards per (rank, worker), world size 2, 2 workers")
+
+    world_size, num_workers = 2, 2
+    seen = []
+    for rank in range(world_size):
+        ds = StreamingShardDataset("frame_shards", rank=rank,
+                                   world_size=world_size)
+        for worker_id in range(num_workers):
+            ids = ds.shards_for(rank, worker_id, num_workers)
+            seen.extend(ids)
+            print(f"rank {rank} worker {worker_id}: shards {ids}")
+    print("Every shard exactly once:", sorted(seen) == list(range(len(ds.shards))))
+
+    # --------------------------------------------------
+    # 6. DataLoader with workers (JPEG decoding in workers)
+    # --------------------------------------------------
+
+    print("\n6. Streaming tar shards through a DataLoader")
+
+    dataset = StreamingShardDataset("frame_shards_tar", shuffle_buffer=500)
+    loader = DataLoader(dataset, batch_size=32, num_workers=2)
+
+    for epoch in range(2):
+        dataset.set_epoch(epoch)
+        start = time.perf_counter()
+        count = 0
+        first_labels = None
+        for batch_X, batch_y in loader:
+            batch_X, batch_y = to_float((batch_X, batch_y))
+            first_labels = first_labels if first_labels is not None else batch_y[:8]
+            count += len(batch_y)
+        elapsed = time.perf_counter() - start
+        print(f"Epoch {epoch}: {count} samples, {count / elapsed:.0f} samples/s, "
+              f"first labels {first_labels.tolist()}")
+
+    print("Image batch shape:", batch_X.shape, batch_X.dtype)
+
+    # --------------------------------------------------
+    # 7. Streaming .npy shards
+    # --------------------------------------------------
+
+    print("\n7. Streaming .npy shards")
+
+    dataset = StreamingShardDataset("frame_shards", shuffle_buffer=500)
+    start = time.perf_counter()
+    count = sum(len(y) for _, y in DataLoader(dataset, batch_size=32))
+    print(f"{count} samples, {count / (time.perf_counter() - start):.0f} samples/s")
+
+    print("\nDay 14 completed successfully.")
@@ -0,0 +1,244 @@
+"""
+PHASE 4 — PyTorch Fundamentals
+Day 15: Shared-Memory Decoded-Sample Cache
+
+Concepts:
+- every DataLoader worker decodes and resizes the same images each epoch
+- caches inside one worker are invisible to the others
+- one shared-memory arena (tensor.share_memory_()) for all workers
+- fixed-size slots sized from a byte budget
+- slot table + CLOCK eviction when the arena is full
+- a process-shared lock around the table
+"""
+
+import multiprocessing as mp
+import os
+import time
+
+import cv2
+import numpy as np
+import torch
+from torch.utils.data import Dataset, DataLoader
+
+
+# --------------------------------------------------
+# 1. Expensive dataset: JPEG decode + resize
+# --------------------------------------------------
+
+class ImageFileDataset(Dataset):
+    """Decode an image file per sample, resize it, return (uint8 HWC, label)."""
+
+    def __init__(self, paths, labels, size=(64, 64)):
+        self.paths = list(paths)
+        self.labels = list(labels)
+        self.size = size
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __getitem__(self, index):
+        image = cv2.imread(self.paths[index])
+        if image is None:
+            raise FileNotFoundError(f"Cannot read image: {self.paths[index]}")
+        image = cv2.resize(image, self.size, interpolation=cv2.INTER_AREA)
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        return torch.from_numpy(image), self.labels[index]
+
+
+# --------------------------------------------------
+# 2. Shared cache
+# --------------------------------------------------
+
+class SharedSampleCache(Dataset):
+    """
+    Wrap a dataset returning (fixed-shape uint8 tensor, int label) and keep
+    decoded samples in a shared-memory arena.
+
+    The arena holds budget_bytes // sample bytes slots. slot_of[index] maps
+    a dataset index to its slot, owner[slot] maps back. When the arena is
+    full a CLOCK hand evicts the first slot whose reference bit is clear.
+    Every tensor is created with share_memory_() before the DataLoader
+    starts its workers, so any worker can fill or read any slot.
+    """
+
+    def __init__(self, dataset, sample_shape, budget_bytes, dtype=torch.uint8):
+        self.dataset = dataset
+        self.sample_shape = tuple(sample_shape)
+        sample_bytes = int(np.prod(sample_shape)) * torch.empty((), dtype=dtype).element_size()
+
+        self.num_slots = min(budget_bytes // sample_bytes, len(dataset))
+        if self.num_slots < 1:
+            raise ValueError("budget_bytes is smaller than one sample")
+
+        n = len(dataset)
+        self.arena = torch.empty((self.num_slots,) + self.sample_shape,
+                                 dtype=dtype).share_memory_()
+        self.labels = torch.zeros(self.num_slots, dtype=torch.int64).share_memory_()
+        self.slot_of = torch.full((n,), -1, dtype=torch.int64).share_memory_()
+        self.owner = torch.full((self.num_slots,), -1, dtype=torch.int64).share_memory_()
+        self.referenced = torch.zeros(self.num_slots, dtype=torch.bool).share_memory_()
+        # [clock hand, hits, misses, evictions]
+        self.counters = torch.zeros(4, dtype=torch.int64).share_memory_()
+        self.lock = mp.Lock()
+
+    def __len__(self):
+        return len(self.dataset)
+
+    @property
+    def nbytes(self):
+        return self.arena.numel() * self.arena.element_size()
+
+    def _lookup(self, index):
+        # Called with the lock held
+        slot = int(self.slot_of[index])
+        if slot >= 0 and int(self.owner[slot]) == index:
+            self.referenced[slot] = True
+            self.counters[1] += 1
+            return self.arena[slot].clone(), int(self.labels[slot])
+        return None
+
+    def _victim(self):
+        # CLOCK: clear reference bits until an unreferenced slot comes up
+        hand = int(self.counters[0])
+        while self.referenced[hand]:
+            self.referenced[hand] = False
+            hand = (hand + 1) % self.num_slots
+        self.counters[0] = (hand + 1) % self.num_slots
+        return hand
+
+    def __getitem__(self, index):
+        with self.lock:
+            cached = self._lookup(index)
+        if cached is not None:
+            return cached
+
+        # Decode outside the lock so workers decode in parallel
+        image, label = self.dataset[index]
+        image = torch.as_tensor(image)
+        if tuple(image.shape) != self.sample_shape:
+            raise ValueError(f"Sample {index} has shape {tuple(image.shape)}, "
+                             f"expected {self.sample_shape}")
+
+        with self.lock:
+            self.counters[2] += 1
+            if int(self.slot_of[index]) < 0:   # another worker may have won
+                slot = self._victim()
+                old = int(self.owner[slot])
+                if old >= 0:
+                    self.slot_of[old] = -1
+                    self.counters[3] += 1
+                self.arena[slot] = image
+                self.labels[slot] = label
+                self.owner[slot] = index
+                self.slot_of[index] = slot
+                self.referenced[slot] = True
+
+        return image, label
+
+    def stats(self):
+        hits, misses, evictions = (int(v) for v in self.counters[1:])
+        return {
+            "slots": self.num_slots,
+            "cached": int((self.owner >= 0).sum()),
+            "hits": hits,
+            "misses": misses,
+            "evictions": evictions,
+            "hit_rate": hits / max(hits + misses, 1),
+        }
+
+    def reset_stats(self):
+        with self.lock:
+            self.counters[1:] = 0
+
+
+def _make_demo_images(directory, count, size=(640, 480), seed=0):
+    # JPEGs large enough that decoding + resizing dominates
+    os.makedirs(directory, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"img_{i:05d}.jpg")
+        if not os.path.exists(path):
+            image = np.zeros((size[1], size[0], 3), np.uint8)
+            for _ in range(5):
+                color = tuple(int(c) for c in rng.integers(0, 256, 3))
+                center = tuple(int(c) for c in rng.integers(0, size, 2))
+                cv2.circle(image, center, int(rng.integers(20, 150)), color, -1)
+            image = cv2.add(image, rng.integers(0, 30, image.shape, np.uint8))
+            cv2.imwrite(path, image)
+        paths.append(path)
+    return paths
+
+
+def time_epochs(dataset, epochs, **loader_kwargs):
+    loader = DataLoader(dataset, **loader_kwargs)
+    times = []
+    for _ in range(epochs):
+        start = time.perf_counter()
+        for _ in loader:
+            pass
+        times.append(time.perf_counter() - start)
+    return times
+
+
+if __name__ == "__main__":
+
+    print("PHASE 4 — DAY 15")
+    print("Shared-Memory Decoded-Sample Cache")
+    print("-" * 50)
+
+    # --------------------------------------------------
+    # 3. Image files on disk
+    # --------------------------------------------------
+
+    print("\n3. Creating demo JPEGs")
+
+    paths = _make_demo_images("cache_images", 1000)
+    labels = [i % 10 for i in range(len(paths))]
+    base = ImageFileDataset(paths, labels, size=(64, 64))
+    print("Images:", len(paths), "decoded size: 64x64x3")
+
+    loader_kwargs = dict(batch_size=32, shuffle=True, num_workers=2,
+                         persistent_workers=True)
+
+    # --------------------------------------------------
+    # 4. No cache: every epoch decodes everything
+    # --------------------------------------------------
+
+    print("\n4. Without cache")
+
+    times = time_epochs(base, 3, **loader_kwargs)
+    print("Epoch times:", [f"{t:.2f} s" for t in times])
+
+    # --------------------------------------------------
+    # 5. Cache that fits the dataset
+    # --------------------------------------------------
+
+    print("\n5. Shared cache, budget fits the dataset")
+
+    cached = SharedSampleCache(base, (64, 64, 3), budget_bytes=32 * 2**20)
+    times = time_epochs(cached, 3, **loader_kwargs)
+    print("Epoch times:", [f"{t:.2f} s" for t in times])
+    print(f"Arena: {cached.nbytes / 2**20:.1f} MB,", cached.stats())
+
+    # --------------------------------------------------
+    # 6. Cache smaller than the dataset (CLOCK eviction)
+    # --------------------------------------------------
+
+    print("\n6. Shared cache, budget for half the dataset")
+
+    # A shuffled epoch is a full scan: most slots are evicted before they
+    # are read again, so hit rates stay well below budget / dataset size
+
+    half = SharedSampleCache(base, (64, 64, 3), budget_bytes=500 * 64 * 64 * 3)
+    times = time_epochs(half, 3, **loader_kwargs)
+    print("Epoch times:", [f"{t:.2f} s" for t in times])
+    print(half.stats())
+
+    # Samples come back as uint8 HWC; convert per batch for training
+    images, batch_labels = next(iter(DataLoader(cached, batch_size=8)))
+    images = images.permute(0, 3, 1, 2).float() / 255
+    print("\nImage batch shape:", images.shape)
+    print("Label batch:", batch_labels)
+
+    print("\nDay 15 completed successfully.")
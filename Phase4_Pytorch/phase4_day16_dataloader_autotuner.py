@@ -0,0 +1,272 @@
+"""
+PHASE 4 — PyTorch Fundamentals
+Day 16: DataLoader Profiler & Auto-Tuner
+
+Concepts:
+- num_workers, batch_size, prefetch_factor, persistent_workers, pin_memory
+- measuring samples/s instead of guessing
+- main-process wait time: how long training waits for data
+- worker busy / idle time recorded through shared-memory counters
+- grid search and picking (or applying) the best configuration
+"""
+
+import itertools
+import time
+
+import cv2
+import numpy as np
+import torch
+import torch.nn as nn
+from torch.utils.data import Dataset, DataLoader, TensorDataset, get_worker_info
+
+MAX_WORKERS = 64
+
+
+# --------------------------------------------------
+# 1. Timing wrapper
+# --------------------------------------------------
+
+class TimedDataset(Dataset):
+    """
+    Record the time each worker spends in __getitem__.
+
+    busy[w] lives in shared memory, so the main process can read the
+    totals of every worker (index 0 is the main process when
+    num_workers=0).
+    """
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+        self.busy = torch.zeros(MAX_WORKERS, dtype=torch.float64).share_memory_()
+
+    def __len__(self):
+        return len(self.dataset)
+
+    def __getitem__(self, index):
+        t0 = time.perf_counter()
+        sample = self.dataset[index]
+        info = get_worker_info()
+        self.busy[info.id if info else 0] += time.perf_counter() - t0
+        return sample
+
+    def reset(self):
+        self.busy.zero_()
+
+
+# --------------------------------------------------
+# 2. Profiling one configuration
+# --------------------------------------------------
+
+def valid_config(config):
+    workers = config.get("num_workers", 0)
+    if workers == 0 and (config.get("prefetch_factor") is not None or
+                         config.get("persistent_workers")):
+        return False
+    if config.get("pin_memory") and not torch.cuda.is_available():
+        return False
+    return True
+
+
+def profile_config(dataset, config, num_batches=50, warmup=5, step_fn=None,
+                   epochs=2):
+    """
+    Run `epochs` short epochs of `num_batches` batches and return metrics.
+
+    step_fn(batch) stands in for the training step; without it only data
+    loading is measured. From the second epoch on, iterator start-up
+    (worker spawn) is included, which is what persistent_workers avoids.
+    """
+    timed = dataset if isinstance(dataset, TimedDataset) else TimedDataset(dataset)
+    loader = DataLoader(timed, shuffle=True, **config)
+
+    samples = 0
+    wait = 0.0
+    measured = 0.0
+    for epoch in range(epochs):
+        # Only the first epoch gets a warm-up; later epochs include the
+        # cost of starting their iterator (worker spawn)
+        skip = warmup if epoch == 0 else 0
+        start = time.perf_counter()
+        it = iter(loader)
+        for i in range(skip + num_batches):
+            if i == skip and skip:
+                timed.reset()
+                start = time.perf_counter()
+            t0 = time.perf_counter()
+            try:
+                batch = next(it)
+            except StopIteration:
+                break
+            if i >= skip:
+                wait += time.perf_counter() - t0
+                samples += len(batch[0])
+            if step_fn is not None:
+                step_fn(batch)
+        measured += time.perf_counter() - start
+        del it
+
+    workers = max(config.get("num_workers", 0), 1)
+    busy = float(timed.busy[:workers].sum())
+    return {
+        "samples_per_s": samples / measured,
+        "main_wait": wait / measured,
+        "worker_busy": busy / (measured * workers),
+        "seconds": measured,
+    }
+
+
+# --------------------------------------------------
+# 3. Grid search
+# --------------------------------------------------
+
+DEFAULT_GRID = {
+    "num_workers": [0, 2, 4],
+    "batch_size": [32, 128],
+    "prefetch_factor": [None, 2, 4],
+    "persistent_workers": [False, True],
+    "pin_memory": [False, True],
+}
+
+
+def autotune(dataset, grid=None, num_batches=50, step_fn=None, tolerance=0.05,
+             verbose=True):
+    """
+    Profile every valid configuration in grid and return (best, results).
+
+    Configurations within `tolerance` of the fastest are treated as ties;
+    the one using the fewest workers (then the smallest prefetch) wins.
+    """
+    grid = grid or DEFAULT_GRID
+    keys = list(grid)
+    configs = [dict(zip(keys, values)) for values in itertools.product(*grid.values())]
+    configs = [c for c in configs if valid_config(c)]
+
+    results = []
+    for config in configs:
+        loader_config = {k: v for k, v in config.items() if v is not None}
+        metrics = profile_config(dataset, loader_config, num_batches,
+                                 step_fn=step_fn)
+        results.append((config, metrics))
+        if verbose:
+            print(format_result(config, metrics))
+
+    fastest = max(m["samples_per_s"] for _, m in results)
+    ties = [(c, m) for c, m in results
+            if m["samples_per_s"] >= (1 - tolerance) * fastest]
+    best = min(ties, key=lambda r: (r[0].get("num_workers", 0),
+                                    r[0].get("prefetch_factor") or 0))[0]
+    return best, results
+
+
+def make_loader(dataset, config, **overrides):
+    """Build the DataLoader for a tuned configuration."""
+    options = {k: v for k, v in config.items() if v is not None}
+    options.update(overrides)
+    return DataLoader(dataset, **options)
+
+
+def format_result(config, metrics):
+    return (f"workers={config.get('num_workers', 0)} "
+            f"batch={config.get('batch_size', 1):<4} "
+            f"prefetch={str(config.get('prefetch_factor')):<4} "
+            f"persistent={str(config.get('persistent_workers', False)):<5} "
+            f"pin={str(config.get('pin_memory', False)):<5} -> "
+            f"{metrics['samples_per_s']:8.0f} samples/s  "
+            f"main wait {100 * metrics['main_wait']:3.0f}%  "
+            f"worker busy {100 * metrics['worker_busy']:3.0f}%")
+
+
+# --------------------------------------------------
+# 4. Example datasets
+# --------------------------------------------------
+
+class AugmentedImageDataset(Dataset):
+    """CPU-heavy samples: build, blur and resize an image per index."""
+
+    def __init__(self, length=2000, size=64):
+        self.length = length
+        self.size = size
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        rng = np.random.default_rng(index)
+        image = rng.integers(0, 256, (256, 256, 3), dtype=np.uint8)
+        image = cv2.GaussianBlur(image, (7, 7), 0)
+        image = cv2.resize(image, (self.size, self.size), interpolation=cv2.INTER_AREA)
+        tensor = torch.from_numpy(image).permute(2, 0, 1).float() / 255
+        return tensor, index % 10
+
+
+if __name__ == "__main__":
+
+    print("PHASE 4 — DAY 16")
+    print("DataLoader Profiler & Auto-Tuner")
+    print("-" * 50)
+
+    print("\nTorch threads:", torch.get_num_threads(), "| CUDA:", torch.cuda.is_available())
+
+    # --------------------------------------------------
+    # 5. Profile the Day 9 configuration
+    # --------------------------------------------------
+
+    print("\n5. Day 9 configuration (batch_size=4, no workers)")
+
+    dataset = AugmentedImageDataset()
+    print(format_result({"batch_size": 4},
+                        profile_config(dataset, {"batch_size": 4}, num_batches=100)))
+
+    # --------------------------------------------------
+    # 6. Auto-tune a CPU-heavy dataset with a training step
+    # --------------------------------------------------
+
+    print("\n6. Auto-tuning (CPU-heavy samples + small CNN step)")
+
+    model = nn.Sequential(
+        nn.Conv2d(3, 16, 3, padding=1), nn.ReLU(), nn.AdaptiveAvgPool2d(1),
+        nn.Flatten(), nn.Linear(16, 10)
+    )
+    optimizer = torch.optim.SGD(model.parameters(), lr=0.01)
+    loss_fn = nn.CrossEntropyLoss()
+
+    def train_step(batch):
+        images, labels = batch
+        loss = loss_fn(model(images), labels)
+        optimizer.zero_grad(set_to_none=True)
+        loss.backward()
+        optimizer.step()
+
+    grid = {
+        "num_workers": [0, 2],
+        "batch_size": [32, 128],
+        "prefetch_factor": [None, 4],
+        "persistent_workers": [False, True],
+        "pin_memory": [False, True],
+    }
+    best, results = autotune(dataset, grid, num_batches=10, step_fn=train_step)
+    print("Best configuration:", best)
+
+    # --------------------------------------------------
+    # 7. In-memory tensors: workers only add overhead
+    # --------------------------------------------------
+
+    print("\n7. Auto-tuning an in-memory TensorDataset")
+
+    tensors = TensorDataset(torch.rand(20_000, 3, 32, 32), torch.randint(0, 10, (20_000,)))
+    best_small, _ = autotune(tensors, {"num_workers": [0, 2], "batch_size": [64, 256]},
+                             num_batches=20)
+    print("Best configuration:", best_small)
+
+    # --------------------------------------------------
+    # 8. Apply the tuned configuration
+    # --------------------------------------------------
+
+    print("\n8. Tuned DataLoader")
+
+    loader = make_loader(dataset, best, shuffle=True)
+    images, labels = next(iter(loader))
+    print("Image batch shape:", images.shape)
+    print("Label batch shape:", labels.shape)
+
+    print("\nDay 16 completed successfully.")
@@ -0,0 +1,218 @@
+"""
+PHASE 4 — PyTorch Fundamentals
+Day 17: Resumable Deterministic Distributed Sampler
+
+Concepts:
+- shuffle=True without a seed: a restarted job sees a different order
+- permutations derived from (seed, epoch) only
+- splitting one global permutation across ranks
+- counting consumed samples explicitly (DataLoader prefetches ahead)
+- state_dict / load_state_dict to resume at the exact next batch
+- resuming with a different number of ranks
+"""
+
+import os
+
+import torch
+import torch.distributed as dist
+from torch.utils.data import Sampler, TensorDataset, DataLoader
+
+
+# --------------------------------------------------
+# 1. Sampler
+# --------------------------------------------------
+
+class ResumableDistributedSampler(Sampler):
+    """
+    Deterministic, checkpointable replacement for DistributedSampler.
+
+    Every epoch uses one global permutation from torch.randperm seeded
+    with seed + epoch. Samples consumed so far (by all ranks together)
+    are skipped, the rest is padded (or trimmed with drop_last) to a
+    multiple of num_replicas and rank r takes every num_replicas-th index
+    starting at r.
+
+    The training loop calls advance(batch_size) after each finished step:
+    DataLoader workers prefetch batches, so the position of the iterator
+    is ahead of what the model has actually seen. Batch order across
+    DataLoader workers is preserved, so resumption does not depend on
+    num_workers.
+    """
+
+    def __init__(self, dataset, num_replicas=None, rank=None, shuffle=True,
+                 seed=0, drop_last=False):
+        if num_replicas is None:
+            num_replicas = dist.get_world_size() if dist.is_available() and \
+                dist.is_initialized() else 1
+        if rank is None:
+            rank = dist.get_rank() if dist.is_available() and \
+                dist.is_initialized() else 0
+        if not 0 <= rank < num_replicas:
+            raise ValueError(f"Invalid rank {rank} for {num_replicas} replicas")
+
+        self.num_samples_total = len(dataset)
+        self.num_replicas = num_replicas
+        self.rank = rank
+        self.shuffle = shuffle
+        self.seed = seed
+        self.drop_last = drop_last
+
+        self.epoch = 0
+        self.consumed = 0   # samples consumed this epoch, summed over ranks
+
+    # ---- epoch & position ----
+
+    def set_epoch(self, epoch):
+        """Start a new epoch (resets the position unless it is the same epoch)."""
+        if epoch != self.epoch:
+            self.consumed = 0
+        self.epoch = epoch
+
+    def advance(self, num_samples):
+        """Record that this rank finished a step of num_samples samples."""
+        self.consumed += num_samples * self.num_replicas
+
+    # ---- indices ----
+
+    def permutation(self):
+        if self.shuffle:
+            g = torch.Generator()
+            g.manual_seed(self.seed + self.epoch)
+            return torch.randperm(self.num_samples_total, generator=g)
+        return torch.arange(self.num_samples_total)
+
+    def _remaining(self):
+        remaining = self.permutation()[min(self.consumed, self.num_samples_total):]
+        extra = len(remaining) % self.num_replicas
+        if self.drop_last and extra:
+            remaining = remaining[:len(remaining) - extra]
+        elif extra and len(remaining) > 0:
+            # Pad by repeating from the start, like DistributedSampler
+            pad = self.num_replicas - extra
+            repeats = -(-pad // len(remaining))
+            remaining = torch.cat([remaining, remaining.repeat(repeats)[:pad]])
+        return remaining
+
+    def __iter__(self):
+        return iter(self._remaining()[self.rank::self.num_replicas].tolist())
+
+    def __len__(self):
+        return len(self._remaining()) // self.num_replicas
+
+    # ---- checkpointing ----
+
+    def state_dict(self):
+        return {
+            "epoch": self.epoch,
+            "consumed": self.consumed,
+            "seed": self.seed,
+            "shuffle": self.shuffle,
+            "num_samples": self.num_samples_total,
+        }
+
+    def load_state_dict(self, state):
+        if state["num_samples"] != self.num_samples_total:
+            raise ValueError("Checkpoint was taken on a dataset of different size")
+        self.epoch = state["epoch"]
+        self.consumed = state["consumed"]
+        self.seed = state["seed"]
+        self.shuffle = state["shuffle"]
+
+
+def train_epoch_indices(loader, sampler, stop_after=None):
+    """Iterate one epoch, advancing the sampler; returns the sample ids seen."""
+    seen = []
+    for step, (batch_ids,) in enumerate(loader):
+        # ... forward / backward / optimizer.step() ...
+        seen.extend(batch_ids.tolist())
+        sampler.advance(len(batch_ids))
+        if stop_after is not None and step + 1 == stop_after:
+            break
+    return seen
+
+
+if __name__ == "__main__":
+
+    print("PHASE 4 — DAY 17")
+    print("Resumable Deterministic Distributed Sampler")
+    print("-" * 50)
+
+    # The dataset returns its own index, so the order is easy to check
+    dataset = TensorDataset(torch.arange(100))
+
+    # --------------------------------------------------
+    # 2. Same (seed, epoch) -> same order
+    # --------------------------------------------------
+
+    print("\n2. Deterministic permutations")
+
+    a = ResumableDistributedSampler(dataset, seed=42)
+    b = ResumableDistributedSampler(dataset, seed=42)
+    a.set_epoch(3)
+    b.set_epoch(3)
+    print("Same order for epoch 3:", list(a) == list(b))
+    b.set_epoch(4)
+    print("Different order for epoch 4:", list(a) != list(b))
+
+    # --------------------------------------------------
+    # 3. Uninterrupted reference run
+    # --------------------------------------------------
+
+    print("\n3. Reference epoch (2 workers, batch size 8)")
+
+    sampler = ResumableDistributedSampler(dataset, seed=0)
+    sampler.set_epoch(1)
+    loader = DataLoader(dataset, batch_size=8, sampler=sampler, num_workers=2)
+    reference = train_epoch_indices(loader, sampler)
+    print("First batches:", reference[:16])
+
+    # --------------------------------------------------
+    # 4. Preempted after 5 batches, checkpoint, resume
+    # --------------------------------------------------
+
+    print("\n4. Preemption and resume")
+
+    sampler = ResumableDistributedSampler(dataset, seed=0)
+    sampler.set_epoch(1)
+    loader = DataLoader(dataset, batch_size=8, sampler=sampler, num_workers=2)
+    before = train_epoch_indices(loader, sampler, stop_after=5)
+
+    torch.save({"sampler": sampler.state_dict()}, "checkpoint.pt")
+    print("Checkpoint:", sampler.state_dict())
+
+    # New process: fresh sampler + loader, state loaded from disk
+    resumed = ResumableDistributedSampler(dataset, seed=123)
+    resumed.load_state_dict(torch.load("checkpoint.pt")["sampler"])
+    loader = DataLoader(dataset, batch_size=8, sampler=resumed, num_workers=2)
+    after = train_epoch_indices(loader, resumed)
+
+    print("Batches before / after:", len(before) // 8, "/", -(-len(after) // 8))
+    print("Identical to reference:", before + after == reference)
+    os.remove("checkpoint.pt")
+
+    # --------------------------------------------------
+    # 5. Two ranks, resumed on four ranks
+    # --------------------------------------------------
+
+    print("\n5. Resume on a different world size")
+
+    seen = []
+    states = []
+    for rank in range(2):
+        sampler = ResumableDistributedSampler(dataset, num_replicas=2, rank=rank)
+        loader = DataLoader(dataset, batch_size=5, sampler=sampler)
+        seen += train_epoch_indices(loader, sampler, stop_after=4)
+        states.append(sampler.state_dict())
+
+    # All ranks step together, so their states match
+    print("Rank states equal:", states[0] == states[1], "consumed:", states[0]["consumed"])
+
+    for rank in range(4):
+        sampler = ResumableDistributedSampler(dataset, num_replicas=4, rank=rank)
+        sampler.load_state_dict(states[0])
+        loader = DataLoader(dataset, batch_size=5, sampler=sampler)
+        seen += train_epoch_indices(loader, sampler)
+
+    print("Every sample exactly once:", sorted(seen) == list(range(len(dataset))))
+
+    print("\nDay 17 completed successfully.")
@@ -0,0 +1,274 @@
+"""
+PHASE 4 — PyTorch Fundamentals
+Day 18: Shape-Bucketed Batch Sampler
+
+Concepts:
+- real datasets mix resolutions and aspect ratios
+- padding every image to the largest size wastes compute
+- per-sample shape metadata, read from headers once and cached
+- aspect-ratio buckets + sorting by area inside a pool
+- one batch = one bucket, so padding stays small
+- DataLoader(batch_sampler=...) with a padding collate function
+"""
+
+import json
+import os
+import random
+
+import numpy as np
+import torch
+from PIL import Image
+from torch.utils.data import Dataset, DataLoader, Sampler
+
+
+# --------------------------------------------------
+# 1. Shape metadata
+# --------------------------------------------------
+
+def image_shapes(paths, cache_path=None):
+    """
+    Return an (N, 2) array of (height, width) for image files.
+
+    PIL only parses the header, so no pixels are decoded. Results are
+    cached in cache_path (JSON) and reused while files are unchanged.
+    """
+    cache = {}
+    if cache_path and os.path.exists(cache_path):
+        with open(cache_path) as f:
+            cache = json.load(f)
+
+    shapes = []
+    changed = False
+    for path in paths:
+        st = os.stat(path)
+        entry = cache.get(path)
+        if entry is None or entry["size"] != st.st_size or entry["mtime"] != int(st.st_mtime):
+            with Image.open(path) as img:
+                width, height = img.size
+            entry = {"height": height, "width": width,
+                     "size": st.st_size, "mtime": int(st.st_mtime)}
+            cache[path] = entry
+            changed = True
+        shapes.append((entry["height"], entry["width"]))
+
+    if cache_path and changed:
+        with open(cache_path, "w") as f:
+            json.dump(cache, f)
+
+    return np.array(shapes, dtype=np.int64).reshape(-1, 2)
+
+
+# --------------------------------------------------
+# 2. Bucketed batch sampler
+# --------------------------------------------------
+
+class BucketBatchSampler(Sampler):
+    """
+    Yield batches of indices whose images have similar shapes.
+
+    shapes      : (N, 2) heights and widths
+    num_buckets : aspect-ratio buckets (log-spaced over the data's range)
+    pool_size   : batches' worth of samples sorted by area together;
+                  larger pools mean less padding but less randomness
+
+    Each epoch: shuffle inside every bucket, cut each bucket into pools,
+    sort a pool by area, split it into batches, then shuffle all batches.
+    """
+
+    def __init__(self, shapes, batch_size, num_buckets=8, pool_size=8,
+                 shuffle=True, drop_last=False, seed=0):
+        self.shapes = np.asarray(shapes, dtype=np.int64).reshape(-1, 2)
+        self.batch_size = batch_size
+        self.pool_size = pool_size
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.seed = seed
+        self.epoch = 0
+
+        log_ratio = np.log(self.shapes[:, 1] / self.shapes[:, 0])
+        edges = np.linspace(log_ratio.min(), log_ratio.max(), num_buckets + 1)[1:-1]
+        bucket_ids = np.digitize(log_ratio, edges)
+        self.areas = self.shapes[:, 0] * self.shapes[:, 1]
+        self.buckets = [np.nonzero(bucket_ids == b)[0] for b in range(num_buckets)]
+        self.buckets = [b for b in self.buckets if len(b)]
+
+    def set_epoch(self, epoch):
+        self.epoch = epoch
+
+    def batches(self):
+        rng = np.random.default_rng(self.seed + self.epoch)
+        pool = self.batch_size * self.pool_size
+        batches = []
+
+        for bucket in self.buckets:
+            bucket = rng.permutation(bucket) if self.shuffle else bucket
+            for start in range(0, len(bucket), pool):
+                chunk = bucket[start:start + pool]
+                chunk = chunk[np.argsort(self.areas[chunk], kind="stable")]
+                for b in range(0, len(chunk), self.batch_size):
+                    batch = chunk[b:b + self.batch_size]
+                    if len(batch) < self.batch_size and self.drop_last:
+                        continue
+                    batches.append(batch.tolist())
+
+        if self.shuffle:
+            random.Random(self.seed + self.epoch).shuffle(batches)
+        return batches
+
+    def __iter__(self):
+        return iter(self.batches())
+
+    def __len__(self):
+        return len(self.batches())
+
+
+# --------------------------------------------------
+# 3. Padding collate + statistics
+# --------------------------------------------------
+
+def pad_collate(batch, pad_value=0):
+    """
+    Pad (C, H, W) images to the largest H and W in the batch.
+
+    Returns images (N, C, H, W), labels and the original (H, W) sizes,
+    so models or losses can mask out the padding.
+    """
+    images, labels = zip(*batch)
+    height = max(img.shape[1] for img in images)
+    width = max(img.shape[2] for img in images)
+
+    out = images[0].new_full((len(images), images[0].shape[0], height, width),
+                             pad_value)
+    for i, img in enumerate(images):
+        out[i, :, :img.shape[1], :img.shape[2]] = img
+
+    sizes = torch.tensor([img.shape[1:] for img in images])
+    return out, torch.as_tensor(labels), sizes
+
+
+def padding_fraction(batches, shapes):
+    """Share of pixels in the padded batches that are padding."""
+    shapes = np.asarray(shapes)
+    real = padded = 0
+    for batch in batches:
+        s = shapes[batch]
+        real += int((s[:, 0] * s[:, 1]).sum())
+        padded += len(batch) * int(s[:, 0].max()) * int(s[:, 1].max())
+    return 1 - real / padded
+
+
+def padding_report(sampler):
+    """Padding of bucketed vs random batches vs padding to the global maximum."""
+    shapes = sampler.shapes
+    bucketed = padding_fraction(sampler.batches(), shapes)
+
+    order = np.random.default_rng(0).permutation(len(shapes))
+    bs = sampler.batch_size
+    random_batches = [order[i:i + bs] for i in range(0, len(order), bs)]
+    random_pad = padding_fraction(random_batches, shapes)
+
+    uniform = 1 - (shapes[:, 0] * shapes[:, 1]).sum() / (
+        len(shapes) * shapes[:, 0].max() * shapes[:, 1].max())
+    return {"bucketed": bucketed, "random": random_pad, "uniform": float(uniform)}
+
+
+# --------------------------------------------------
+# 4. Mixed-resolution dataset
+# --------------------------------------------------
+
+class MixedResolutionDataset(Dataset):
+    """Random images with the given (H, W) shapes; exposes .shapes."""
+
+    def __init__(self, shapes, channels=3, num_classes=10):
+        self.shapes = np.asarray(shapes)
+        self.channels = channels
+        self.num_classes = num_classes
+
+    def __len__(self):
+        return len(self.shapes)
+
+    def __getitem__(self, index):
+        h, w = self.shapes[index]
+        g = torch.Generator().manual_seed(int(index))
+        image = torch.rand(self.channels, int(h), int(w), generator=g)
+        return image, int(index % self.num_classes)
+
+
+def random_shapes(n, seed=0):
+    # Common aspect ratios at random scales (64 .. 320 px on the short side)
+    rng = np.random.default_rng(seed)
+    ratios = np.array([1.0, 4 / 3, 3 / 4, 16 / 9, 9 / 16, 2.0, 0.5])
+    ratio = ratios[rng.integers(0, len(ratios), n)]
+    short = rng.integers(64, 321, n)
+    height = np.where(ratio >= 1, short, (short / ratio).astype(int))
+    width = np.where(ratio >= 1, (short * ratio).astype(int), short)
+    return np.stack([height, width], axis=1)
+
+
+if __name__ == "__main__":
+
+    print("PHASE 4 — DAY 18")
+    print("Shape-Bucketed Batch Sampler")
+    print("-" * 50)
+
+    # --------------------------------------------------
+    # 5. Shape metadata from image headers (cached)
+    # --------------------------------------------------
+
+    print("\n5. Reading shapes from image headers")
+
+    os.makedirs("mixed_images", exist_ok=True)
+    paths = []
+    for i, (h, w) in enumerate(random_shapes(20, seed=1)):
+        path = os.path.join("mixed_images", f"img_{i:03d}.png")
+        if not os.path.exists(path):
+            Image.new("RGB", (int(w), int(h)), (i * 10 % 256, 80, 160)).save(path)
+        paths.append(path)
+
+    shapes = image_shapes(paths, cache_path="mixed_images_shapes.json")
+    print("First shapes (H, W):", shapes[:4].tolist())
+    print("Cached:", os.path.exists("mixed_images_shapes.json"))
+
+    # --------------------------------------------------
+    # 6. Buckets and batches
+    # --------------------------------------------------
+
+    print("\n6. Bucketed batches")
+
+    shapes = random_shapes(2000)
+    dataset = MixedResolutionDataset(shapes)
+    sampler = BucketBatchSampler(dataset.shapes, batch_size=16, num_buckets=8)
+
+    print("Buckets:", [len(b) for b in sampler.buckets])
+    print("Batches per epoch:", len(sampler))
+
+    # --------------------------------------------------
+    # 7. Padding saved
+    # --------------------------------------------------
+
+    print("\n7. Padding fraction")
+
+    report = padding_report(sampler)
+    print(f"Pad to dataset maximum: {100 * report['uniform']:5.1f}%")
+    print(f"Random batches:         {100 * report['random']:5.1f}%")
+    print(f"Bucketed batches:       {100 * report['bucketed']:5.1f}%")
+    print(f"Padded pixels saved vs random batches: "
+          f"{100 * (1 - report['bucketed'] / report['random']):.0f}%")
+
+    # --------------------------------------------------
+    # 8. DataLoader(batch_sampler=...)
+    # --------------------------------------------------
+
+    print("\n8. DataLoader integration")
+
+    loader = DataLoader(dataset, batch_sampler=sampler, collate_fn=pad_collate)
+
+    for epoch in range(2):
+        sampler.set_epoch(epoch)
+        for i, (images, labels, sizes) in enumerate(loader):
+            if i == 3:
+                break
+            print(f"Epoch {epoch} batch {i}: {tuple(images.shape)}, "
+                  f"sizes {sizes[:2].tolist()} ...")
+
+    print("\nDay 18 completed successfully.")
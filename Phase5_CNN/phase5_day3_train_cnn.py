@@ -15,6 +15,22 @@ import torch
 import torch.nn as nn
 import torch.optim as optim
 
+# Mixed precision (see Day 7): run forward passes in bfloat16 on CPU.
+# Falls back to float32 on CPUs without native bf16 support.
+USE_BF16 = False
+
+AMP_DTYPE = None
+if USE_BF16:
+    try:
+        # oneDNN checks for AVX512-BF16 / AMX
+        native_bf16 = torch.ops.mkldnn._is_mkldnn_bf16_supported()
+    except (AttributeError, RuntimeError):
+        native_bf16 = False
+    if native_bf16:
+        AMP_DTYPE = torch.bfloat16
+    else:
+        print("bfloat16 is not supported on this CPU, using float32")
+
 print("PHASE 5 — DAY 3")
 print("Training a CNN")
 print("-" * 50)
@@ -103,11 +119,10 @@ print("\n5. Training loop")
 
 for epoch in range(10):
 
-    # Forward pass
-    outputs = model(X)
-
-    # Compute loss
-    loss = loss_fn(outputs, y)
+    # Forward pass + loss (bf16 activations when enabled)
+    with torch.autocast("cpu", dtype=AMP_DTYPE, enabled=AMP_DTYPE is not None):
+        outputs = model(X)
+        loss = loss_fn(outputs, y)
 
     # Backpropagation
     loss.backward()
@@ -127,7 +142,8 @@ for epoch in range(10):
 
 print("\n6. Predictions")
 
-outputs = model(X)
+with torch.autocast("cpu", dtype=AMP_DTYPE, enabled=AMP_DTYPE is not None):
+    outputs = model(X).float()
 
 _, predicted = torch.max(outputs, 1)
 
@@ -15,6 +15,22 @@ import torch.nn as nn
 import torch.optim as optim
 import torchvision.models as models
 
+# Mixed precision (see Day 7): run forward passes in bfloat16 on CPU.
+# Falls back to float32 on CPUs without native bf16 support.
+USE_BF16 = False
+
+AMP_DTYPE = None
+if USE_BF16:
+    try:
+        # oneDNN checks for AVX512-BF16 / AMX
+        native_bf16 = torch.ops.mkldnn._is_mkldnn_bf16_supported()
+    except (AttributeError, RuntimeError):
+        native_bf16 = False
+    if native_bf16:
+        AMP_DTYPE = torch.bfloat16
+    else:
+        print("bfloat16 is not supported on this CPU, using float32")
+
 print("PHASE 5 — DAY 4")
 print("Pretrained Models & Transfer Learning")
 print("-" * 50)
@@ -48,7 +64,8 @@ print("\n3. Testing forward pass")
 
 img = torch.rand(1, 3, 224, 224)
 
-output = model(img)
+with torch.autocast("cpu", dtype=AMP_DTYPE, enabled=AMP_DTYPE is not None):
+    output = model(img).float()
 
 print("Output shape:", output.shape)
 
@@ -122,9 +139,9 @@ print("\n9. Training")
 
 for epoch in range(5):
 
-    outputs = model(X)
-
-    loss = loss_fn(outputs, y)
+    with torch.autocast("cpu", dtype=AMP_DTYPE, enabled=AMP_DTYPE is not None):
+        outputs = model(X)
+        loss = loss_fn(outputs, y)
 
     loss.backward()
 
@@ -140,7 +157,8 @@ for epoch in range(5):
 
 print("\n10. Evaluation")
 
-outputs = model(X)
+with torch.autocast("cpu", dtype=AMP_DTYPE, enabled=AMP_DTYPE is not None):
+    outputs = model(X).float()
 
 _, predicted = torch.max(outputs, 1)
 
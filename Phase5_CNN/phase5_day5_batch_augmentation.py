@@ -0,0 +1,304 @@
+"""
+PHASE 5 — CNNs & TorchVision
+Day 5: Batched On-Tensor Augmentation
+
+Concepts:
+- per-sample augmentation in Python is CPU-bound
+- random parameters for every sample, applied to the whole batch
+- flips, crops, rotation, scale, shear, translation as one affine matrix
+- one affine_grid + grid_sample call per batch
+- color jitter (brightness, contrast, saturation) by broadcasting
+"""
+
+import math
+import time
+
+import cv2
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+
+
+# --------------------------------------------------
+# 1. Batched augmentation module
+# --------------------------------------------------
+
+class BatchAugment(nn.Module):
+    """
+    Random augmentation of an (N, C, H, W) batch: float in [0, 1] or uint8
+    (converted to float in both training and eval mode).
+
+    hflip / vflip  : flip probabilities
+    degrees        : rotation range (-degrees, degrees)
+    translate      : max shift as a fraction of width / height
+    scale          : zoom range
+    shear          : x-shear range in degrees
+    crop_scale     : random-resized-crop area range (None = no crop)
+    size           : output (H, W), default = input size
+    brightness, contrast, saturation : jitter strength (0 = off)
+
+    All geometric steps are folded into one 2x3 matrix per sample and
+    applied with a single grid_sample. Without rotation, scale, shear,
+    translation, crop or resize, flips are done by indexing and no
+    resampling happens at all. Only active in training mode.
+    """
+
+    def __init__(self, hflip=0.5, vflip=0.0, degrees=0.0, translate=(0.0, 0.0),
+                 scale=(1.0, 1.0), shear=0.0, crop_scale=None, size=None,
+                 brightness=0.0, contrast=0.0, saturation=0.0,
+                 padding_mode="zeros", generator=None):
+        super().__init__()
+        self.hflip = hflip
+        self.vflip = vflip
+        self.degrees = degrees
+        self.translate = translate
+        self.scale = scale
+        self.shear = shear
+        self.crop_scale = crop_scale
+        self.size = size
+        self.brightness = brightness
+        self.contrast = contrast
+        self.saturation = saturation
+        self.padding_mode = padding_mode
+        self.generator = generator
+
+    def _uniform(self, n, low, high, device):
+        r = torch.rand(n, generator=self.generator, device=device)
+        return low + (high - low) * r
+
+    # ---- geometry ----
+
+    def needs_warp(self):
+        """True if any geometric step other than flipping is enabled."""
+        return bool(self.degrees or self.shear or any(self.translate) or
+                    tuple(self.scale) != (1.0, 1.0) or
+                    self.crop_scale is not None or self.size is not None)
+
+    def sample_theta(self, n, height, width, device="cpu"):
+        """Per-sample 2x3 matrices mapping output to input coordinates."""
+        u = lambda low, high: self._uniform(n, low, high, device)
+        eye = torch.eye(2, device=device).expand(n, 2, 2)
+
+        # Flips: negate an output axis
+        fx = torch.where(u(0, 1) < self.hflip, -1.0, 1.0)
+        fy = torch.where(u(0, 1) < self.vflip, -1.0, 1.0)
+        A = eye * torch.stack([fx, fy], 1)[:, None, :]
+
+        # Rotation, scale and shear in pixel units (keeps aspect ratio)
+        angle = torch.deg2rad(u(-self.degrees, self.degrees))
+        shear = torch.tan(torch.deg2rad(u(-self.shear, self.shear)))
+        zoom = u(*self.scale)
+        cos, sin = torch.cos(angle), torch.sin(angle)
+        M = torch.stack([
+            torch.stack([cos, -sin + shear * cos], 1),
+            torch.stack([sin, cos + shear * sin], 1),
+        ], 1) / zoom[:, None, None]
+        D = torch.tensor([width / 2, height / 2], device=device)
+        M = M * D[None, None, :] / D[None, :, None]   # D^-1 M D
+        A = M @ A
+
+        t = torch.stack([u(-1, 1) * self.translate[0],
+                         u(-1, 1) * self.translate[1]], 1) * 2
+
+        # Random-resized crop: the output covers a sub-window of the input
+        if self.crop_scale is not None:
+            area = u(*self.crop_scale)
+            log_ratio = u(math.log(3 / 4), math.log(4 / 3))
+            ratio = torch.exp(log_ratio)
+            sx = torch.sqrt(area * ratio).clamp(max=1)
+            sy = torch.sqrt(area / ratio).clamp(max=1)
+            cx = u(-1, 1) * (1 - sx)
+            cy = u(-1, 1) * (1 - sy)
+            S = torch.diag_embed(torch.stack([sx, sy], 1))
+            A = S @ A
+            t = (S @ t[:, :, None])[:, :, 0] + torch.stack([cx, cy], 1)
+
+        return torch.cat([A, t[:, :, None]], 2)
+
+    def flip(self, x):
+        """Per-sample flips without resampling (exact pixel copies)."""
+        n = x.shape[0]
+        h = self._uniform(n, 0, 1, x.device) < self.hflip
+        v = self._uniform(n, 0, 1, x.device) < self.vflip
+        if self.hflip:
+            x = torch.where(h[:, None, None, None], x.flip(3), x)
+        if self.vflip:
+            x = torch.where(v[:, None, None, None], x.flip(2), x)
+        return x
+
+    def warp(self, x, theta):
+        n, c, h, w = x.shape
+        out_h, out_w = self.size or (h, w)
+        grid = F.affine_grid(theta, (n, c, out_h, out_w), align_corners=False)
+        return F.grid_sample(x, grid, mode="bilinear",
+                             padding_mode=self.padding_mode, align_corners=False)
+
+    # ---- color ----
+
+    def jitter(self, x, scale=1.0, inplace=False):
+        """
+        Color jitter. `scale` (e.g. 1 / 255 for uint8 input) is folded into
+        the first multiply; inplace=True lets it overwrite x (a fresh copy).
+        """
+        n = x.shape[0]
+        u = lambda s: self._uniform(n, 1 - s, 1 + s, x.device)[:, None, None, None]
+        saturation = self.saturation and x.shape[1] == 3
+        mul = lambda t, f: t.mul_(f) if inplace else t * f
+
+        # Contrast and saturation are linear, so scaling first is exact
+        if self.brightness:
+            x = mul(x, u(self.brightness) * scale)
+        elif scale != 1.0:
+            x = mul(x, scale)
+        else:
+            if not (self.contrast or saturation):
+                return x
+            x = x if inplace else x.clone()
+        # From here on x is always a private copy
+        if self.contrast:
+            mean = x.mean(dim=(1, 2, 3), keepdim=True)
+            x.sub_(mean).mul_(u(self.contrast)).add_(mean)
+        if saturation:
+            gray = (0.299 * x[:, 0:1] + 0.587 * x[:, 1:2] + 0.114 * x[:, 2:3])
+            x.sub_(gray).mul_(u(self.saturation)).add_(gray)
+        if self.brightness or self.contrast or saturation:
+            x.clamp_(0, 1)
+        return x
+
+    def forward(self, x):
+        source = x
+        uint8 = x.dtype == torch.uint8
+        if not self.training:
+            return x.float().div_(255) if uint8 else x
+
+        if self.needs_warp():
+            x = x.float() if uint8 else x
+            theta = self.sample_theta(x.shape[0], x.shape[2], x.shape[3], x.device)
+            x = self.warp(x, theta)
+        else:
+            # Flipping uint8 moves a quarter of the bytes of float32
+            x = self.flip(x)
+            x = x.float() if uint8 else x
+        # The uint8 -> [0, 1] division rides along with the jitter multiply
+        return self.jitter(x, scale=1 / 255 if uint8 else 1.0,
+                           inplace=x is not source)
+
+
+# --------------------------------------------------
+# 2. Per-sample reference (Phase 3 style, OpenCV)
+# --------------------------------------------------
+
+def augment_per_sample(images, rng, degrees=15, brightness=0.3):
+    """Flip, rotate and brighten one HWC uint8 image at a time."""
+    out = []
+    for img in images:
+        if rng.random() < 0.5:
+            img = cv2.flip(img, 1)
+        if degrees:
+            h, w = img.shape[:2]
+            M = cv2.getRotationMatrix2D((w // 2, h // 2),
+                                        rng.uniform(-degrees, degrees), 1.0)
+            img = cv2.warpAffine(img, M, (w, h))
+        img = cv2.convertScaleAbs(img, alpha=rng.uniform(1 - brightness, 1 + brightness))
+        out.append(img)
+    return torch.from_numpy(np.stack(out)).permute(0, 3, 1, 2).float() / 255
+
+
+def time_ms(fn, repeats=10):
+    """Median wall time of fn() in milliseconds (after one warm-up call)."""
+    fn()
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return 1000 * float(np.median(times))
+
+
+if __name__ == "__main__":
+
+    print("PHASE 5 — DAY 5")
+    print("Batched On-Tensor Augmentation")
+    print("-" * 50)
+
+    torch.manual_seed(0)
+
+    # --------------------------------------------------
+    # 3. Identity check
+    # --------------------------------------------------
+
+    print("\n3. No augmentation = identity")
+
+    x = torch.rand(8, 3, 64, 64)
+    identity = BatchAugment(hflip=0.0)
+    print("Max difference:", (identity(x) - x).abs().max().item())
+
+    flip_only = BatchAugment(hflip=1.0)
+    print("hflip=1 equals torch.flip:",
+          torch.allclose(flip_only(x), torch.flip(x, dims=[3]), atol=1e-5))
+
+    # --------------------------------------------------
+    # 4. Full augmentation on a batch
+    # --------------------------------------------------
+
+    print("\n4. Augmenting a batch")
+
+    augment = BatchAugment(hflip=0.5, degrees=15, translate=(0.1, 0.1),
+                           scale=(0.9, 1.1), shear=5, crop_scale=(0.6, 1.0),
+                           size=(56, 56), brightness=0.3, contrast=0.3,
+                           saturation=0.3, padding_mode="reflection")
+
+    images = torch.rand(64, 3, 64, 64)
+    augmented = augment(images)
+    print("Input shape:", images.shape)
+    print("Output shape:", augmented.shape)
+
+    augment.eval()
+    print("Eval mode returns input:", augment(images) is images)
+    print("Eval mode converts uint8:", augment((images * 255).byte()).dtype)
+    augment.train()
+
+    # --------------------------------------------------
+    # 5. Benchmark: per-sample OpenCV vs batched torch
+    # --------------------------------------------------
+
+    print("\n5. Benchmark: uint8 images in, float batch out")
+
+    # 64 images per batch, median of 10 runs. Flips and color jitter need
+    # no resampling: flips run on uint8 and the /255 is folded into the
+    # jitter multiply. Rotation needs a float sampling grid + grid_sample,
+    # while OpenCV warps uint8 with SIMD fixed-point code, so on a single
+    # thread the batched warp is slower at 224x224. It scales with
+    # intra-op threads and runs on the GPU next to the model.
+
+    rng = np.random.default_rng(0)
+    configs = {
+        "flip + brightness": (dict(hflip=0.5, brightness=0.3), 0),
+        "flip + rotate + brightness": (dict(hflip=0.5, degrees=15, brightness=0.3), 15),
+    }
+
+    for name, (options, degrees) in configs.items():
+        batch_aug = BatchAugment(**options)
+        print(name)
+        for size in (64, 224):
+            batch_hwc = rng.integers(0, 256, (64, size, size, 3), dtype=np.uint8)
+            batch = torch.from_numpy(batch_hwc).permute(0, 3, 1, 2).contiguous()
+
+            per_sample = time_ms(lambda: augment_per_sample(batch_hwc, rng, degrees))
+            batched = time_ms(lambda: batch_aug(batch))
+            print(f"  {size:3d}x{size:<3d}: per-sample {per_sample:6.1f} ms, "
+                  f"batched {batched:6.1f} ms")
+
+    # --------------------------------------------------
+    # 6. Inside a training step
+    # --------------------------------------------------
+
+    print("\n6. Augmentation as part of the model input")
+
+    model = nn.Sequential(augment, nn.Conv2d(3, 8, 3), nn.ReLU(),
+                          nn.AdaptiveAvgPool2d(1), nn.Flatten(), nn.Linear(8, 10))
+    out = model(torch.rand(16, 3, 64, 64))
+    print("Model output:", out.shape)
+
+    print("\nDay 5 completed successfully.")
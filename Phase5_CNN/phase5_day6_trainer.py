@@ -0,0 +1,427 @@
+"""
+PHASE 5 — CNNs & TorchVision
+Day 6: Reusable Trainer Engine
+
+Concepts:
+- one training loop instead of a copy in every script
+- mini-batches from a DataLoader instead of the whole X per step
+- gradient accumulation (large effective batch, small memory)
+- zero_grad(set_to_none=True)
+- optional torch.compile
+- optional mixed precision (bf16 / fp16 autocast)
+- samples/s, step time breakdown and peak memory
+"""
+
+import sys
+import time
+
+import torch
+import torch.nn as nn
+import torch.optim as optim
+from torch.utils.data import DataLoader, TensorDataset
+
+try:
+    import torchvision.models as models
+except ImportError:
+    models = None
+
+
+# --------------------------------------------------
+# 1. Memory helpers
+# --------------------------------------------------
+
+def peak_memory_mb(device):
+    """
+    Peak allocated CUDA memory since the last reset, or on CPU the peak RSS
+    of the whole process (0 on Windows). The CPU value never goes down, so
+    it cannot be compared between configurations run in the same process.
+    """
+    if device.type == "cuda":
+        return torch.cuda.max_memory_allocated(device) / 2**20
+    try:
+        import resource   # Unix only
+    except ImportError:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+# --------------------------------------------------
+# 2. Mixed precision helpers
+# --------------------------------------------------
+
+def bf16_supported(device):
+    """True if the device runs bfloat16 kernels natively."""
+    if device.type == "cuda":
+        return torch.cuda.is_bf16_supported()
+    try:
+        # oneDNN checks for AVX512-BF16 / AMX (or AVX512 emulation)
+        return torch.ops.mkldnn._is_mkldnn_bf16_supported()
+    except (AttributeError, RuntimeError):
+        return False
+
+
+def resolve_amp_dtype(precision, device):
+    """
+    Map "fp32" / "bf16" / "fp16" to an autocast dtype (None = float32).
+
+    Unsupported choices fall back to float32 with a message, so the same
+    script runs on every machine.
+    """
+    if precision == "fp32":
+        return None
+    if precision == "bf16":
+        if bf16_supported(device):
+            return torch.bfloat16
+        print(f"bfloat16 is not supported on {device.type}, using float32")
+        return None
+    if precision == "fp16":
+        if device.type == "cuda":
+            return torch.float16
+        print("float16 autocast needs CUDA, using float32")
+        return None
+    raise ValueError(f"Unknown precision: {precision}")
+
+
+# --------------------------------------------------
+# 3. Trainer
+# --------------------------------------------------
+
+class Trainer:
+    """
+    Train a model on batches of (inputs, targets) from a DataLoader.
+
+    accumulation_steps : micro-batches whose gradients are summed before
+                         each optimizer step (loss is divided accordingly;
+                         a shorter leftover group at the end of an epoch
+                         is rescaled to the same weight)
+    compile            : wrap the model with torch.compile
+    precision          : "fp32", "bf16" or "fp16" autocast for forward
+                         passes (training and inference)
+
+    Losses go through a GradScaler, which is only enabled for fp16:
+    bfloat16 has the float32 exponent range and needs no loss scaling.
+
+    train_epoch returns the mean loss, samples/s, the time spent waiting
+    for data / in forward / backward / optimizer and peak memory.
+    """
+
+    PHASES = ("data", "forward", "backward", "optimizer")
+
+    def __init__(self, model, optimizer, loss_fn, device="cpu",
+                 accumulation_steps=1, compile=False, precision="fp32"):
+        if accumulation_steps < 1:
+            raise ValueError("accumulation_steps must be >= 1")
+
+        self.device = torch.device(device)
+        self.model = model.to(self.device)
+        self.optimizer = optimizer
+        self.loss_fn = loss_fn
+        self.accumulation_steps = accumulation_steps
+        self.amp_dtype = resolve_amp_dtype(precision, self.device)
+        self.scaler = torch.amp.GradScaler(self.device.type,
+                                           enabled=self.amp_dtype == torch.float16)
+
+        self.forward_model = self.model
+        if compile:
+            if not hasattr(torch, "compile"):
+                raise RuntimeError("torch.compile needs PyTorch 2.0 or newer")
+            self.forward_model = torch.compile(self.model)
+
+        self.steps = 0
+        self.history = []
+
+    def _sync(self):
+        # CUDA kernels are asynchronous; wait so timings are attributed
+        if self.device.type == "cuda":
+            torch.cuda.synchronize(self.device)
+
+    def _to_device(self, batch):
+        inputs, targets = batch
+        non_blocking = self.device.type == "cuda"
+        return (inputs.to(self.device, non_blocking=non_blocking),
+                targets.to(self.device, non_blocking=non_blocking))
+
+    def autocast(self):
+        return torch.autocast(self.device.type, dtype=self.amp_dtype,
+                              enabled=self.amp_dtype is not None)
+
+    def _optimizer_step(self):
+        # Unscales gradients and skips steps with inf / NaN (fp16 only)
+        self.scaler.step(self.optimizer)
+        self.scaler.update()
+        self.optimizer.zero_grad(set_to_none=True)
+        self.steps += 1
+
+    # ---- training ----
+
+    def train_epoch(self, loader):
+        self.model.train()
+        self.optimizer.zero_grad(set_to_none=True)
+        if self.device.type == "cuda":
+            torch.cuda.reset_peak_memory_stats(self.device)
+
+        times = dict.fromkeys(self.PHASES, 0.0)
+        total_loss = 0.0
+        samples = 0
+        pending = 0
+
+        start = time.perf_counter()
+        t0 = start
+        for batch in loader:
+            inputs, targets = self._to_device(batch)
+            self._sync()
+            t1 = time.perf_counter()
+
+            with self.autocast():
+                outputs = self.forward_model(inputs)
+                loss = self.loss_fn(outputs, targets)
+            self._sync()
+            t2 = time.perf_counter()
+
+            self.scaler.scale(loss / self.accumulation_steps).backward()
+            self._sync()
+            t3 = time.perf_counter()
+
+            pending += 1
+            if pending == self.accumulation_steps:
+                self._optimizer_step()
+                pending = 0
+            self._sync()
+            t4 = time.perf_counter()
+
+            times["data"] += t1 - t0
+            times["forward"] += t2 - t1
+            times["backward"] += t3 - t2
+            times["optimizer"] += t4 - t3
+
+            total_loss += loss.item() * len(inputs)
+            samples += len(inputs)
+            t0 = time.perf_counter()
+
+        # Leftover micro-batches at the end of the epoch: their losses were
+        # divided by accumulation_steps, rescale to a mean over `pending`
+        if pending:
+            t3 = time.perf_counter()
+            for param in self.model.parameters():
+                if param.grad is not None:
+                    param.grad.mul_(self.accumulation_steps / pending)
+            self._optimizer_step()
+            times["optimizer"] += time.perf_counter() - t3
+
+        seconds = time.perf_counter() - start
+        metrics = {
+            "loss": total_loss / max(samples, 1),
+            "samples": samples,
+            "seconds": seconds,
+            "samples_per_s": samples / seconds,
+            "times": times,
+            "peak_memory_mb": peak_memory_mb(self.device),
+            "memory": "peak CUDA" if self.device.type == "cuda" else "process peak RSS",
+        }
+        self.history.append(metrics)
+        return metrics
+
+    def fit(self, loader, epochs, log_every=1, val_loader=None):
+        for epoch in range(epochs):
+            metrics = self.train_epoch(loader)
+            if val_loader is not None:
+                metrics.update({"val_" + k: v
+                                for k, v in self.evaluate(val_loader).items()})
+            if log_every and (epoch % log_every == 0 or epoch == epochs - 1):
+                print(f"Epoch: {epoch:3d}  " + format_metrics(metrics))
+        return self.history
+
+    # ---- evaluation ----
+
+    @torch.no_grad()
+    def predict(self, inputs):
+        self.model.eval()
+        with self.autocast():
+            return self.forward_model(inputs.to(self.device)).float()
+
+    @torch.no_grad()
+    def evaluate(self, loader):
+        """Mean loss, plus accuracy when the outputs are class scores."""
+        self.model.eval()
+        total_loss = 0.0
+        correct = 0
+        samples = 0
+        classify = isinstance(self.loss_fn, nn.CrossEntropyLoss)
+
+        for batch in loader:
+            inputs, targets = self._to_device(batch)
+            with self.autocast():
+                outputs = self.forward_model(inputs).float()
+            total_loss += self.loss_fn(outputs, targets).item() * len(inputs)
+            if classify:
+                correct += (outputs.argmax(1) == targets).sum().item()
+            samples += len(inputs)
+
+        results = {"loss": total_loss / max(samples, 1)}
+        if classify:
+            results["accuracy"] = correct / max(samples, 1)
+        return results
+
+
+def format_metrics(metrics):
+    times = metrics["times"]
+    total = sum(times.values()) or 1.0
+    breakdown = " ".join(f"{name} {100 * t / total:3.0f}%" for name, t in times.items())
+    line = (f"loss {metrics['loss']:.4f}  {metrics['samples_per_s']:8.0f} samples/s  "
+            f"[{breakdown}]  {metrics['memory']} {metrics['peak_memory_mb']:.0f} MB")
+    if "val_accuracy" in metrics:
+        line += f"  val acc {metrics['val_accuracy']:.2f}"
+    return line
+
+
+# --------------------------------------------------
+# 4. Models from Days 3 and 4
+# --------------------------------------------------
+
+class CNN(nn.Module):
+    """The Day 3 network (64x64 RGB input, 10 classes)."""
+
+    def __init__(self):
+        super().__init__()
+        self.conv1 = nn.Conv2d(3, 8, 3)
+        self.conv2 = nn.Conv2d(8, 16, 3)
+        self.relu = nn.ReLU()
+        self.fc = nn.Linear(16 * 60 * 60, 10)
+
+    def forward(self, x):
+        x = self.relu(self.conv1(x))
+        x = self.relu(self.conv2(x))
+        x = x.view(x.size(0), -1)
+        return self.fc(x)
+
+
+class SmallBackbone(nn.Module):
+    """Stand-in for ResNet18 when torchvision is not installed (has .fc)."""
+
+    def __init__(self, num_classes=1000):
+        super().__init__()
+        self.features = nn.Sequential(
+            nn.Conv2d(3, 32, 7, stride=4, padding=3), nn.BatchNorm2d(32), nn.ReLU(),
+            nn.Conv2d(32, 64, 3, stride=2, padding=1), nn.BatchNorm2d(64), nn.ReLU(),
+            nn.AdaptiveAvgPool2d(1), nn.Flatten(),
+        )
+        self.fc = nn.Linear(64, num_classes)
+
+    def forward(self, x):
+        return self.fc(self.features(x))
+
+
+def pretrained_backbone():
+    if models is not None:
+        return models.resnet18(weights=models.ResNet18_Weights.DEFAULT)
+    return SmallBackbone()
+
+
+if __name__ == "__main__":
+
+    print("PHASE 5 — DAY 6")
+    print("Reusable Trainer Engine")
+    print("-" * 50)
+
+    torch.manual_seed(0)
+
+    # --------------------------------------------------
+    # 5. Phase 4 Day 10: linear regression
+    # --------------------------------------------------
+
+    print("\n5. Phase 4 Day 10 on the Trainer")
+
+    X = torch.tensor([[1.0], [2.0], [3.0], [4.0]])
+    y = torch.tensor([[2.0], [4.0], [6.0], [8.0]])
+
+    model = nn.Linear(1, 1)
+    trainer = Trainer(model, optim.SGD(model.parameters(), lr=0.01), nn.MSELoss())
+    loader = DataLoader(TensorDataset(X, y), batch_size=2, shuffle=True)
+    trainer.fit(loader, epochs=50, log_every=10)
+
+    print("Prediction for 5.0:", trainer.predict(torch.tensor([[5.0]])).item())
+
+    # --------------------------------------------------
+    # 6. Day 3: CNN with mini-batches
+    # --------------------------------------------------
+
+    print("\n6. Day 3 CNN on the Trainer")
+
+    X = torch.rand(256, 3, 64, 64)
+    y = torch.randint(0, 10, (256,))
+    dataset = TensorDataset(X, y)
+
+    model = CNN()
+    trainer = Trainer(model, optim.SGD(model.parameters(), lr=0.01),
+                      nn.CrossEntropyLoss())
+    trainer.fit(DataLoader(dataset, batch_size=32, shuffle=True), epochs=3)
+    print("Train accuracy:",
+          trainer.evaluate(DataLoader(dataset, batch_size=128))["accuracy"])
+
+    # --------------------------------------------------
+    # 7. Gradient accumulation = larger batch
+    # --------------------------------------------------
+
+    print("\n7. Accumulation: 4 x 8 samples vs 1 x 32 samples")
+
+    # 240 samples do not divide into 32: the epoch ends with a batch of 16,
+    # or with 2 leftover micro-batches of 8 that are rescaled to match
+    uneven = TensorDataset(X[:240], y[:240])
+    weights = []
+    for batch_size, accumulation in ((32, 1), (8, 4)):
+        torch.manual_seed(1)
+        model = CNN()
+        trainer = Trainer(model, optim.SGD(model.parameters(), lr=0.01),
+                          nn.CrossEntropyLoss(), accumulation_steps=accumulation)
+        trainer.train_epoch(DataLoader(uneven, batch_size=batch_size))
+        print(f"batch {batch_size:2d} x accumulation {accumulation}: "
+              f"{trainer.steps} optimizer steps")
+        weights.append(model.fc.weight.detach().clone())
+
+    print("Same weights:", torch.allclose(weights[0], weights[1], atol=1e-5))
+
+    # --------------------------------------------------
+    # 8. Day 4: transfer learning (frozen backbone)
+    # --------------------------------------------------
+
+    print("\n8. Day 4 transfer learning on the Trainer")
+
+    model = pretrained_backbone()
+    print("Backbone:", type(model).__name__)
+
+    for param in model.parameters():
+        param.requires_grad = False
+    model.fc = nn.Linear(model.fc.in_features, 2)
+
+    X = torch.rand(40, 3, 224, 224)
+    y = torch.randint(0, 2, (40,))
+    trainer = Trainer(model, optim.SGD(model.fc.parameters(), lr=0.01),
+                      nn.CrossEntropyLoss(), accumulation_steps=2)
+    trainer.fit(DataLoader(TensorDataset(X, y), batch_size=10, shuffle=True), epochs=3)
+    print("Accuracy:", trainer.evaluate(DataLoader(TensorDataset(X, y), batch_size=20))["accuracy"])
+
+    # --------------------------------------------------
+    # 9. Step time breakdown and torch.compile
+    # --------------------------------------------------
+
+    print("\n9. Eager vs torch.compile (Day 3 CNN)")
+
+    # Compilation pays off for larger models and GPUs; on a small CPU model
+    # the generated kernels can be slower than eager, so always measure
+
+    loader = DataLoader(dataset, batch_size=32, shuffle=True)
+    for compile_model in (False, True):
+        torch.manual_seed(0)
+        model = CNN()
+        trainer = Trainer(model, optim.SGD(model.parameters(), lr=0.01),
+                          nn.CrossEntropyLoss(), compile=compile_model)
+        trainer.train_epoch(loader)   # first epoch includes compilation
+        metrics = trainer.train_epoch(loader)
+        times = metrics["times"]
+        print(f"compile={str(compile_model):<5} "
+              f"{metrics['samples_per_s']:6.0f} samples/s  " +
+              " ".join(f"{name} {1000 * t:6.1f} ms" for name, t in times.items()))
+
+    print("\nDay 6 completed successfully.")
@@ -0,0 +1,198 @@
+"""
+PHASE 5 — CNNs & TorchVision
+Day 7: bfloat16 Autocast on CPU
+
+Concepts:
+- torch.autocast("cpu", dtype=torch.bfloat16)
+- which ops run in bf16 and which stay in float32
+- weights stay float32, activations are bf16
+- loss scaling: needed for fp16, a no-op for bf16
+- accuracy parity against float32
+- throughput and activation memory benchmark
+- falling back to float32 on CPUs without bf16
+"""
+
+import time
+
+import torch
+import torch.nn as nn
+import torch.optim as optim
+from torch.utils.data import DataLoader, TensorDataset
+
+from phase5_day6_trainer import (CNN, Trainer, bf16_supported,
+                                 pretrained_backbone, resolve_amp_dtype)
+
+
+# --------------------------------------------------
+# 1. Learnable synthetic dataset
+# --------------------------------------------------
+
+def color_dataset(n, size=64, num_classes=10, seed=0):
+    """Noisy images whose mean color depends on the class (so accuracy means something)."""
+    g = torch.Generator().manual_seed(seed)
+    labels = torch.randint(0, num_classes, (n,), generator=g)
+    palette = torch.rand(num_classes, 3, 1, 1, generator=torch.Generator().manual_seed(123))
+    images = 0.5 * palette[labels] + 0.5 * torch.rand(n, 3, size, size, generator=g)
+    return TensorDataset(images, labels)
+
+
+# --------------------------------------------------
+# 2. Parity checks
+# --------------------------------------------------
+
+@torch.no_grad()
+def inference_parity(model, inputs, dtype=torch.bfloat16):
+    """Compare float32 and autocast outputs of the same model."""
+    model.eval()
+    reference = model(inputs)
+    with torch.autocast("cpu", dtype=dtype):
+        low = model(inputs).float()
+    return {
+        "max_abs_diff": (reference - low).abs().max().item(),
+        "top1_agreement": (reference.argmax(1) == low.argmax(1)).float().mean().item(),
+    }
+
+
+def training_parity(train_set, val_set, precision, epochs=3, seed=0):
+    torch.manual_seed(seed)
+    model = CNN()
+    trainer = Trainer(model, optim.Adam(model.parameters(), lr=1e-3),
+                      nn.CrossEntropyLoss(), precision=precision)
+    trainer.fit(DataLoader(train_set, batch_size=32, shuffle=True), epochs=epochs,
+                log_every=0)
+    return trainer.evaluate(DataLoader(val_set, batch_size=128))
+
+
+# --------------------------------------------------
+# 3. Benchmark helpers
+# --------------------------------------------------
+
+def activation_mb(model, inputs, autocast_dtype=None):
+    """Bytes of tensors saved for backward by one forward pass."""
+    saved = []
+
+    def pack(tensor):
+        saved.append(tensor.numel() * tensor.element_size())
+        return tensor
+
+    with torch.autograd.graph.saved_tensors_hooks(pack, lambda t: t):
+        with torch.autocast("cpu", dtype=autocast_dtype or torch.bfloat16,
+                            enabled=autocast_dtype is not None):
+            model(inputs)
+    return sum(saved) / 2**20
+
+
+def time_inference(model, inputs, autocast_dtype=None, repeats=5):
+    model.eval()
+    with torch.no_grad(), torch.autocast("cpu", dtype=autocast_dtype or torch.bfloat16,
+                                         enabled=autocast_dtype is not None):
+        model(inputs)   # warm-up (oneDNN picks kernels on first call)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            model(inputs)
+    return repeats * len(inputs) / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+
+    print("PHASE 5 — DAY 7")
+    print("bfloat16 Autocast on CPU")
+    print("-" * 50)
+
+    torch.manual_seed(0)
+    cpu = torch.device("cpu")
+
+    # --------------------------------------------------
+    # 4. Support check and fallback
+    # --------------------------------------------------
+
+    print("\n4. bfloat16 support")
+
+    print("CPU capability:", torch.backends.cpu.get_cpu_capability())
+    print("bf16 supported:", bf16_supported(cpu))
+
+    amp_dtype = resolve_amp_dtype("bf16", cpu)
+    precision = "bf16" if amp_dtype is not None else "fp32"
+    print("Running with:", amp_dtype or torch.float32)
+
+    # --------------------------------------------------
+    # 5. What autocast changes
+    # --------------------------------------------------
+
+    print("\n5. Dtypes inside autocast")
+
+    model = CNN()
+    x = torch.rand(4, 3, 64, 64)
+    with torch.autocast("cpu", dtype=torch.bfloat16):
+        conv_out = model.conv1(x)
+        logits = model(x)
+        loss = nn.CrossEntropyLoss()(logits, torch.tensor([0, 1, 2, 3]))
+
+    print("Weights:", model.conv1.weight.dtype)
+    print("Conv output:", conv_out.dtype)
+    print("Logits:", logits.dtype)
+    print("Loss (kept in float32):", loss.dtype)
+
+    # --------------------------------------------------
+    # 6. Loss scaling hooks
+    # --------------------------------------------------
+
+    print("\n6. Loss scaling")
+
+    # fp16 has a narrow exponent range: small gradients underflow unless
+    # the loss is scaled up first. bf16 keeps float32's range.
+    for p in ("bf16", "fp16"):
+        model = CNN()
+        trainer = Trainer(model, optim.SGD(model.parameters(), lr=0.01),
+                          nn.CrossEntropyLoss(), precision=p)
+        print(f"{p}: autocast dtype {trainer.amp_dtype}, "
+              f"GradScaler enabled: {trainer.scaler.is_enabled()}")
+
+    # --------------------------------------------------
+    # 7. Accuracy parity
+    # --------------------------------------------------
+
+    print("\n7. Accuracy parity")
+
+    backbone = pretrained_backbone()
+    images = torch.rand(16, 3, 224, 224)
+    print(f"{type(backbone).__name__} inference:", inference_parity(backbone, images))
+
+    train_set = color_dataset(512)
+    val_set = color_dataset(256, seed=1)
+    fp32 = training_parity(train_set, val_set, "fp32")
+    low = training_parity(train_set, val_set, precision)
+    print(f"CNN training fp32: loss {fp32['loss']:.4f}  accuracy {fp32['accuracy']:.3f}")
+    print(f"CNN training {precision}: loss {low['loss']:.4f}  accuracy {low['accuracy']:.3f}")
+    print("Accuracy within 2 points:", abs(fp32["accuracy"] - low["accuracy"]) <= 0.02)
+
+    # --------------------------------------------------
+    # 8. Throughput and memory
+    # --------------------------------------------------
+
+    print("\n8. Benchmark")
+
+    # Without bf16 support only the float32 row is printed
+    dtypes = {"fp32": None}
+    if amp_dtype is not None:
+        dtypes["bf16"] = amp_dtype
+
+    inputs = torch.rand(32, 3, 224, 224)
+    for name, dtype in dtypes.items():
+        print(f"{name}: inference {time_inference(backbone, inputs, dtype):6.1f} images/s  "
+              f"activations saved for backward "
+              f"{activation_mb(backbone.train(), inputs, dtype):6.1f} MB")
+
+    loader = DataLoader(train_set, batch_size=32, shuffle=True)
+    for name in dtypes:
+        torch.manual_seed(0)
+        model = CNN()
+        trainer = Trainer(model, optim.SGD(model.parameters(), lr=0.01),
+                          nn.CrossEntropyLoss(), precision=name)
+        trainer.train_epoch(loader)   # warm-up
+        metrics = trainer.train_epoch(loader)
+        small = inputs[:, :, :64, :64]
+        print(f"{name}: training {metrics['samples_per_s']:6.0f} samples/s  "
+              f"activations {activation_mb(model, small, trainer.amp_dtype):5.1f} MB")
+
+    print("\nDay 7 completed successfully.")